@@ -0,0 +1,19 @@
+import hmac
+
+from fastapi import HTTPException, Request
+
+import config
+
+
+def is_admin(request: Request) -> bool:
+    """Klopt de X-Admin-Token header met ADMIN_TOKEN? Zonder ADMIN_TOKEN is niemand admin."""
+    token = request.headers.get("x-admin-token")
+    if not config.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), config.ADMIN_TOKEN.encode("utf-8"))
+
+
+def require_admin(request: Request):
+    """Dependency voor admin endpoints."""
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Alleen voor beheerders (X-Admin-Token)")
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Request, Response
 from pydantic import BaseModel
-from google import genai
-from typing import List
+from api.ai.gemini import api_key_from_header, generate_structured, sse_stream
+from api.compression import streaming_response
+from api.ai.prompts import erd_payload
+from api.ai.schemas import CLASS_DIAGRAM_SCHEMA, validate_class_diagram
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -9,22 +12,10 @@ router = APIRouter()
 class ERDInput(BaseModel):
     erd_json: List[dict]
 
-@router.post("/erdtoclassdiagram")
-async def erd_to_classdiagram(
-    input_data: ERDInput,
-    authorization: str = Header(..., description="Bearer API Key")
-):
-    try:
-        # Haal de API Key uit de Authorization header
-        if not authorization.lower().startswith("bearer "):
-            raise HTTPException(status_code=401, detail="Invalid authorization header")
-        api_key = authorization.split(" ")[1]
 
-        # Initialiseer Gemini client met API Key
-        client = genai.Client(api_key=api_key)
-
-        # Prompt samenstellen
-        prompt = f'''
+def build_prompt(erd_json) -> str:
+    """Prompt voor het omzetten van een ERD naar een classediagram."""
+    return f'''
 Je taak is om een ERD om te zetten naar een volledig classediagram in het volgende JSON-formaat:
 
 {{
@@ -50,17 +41,56 @@ Regels voor de AI:
 3. Kies het relatietype correct op basis van de ERD-relaties.
 4. Output moet correct JSON-formaat zijn zoals hierboven, zodat het direct in een Word-document geplakt kan worden.
 
-Hier is de ERD input die gebruikt moet worden:
-{input_data.erd_json}
+Hier is de ERD input die gebruikt moet worden (JSON):
+{erd_payload(erd_json)}
 '''
 
-        # Vraag aan Gemini
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
+@router.post("/erdtoclassdiagram")
+async def erd_to_classdiagram(
+    input_data: ERDInput,
+    response: Response,
+    authorization: str = Header(..., description="Bearer API Key"),
+    cache_control: Optional[str] = Header(None, description="'no-cache' voor een vers AI antwoord")
+):
+    try:
+        # Haal de API Key uit de Authorization header
+        api_key = api_key_from_header(authorization)
+
+        # Prompt samenstellen
+        prompt = build_prompt(input_data.erd_json)
+
+        # Vraag aan Gemini (async, met persistente cache ervoor)
+        class_diagram, cache_status = await generate_structured(
+            api_key, prompt, endpoint="erdtoclassdiagram", validate=validate_class_diagram,
+            response_schema=CLASS_DIAGRAM_SCHEMA, cache_control=cache_control
         )
+        response.headers["X-AI-Cache"] = cache_status
 
-        return {"class_diagram": response.text}
+        return {"class_diagram": class_diagram}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/erdtoclassdiagram/stream")
+async def erd_to_classdiagram_stream(
+    request: Request,
+    input_data: ERDInput,
+    authorization: str = Header(..., description="Bearer API Key"),
+    cache_control: Optional[str] = Header(None, description="'no-cache' voor een vers AI antwoord")
+):
+    """
+    Streamende variant: tekst chunks als server-sent events, gevolgd door
+    een 'result' event met het geparste classediagram.
+    """
+    api_key = api_key_from_header(authorization)
+    prompt = build_prompt(input_data.erd_json)
+    return streaming_response(
+        request,
+        sse_stream(api_key, prompt, "erdtoclassdiagram", "class_diagram", validate_class_diagram,
+                   CLASS_DIAGRAM_SCHEMA, cache_control),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,409 @@
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+import config
+from api.ai.prompts import log_prompt
+from api.ai.resilience import resilient
+from api.ai.schemas import repair_prompt
+from core.cache.ai_cache import ai_cache_key, get_ai_cache
+from core.metrics.registry import metrics
+
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
+
+
+def preload():
+    """
+    google.genai pas bij de eerste AI call importeren: het kost ongeveer een seconde
+    en de meeste requests gebruiken het niet. De warmup roept deze functie eerder aan.
+    """
+    if config.AI_BACKEND != "stub":
+        from google import genai  # noqa: F401
+
+MODEL = "gemini-2.5-flash"
+
+
+def api_key_from_header(authorization: str) -> str:
+    """Haal de API key uit een 'Bearer <key>' Authorization header."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+    api_key = authorization.split(" ", 1)[1].strip()
+    if not api_key:
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+    return api_key
+
+
+class ClientPool:
+    def __init__(self, max_size: int = 16):
+        """
+        Kleine LRU pool van Gemini clients, één per API key.
+        Een client hergebruikt zijn HTTP verbindingen, dus niet per request opnieuw aanmaken.
+        """
+        self.max_size = max(1, max_size)
+        self._clients: "OrderedDict[str, genai.Client]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(api_key: str) -> str:
+        # Niet de key zelf als dict key bewaren
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+    def get(self, api_key: str) -> "genai.Client":
+        key = self._key(api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+            if config.AI_BACKEND == "stub":
+                from api.ai.stub import StubClient
+                client = StubClient()
+            else:
+                from google import genai
+                client = genai.Client(api_key=api_key)
+            self._clients[key] = client
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+            return client
+
+    def __len__(self):
+        return len(self._clients)
+
+
+client_pool = ClientPool(max_size=config.AI_CLIENT_POOL_SIZE)
+
+
+class VerifiedKeys:
+    def __init__(self, ttl_seconds: float = 3600, max_size: int = 1024):
+        """
+        API keys waarmee onlangs een upstream call gelukt is (als hash). Alleen zulke keys delen
+        gecachte en lopende antwoorden van andere keys; een onbekende, ongeldige of ingetrokken key
+        gaat eerst zelf naar Gemini en krijgt daar zijn authenticatiefout.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max(1, max_size)
+        self._verified: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, api_key: str):
+        key = ClientPool._key(api_key)
+        with self._lock:
+            self._verified[key] = time.monotonic()
+            self._verified.move_to_end(key)
+            while len(self._verified) > self.max_size:
+                self._verified.popitem(last=False)
+
+    def __contains__(self, api_key: str) -> bool:
+        key = ClientPool._key(api_key)
+        with self._lock:
+            verified_at = self._verified.get(key)
+            if verified_at is None:
+                return False
+            if time.monotonic() - verified_at > self.ttl_seconds:
+                del self._verified[key]
+                return False
+            return True
+
+
+verified_keys = VerifiedKeys(ttl_seconds=config.AI_KEY_VERIFY_SECONDS)
+
+
+def _generation_config(response_schema: Optional[Dict]) -> Optional["types.GenerateContentConfig"]:
+    """Structured output: Gemini dwingen tot JSON volgens het schema (tenzij AI_STRUCTURED_OUTPUT uit staat)."""
+    if response_schema is None or not config.AI_STRUCTURED_OUTPUT:
+        return None
+    from google.genai import types
+    return types.GenerateContentConfig(response_mime_type="application/json", response_json_schema=response_schema)
+
+
+def _cache_model(model: str, response_schema: Optional[Dict]) -> str:
+    # Antwoorden met en zonder structured output niet door elkaar halen in de cache
+    structured = ":json" if _generation_config(response_schema) is not None else ""
+    return f"{config.AI_BACKEND}:{model}{structured}"
+
+
+async def generate_content(api_key: str, prompt: str, model: str = MODEL,
+                           response_schema: Optional[Dict] = None) -> str:
+    """
+    Vraag aan Gemini via de async client, zodat de event loop niet blokkeert
+    tijdens de (meerdere seconden durende) LLM call. Met deadline, optionele hedging
+    en circuit breaker (zie api/ai/resilience.py).
+    """
+    client = client_pool.get(api_key)
+    generation_config = _generation_config(response_schema)
+
+    async def call():
+        # Pas tellen als de breaker de call doorlaat (een hedge telt als extra upstream call)
+        singleflight.record_upstream()
+        response = await client.aio.models.generate_content(model=model, contents=prompt, config=generation_config)
+        verified_keys.add(api_key)
+        return response.text
+    return await resilient.call(call)
+
+
+def cache_directives(cache_control: Optional[str]) -> set:
+    """Lees een Cache-Control header uit, bv. 'no-cache, no-store' -> {'no-cache', 'no-store'}."""
+    if not cache_control:
+        return set()
+    return {part.strip().lower() for part in cache_control.split(",") if part.strip()}
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Voegt identieke gelijktijdige AI requests samen: alleen de eerste doet
+        de upstream call, de rest wacht op hetzelfde resultaat.
+        """
+        self._inflight = {}
+        self.upstream_calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, call) -> Tuple[str, bool]:
+        """Geeft (resultaat, gedeeld) terug; gedeeld=True als een lopende call hergebruikt is."""
+        flight_key = (asyncio.get_running_loop(), key)
+        task = self._inflight.get(flight_key)
+        if task is not None:
+            try:
+                result = await asyncio.shield(task)
+                self.coalesced += 1
+                return result, True
+            except Exception:
+                # De gedeelde call faalde (bv. ongeldige key van de eerste aanvrager): zelf proberen
+                pass
+
+        task = asyncio.ensure_future(call())
+        self._inflight[flight_key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        # shield: als deze client afhaakt loopt de call door voor de wachtende requests
+        return await asyncio.shield(task), False
+
+    def record_upstream(self):
+        """Een request dat echt naar de client gaat (niet geweigerd door de breaker)."""
+        self.upstream_calls += 1
+
+    def stats(self) -> Dict:
+        return {
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+singleflight = SingleFlight()
+
+
+def _is_valid(validate: Optional[Callable[[str], Any]], text: str) -> bool:
+    if validate is None:
+        return True
+    try:
+        validate(text)
+        return True
+    except ValueError:
+        return False
+
+
+async def generate_cached(api_key: str, prompt: str, endpoint: str,
+                          cache_control: Optional[str] = None, model: str = MODEL,
+                          response_schema: Optional[Dict] = None,
+                          validate: Optional[Callable[[str], Any]] = None) -> Tuple[str, str]:
+    """
+    Zoals generate_content, maar met de persistente AI cache en singleflight ervoor.
+    'Cache-Control: no-cache' vraagt een vers antwoord (dat wel opgeslagen wordt),
+    'no-store' slaat de cache helemaal over. Alleen een geverifieerde API key (zie VerifiedKeys) krijgt
+    een antwoord uit de cache of van de lopende call van een ander; anders eerst zelf upstream.
+    :param validate: optionele controle op de tekst (gooit ValueError); ongeldige antwoorden worden niet gecached
+    Geeft (tekst, cache status) terug; status is 'hit', 'miss', 'bypass' of 'coalesced'.
+    """
+    cache = get_ai_cache()
+    directives = cache_directives(cache_control)
+    key = ai_cache_key(_cache_model(model, response_schema), endpoint, prompt)
+    bypass = cache is None or bool({"no-cache", "no-store"} & directives)
+    verified = api_key in verified_keys
+
+    if cache is not None:
+        if bypass:
+            cache.record_bypass()
+        elif verified:
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                if _is_valid(validate, cached):
+                    return cached, "hit"
+                await asyncio.to_thread(cache.delete, key)
+
+    async def call_upstream() -> str:
+        log_prompt(endpoint, prompt)
+        started = time.perf_counter()
+        text = await generate_content(api_key, prompt, model, response_schema)
+        metrics.observe_ai(endpoint, "upstream", time.perf_counter() - started)
+        if cache is not None and "no-store" not in directives and _is_valid(validate, text):
+            await asyncio.to_thread(cache.put, key, model, endpoint, text)
+        return text
+
+    # Identieke gelijktijdige requests delen één upstream call; een ongeverifieerde key vliegt apart
+    flight_key = key if verified else f"{key}:{ClientPool._key(api_key)}"
+    text, shared = await singleflight.do(flight_key, call_upstream)
+    if shared:
+        return text, "coalesced"
+    return text, "bypass" if bypass else "miss"
+
+
+async def generate_structured(api_key: str, prompt: str, endpoint: str, validate: Callable[[Any], Any],
+                              response_schema: Optional[Dict] = None, cache_control: Optional[str] = None,
+                              model: str = MODEL) -> Tuple[Any, str]:
+    """
+    AI call die gevalideerde JSON teruggeeft. Het antwoord wordt geparst en gevalideerd;
+    bij een ongeldig antwoord volgen maximaal AI_MAX_REPAIRS nieuwe pogingen met een repair prompt.
+    Geeft (gevalideerde data, cache status) terug; status is 'repaired' als een herstelpoging nodig was.
+    Gooit HTTPException 502 als ook de laatste poging ongeldig is.
+    """
+    # generate_cached valideert al (cache hit / voor het opslaan): per tekst maar één keer valideren en meten
+    validated: Dict[str, Tuple[Any, Optional[ValueError]]] = {}
+
+    def validate_text(text: str):
+        if text not in validated:
+            started = time.perf_counter()
+            try:
+                validated[text] = (validate(parse_json_text(text)), None)
+            except ValueError as e:
+                validated[text] = (None, e)
+            finally:
+                metrics.observe_ai(endpoint, "validate", time.perf_counter() - started)
+        result, error = validated[text]
+        if error is not None:
+            raise error
+        return result
+
+    current_prompt = prompt
+    for attempt in range(config.AI_MAX_REPAIRS + 1):
+        text, status = await generate_cached(
+            api_key, current_prompt, endpoint, cache_control, model,
+            response_schema=response_schema, validate=validate_text
+        )
+        try:
+            return validate_text(text), "repaired" if attempt else status
+        except ValueError as e:
+            print(f"[ai] {endpoint}: ongeldig antwoord (poging {attempt + 1}): {e}")
+            current_prompt = repair_prompt(prompt, text, e)
+            error = e
+    raise HTTPException(status_code=502, detail=f"Ongeldig AI antwoord voor {endpoint}: {error}")
+
+
+async def stream_content(api_key: str, prompt: str, model: str = MODEL,
+                         response_schema: Optional[Dict] = None) -> AsyncIterator[str]:
+    """Stream de tekst van Gemini chunk voor chunk (generate_content_stream)."""
+    client = client_pool.get(api_key)
+
+    def open_stream():
+        return client.aio.models.generate_content_stream(
+            model=model, contents=prompt, config=_generation_config(response_schema)
+        )
+    async for chunk in resilient.stream(open_stream):
+        if chunk.text:
+            yield chunk.text
+    verified_keys.add(api_key)
+
+
+async def stream_cached(api_key: str, prompt: str, endpoint: str,
+                        cache_control: Optional[str] = None, model: str = MODEL,
+                        response_schema: Optional[Dict] = None,
+                        validate: Optional[Callable[[str], Any]] = None) -> AsyncIterator[str]:
+    """
+    Zoals stream_content, maar met de AI cache ervoor. Een cache hit (alleen voor een geverifieerde
+    API key) komt als één chunk; een volledig gestreamd antwoord wordt achteraf in de cache opgeslagen.
+    :param validate: zoals bij generate_cached: alleen geldige antwoorden worden opgeslagen, en een
+                     ongeldig gecached antwoord wordt verwijderd en opnieuw gegenereerd
+    """
+    cache = get_ai_cache()
+    directives = cache_directives(cache_control)
+    key = ai_cache_key(_cache_model(model, response_schema), endpoint, prompt)
+
+    if cache is not None and not ({"no-cache", "no-store"} & directives) and api_key in verified_keys:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            if _is_valid(validate, cached):
+                yield cached
+                return
+            await asyncio.to_thread(cache.delete, key)
+    elif cache is not None:
+        cache.record_bypass()
+
+    log_prompt(endpoint, prompt)
+    chunks = []
+    async for text in stream_content(api_key, prompt, model, response_schema):
+        chunks.append(text)
+        yield text
+
+    text = "".join(chunks)
+    if cache is not None and "no-store" not in directives and _is_valid(validate, text):
+        await asyncio.to_thread(cache.put, key, model, endpoint, text)
+
+
+def parse_json_text(text: str):
+    """
+    Parse de JSON uit een AI antwoord. Eventuele ```json blokken en tekst
+    rondom de JSON worden weggehaald. Gooit ValueError als er geen geldige JSON in staat.
+    """
+    cleaned = text.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", cleaned, re.DOTALL)
+    if fenced:
+        cleaned = fenced.group(1).strip()
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        pass
+    # Laatste poging: van de eerste [ of { tot de laatste ] of }
+    starts = [i for i in (cleaned.find("["), cleaned.find("{")) if i != -1]
+    end = max(cleaned.rfind("]"), cleaned.rfind("}"))
+    if starts and end > min(starts):
+        try:
+            return json.loads(cleaned[min(starts):end + 1])
+        except json.JSONDecodeError as e:
+            raise ValueError(f"AI antwoord is geen geldige JSON: {e}")
+    raise ValueError("AI antwoord bevat geen JSON")
+
+
+def sse_event(event: str, data) -> str:
+    """Formatteer één server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def sse_stream(api_key: str, prompt: str, endpoint: str, result_key: str, validate: Callable[[Any], Any],
+                     response_schema: Optional[Dict] = None, cache_control: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    SSE stream voor een AI conversie: 'chunk' events met tekst terwijl Gemini schrijft,
+    en tot slot een 'result' event met de gevalideerde JSON (of een 'error' event).
+    """
+    # Eén keer parsen en valideren: stream_cached valideert al voor de cache, het resultaat hergebruiken
+    parsed = {}
+
+    def validate_text(text: str):
+        if text not in parsed:
+            parsed[text] = validate(parse_json_text(text))
+        return parsed[text]
+
+    chunks = []
+    try:
+        async for text in stream_cached(api_key, prompt, endpoint, cache_control,
+                                        response_schema=response_schema, validate=validate_text):
+            chunks.append(text)
+            yield sse_event("chunk", {"text": text})
+    except Exception as e:
+        yield sse_event("error", {"detail": str(e)})
+        return
+
+    full_text = "".join(chunks)
+    try:
+        result = validate_text(full_text)
+    except ValueError as e:
+        yield sse_event("error", {"detail": str(e), "text": full_text})
+        return
+    yield sse_event("result", {result_key: result})
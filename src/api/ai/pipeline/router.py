@@ -0,0 +1,70 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Header
+
+from api.ai.gemini import api_key_from_header, generate_structured
+from api.ai.erdtoclassdiagram.router import build_prompt as build_class_prompt
+from api.ai.userstorietoerd.router import UserStoryInput, build_prompt as build_erd_prompt, chunked_userstory_to_erd
+from api.ai.schemas import CLASS_DIAGRAM_SCHEMA, ERD_SCHEMA, validate_class_diagram, validate_erd
+from api.render import check_memory_budget, render_cached
+
+router = APIRouter()
+
+
+@router.post("/pipeline")
+async def userstory_pipeline(
+    input_data: UserStoryInput,
+    authorization: str = Header(..., description="Bearer API Key"),
+    cache_control: Optional[str] = Header(None, description="'no-cache' voor verse AI antwoorden")
+):
+    """
+    Hele keten in één request: user stories -> ERD (AI) -> classediagram (AI) -> beide drawio bestanden.
+    De ERD wordt al gerenderd terwijl de tweede AI call loopt.
+    """
+    try:
+        api_key = api_key_from_header(authorization)
+
+        # Stap 1: user stories -> ERD (grote sets in delen)
+        if input_data.chunk_by:
+            erd = await chunked_userstory_to_erd(api_key, input_data, cache_control)
+        else:
+            erd, _ = await generate_structured(
+                api_key, build_erd_prompt(input_data.user_stories), endpoint="userstorytoerd",
+                validate=validate_erd, response_schema=ERD_SCHEMA, cache_control=cache_control
+            )
+
+        # Stap 2: ERD renderen en tegelijk de ERD -> classediagram call doen
+        # (zelfde geheugenbudget als de losse generate endpoints)
+        check_memory_budget("erd", erd)
+        erd_render = asyncio.create_task(render_cached("erd", erd))
+        try:
+            class_diagram, _ = await generate_structured(
+                api_key, build_class_prompt(erd), endpoint="erdtoclassdiagram",
+                validate=validate_class_diagram, response_schema=CLASS_DIAGRAM_SCHEMA, cache_control=cache_control
+            )
+        except BaseException:
+            erd_render.cancel()
+            raise
+
+        # Stap 3: classediagram renderen
+        try:
+            check_memory_budget("classdiagram", class_diagram)
+        except HTTPException:
+            erd_render.cancel()
+            raise
+        class_entry, erd_entry = await asyncio.gather(render_cached("classdiagram", class_diagram), erd_render)
+
+        return {
+            "erd": erd,
+            "class_diagram": class_diagram,
+            "files": {
+                "erd.drawio": erd_entry.content.decode("utf-8"),
+                "class.drawio": class_entry.content.decode("utf-8"),
+            }
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
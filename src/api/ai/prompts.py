@@ -0,0 +1,54 @@
+import json
+from typing import Dict, Iterable, List
+
+from pydantic import BaseModel
+
+from core.erd.merge import estimate_tokens
+
+# Velden die de AI per taak echt nodig heeft; de rest kost alleen tokens
+STORY_FIELDS = ("title", "user_story", "description")
+# not_null en unique blijven: daaruit volgen multipliciteit en optionaliteit in het classediagram
+ERD_DROP_KEYS = ("auto_increment",)
+EMPTY = (None, "", [], {})
+
+
+def _plain(value):
+    """Pydantic modellen (ook genest) omzetten naar gewone dicts/lists."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def compact_json(data) -> str:
+    """Geminificeerde JSON voor in een prompt (geen spaties, geen ASCII-escapes)."""
+    return json.dumps(_plain(data), ensure_ascii=False, separators=(",", ":"))
+
+
+def stories_payload(user_stories: Iterable) -> str:
+    """User stories voor de ERD prompt: zonder id en acceptatiecriteria."""
+    stories = []
+    for story in _plain(list(user_stories)):
+        stories.append({key: story[key] for key in STORY_FIELDS if story.get(key)})
+    return compact_json(stories)
+
+
+def erd_payload(erd_json: List[Dict]) -> str:
+    """ERD voor de classediagram prompt: zonder auto_increment en zonder lege waarden (False blijft staan)."""
+    tables = []
+    for table in _plain(erd_json):
+        if not isinstance(table, dict):
+            continue
+        fields = [
+            {key: value for key, value in field.items() if key not in ERD_DROP_KEYS and value not in EMPTY}
+            for field in table.get("fields", []) if isinstance(field, dict)
+        ]
+        tables.append({"title": table.get("title"), "fields": fields})
+    return compact_json(tables)
+
+
+def log_prompt(endpoint: str, prompt: str):
+    print(f"[ai] {endpoint}: ~{estimate_tokens(prompt)} input tokens ({len(prompt)} tekens)")
@@ -0,0 +1,235 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+import config
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        """Houdt de latency van de laatste geslaagde upstream calls bij (voor de hedge-vertraging)."""
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[max(0, index)]
+
+    def __len__(self):
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        """
+        Faalt direct (zonder upstream call) zolang Gemini fouten geeft.
+        Na failure_threshold opeenvolgende fouten gaat de breaker open; na reset_seconds
+        mag één proefcall door (half open). Slaagt die, dan gaat de breaker weer dicht.
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probe_running:
+                self._probe_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def retry_after(self) -> int:
+        remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+        return max(1, math.ceil(remaining))
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Call afgebroken zonder uitkomst (bv. client weg): een eventuele proefcall vrijgeven."""
+        with self._lock:
+            self._probe_running = False
+
+    def stats(self) -> Dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Telt deze fout mee voor de breaker? Fouten van de aanvrager (bv. ongeldige key) niet."""
+    from google.genai import errors  # lazy: google.genai is zwaar, alleen nodig als er iets misgaat
+    if isinstance(error, errors.ClientError):
+        return error.code == 429
+    return isinstance(error, Exception)
+
+
+class ResilientCaller:
+    def __init__(self, timeout: float, hedge: bool, hedge_percentile: float, hedge_min_samples: int,
+                 breaker: CircuitBreaker):
+        """
+        Voert upstream calls uit met een deadline, optionele hedging en een circuit breaker.
+        :param timeout: maximale duur van één call (inclusief een eventuele hedge), in seconden
+        :param hedge: na de p{hedge_percentile} latency een tweede, gelijke call starten; de eerste die slaagt wint
+        :param hedge_min_samples: aantal gemeten calls voordat er gehedged wordt
+        """
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker
+        self.latency = LatencyTracker()
+        self.timeouts = 0
+        self.failures = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge:
+            return None
+        return self.latency.percentile(self.hedge_percentile, self.hedge_min_samples)
+
+    async def _hedged(self, call: Callable[[], Awaitable]):
+        first = asyncio.ensure_future(call())
+        delay = self._hedge_delay()
+        if delay is None:
+            return await first
+
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.append(asyncio.ensure_future(call()))
+            error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            raise HTTPException(
+                status_code=503, detail="AI service tijdelijk niet beschikbaar (circuit breaker open)",
+                headers={"Retry-After": str(self.breaker.retry_after())}
+            )
+
+    def _failed(self, error: BaseException) -> BaseException:
+        """Verwerk een mislukte call in de breaker; geeft de fout terug die doorgegooid moet worden."""
+        if isinstance(error, asyncio.TimeoutError):
+            self.timeouts += 1
+            self.breaker.record_failure()
+            return HTTPException(status_code=504, detail=f"AI service antwoordde niet binnen {self.timeout:g}s")
+        if is_upstream_failure(error):
+            self.failures += 1
+            self.breaker.record_failure()
+        else:
+            # Fout van de aanvrager: zegt niets over Gemini, dus de breaker blijft zoals hij is
+            # (alleen een eventuele proefcall wordt vrijgegeven)
+            self.breaker.release()
+        return error
+
+    async def call(self, call: Callable[[], Awaitable]):
+        """Voer call() uit; 503 als de breaker open staat, 504 bij een timeout."""
+        self._check_breaker()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._hedged(call), timeout=self.timeout)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            error = self._failed(e)
+            if error is e:
+                raise
+            raise error from e
+        self.latency.record(time.perf_counter() - started)
+        self.breaker.record_success()
+        return result
+
+    async def stream(self, open_stream: Callable[[], Awaitable[AsyncIterator]]) -> AsyncIterator:
+        """Zoals call, maar voor een stream: de deadline geldt per chunk en er wordt niet gehedged."""
+        self._check_breaker()
+        try:
+            iterator = await asyncio.wait_for(open_stream(), timeout=self.timeout)
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=self.timeout)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.release()
+            raise
+        except Exception as e:
+            error = self._failed(e)
+            if error is e:
+                raise
+            raise error from e
+        self.breaker.record_success()
+
+    def stats(self) -> Dict:
+        p95 = self.latency.percentile(95)
+        return {
+            "timeout_seconds": self.timeout,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "hedging": self.hedge,
+            "hedge_delay_seconds": round(self._hedge_delay(), 3) if self._hedge_delay() is not None else None,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "latency_p95_seconds": round(p95, 3) if p95 is not None else None,
+            "breaker": self.breaker.stats(),
+        }
+
+
+resilient = ResilientCaller(
+    timeout=config.AI_TIMEOUT_SECONDS,
+    hedge=config.AI_HEDGE_ENABLED,
+    hedge_percentile=config.AI_HEDGE_PERCENTILE,
+    hedge_min_samples=config.AI_HEDGE_MIN_SAMPLES,
+    breaker=CircuitBreaker(config.AI_BREAKER_FAILURES, config.AI_BREAKER_RESET_SECONDS),
+)
@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 from api.ai.erdtoclassdiagram.router import router as erdtoclassdiagram_router
 from api.ai.userstorietoerd.router import router as userstorietoerd_router
+from api.ai.pipeline.router import router as pipeline_router
+from api.ai.stats.router import router as stats_router
 
 router = APIRouter()
 
 router.include_router(erdtoclassdiagram_router)
-router.include_router(userstorietoerd_router)
\ No newline at end of file
+router.include_router(userstorietoerd_router)
+router.include_router(pipeline_router)
+router.include_router(stats_router)
\ No newline at end of file
@@ -0,0 +1,100 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+
+
+# -------------------------
+# ERD (formaat van DrawioERDGenerator)
+# -------------------------
+class ERDReference(BaseModel):
+    table: str
+    field: str
+
+
+class ERDField(BaseModel):
+    type: str = ""  # "PK", "FK" of ""
+    name: str
+    datatype: str
+    not_null: bool = False
+    unique: bool = False
+    auto_increment: bool = False
+    references: Optional[ERDReference] = None
+
+
+class ERDTable(BaseModel):
+    title: str
+    fields: List[ERDField]
+
+
+# -------------------------
+# Classediagram (formaat van DrawioClassDiagramGenerator)
+# -------------------------
+class ClassItem(BaseModel):
+    id: str
+    name: str
+    attributes: List[str] = []
+    methods: List[str] = []
+
+
+class ClassRelation(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_: str = Field(alias="from")
+    to: str
+    type: str
+
+
+class ClassDiagram(BaseModel):
+    classes: List[ClassItem]
+    relations: List[ClassRelation] = []
+
+
+ERD_ADAPTER = TypeAdapter(List[ERDTable])
+CLASS_DIAGRAM_ADAPTER = TypeAdapter(ClassDiagram)
+
+# JSON schema's voor de structured output van Gemini (response_json_schema)
+ERD_SCHEMA = ERD_ADAPTER.json_schema(by_alias=True)
+CLASS_DIAGRAM_SCHEMA = CLASS_DIAGRAM_ADAPTER.json_schema(by_alias=True)
+
+
+def _validate(adapter: TypeAdapter, data) -> Any:
+    try:
+        return adapter.validate_python(data)
+    except ValidationError as e:
+        # Compacte foutmelding, die ook in de repair prompt terechtkomt
+        problems = [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()[:10]]
+        raise ValueError("; ".join(problems))
+
+
+def validate_erd(data) -> List[Dict]:
+    """Valideer een ERD en geef het genormaliseerd terug. Gooit ValueError bij een ongeldig formaat."""
+    tables = _validate(ERD_ADAPTER, data)
+    if not tables:
+        raise ValueError("de ERD bevat geen tabellen")
+    for table in tables:
+        for field in table.fields:
+            if field.type == "FK" and field.references is None:
+                raise ValueError(f"{table.title}.{field.name}: FK zonder references")
+    return ERD_ADAPTER.dump_python(tables, by_alias=True, exclude_none=True)
+
+
+def validate_class_diagram(data) -> Dict:
+    """Valideer een classediagram en geef het genormaliseerd terug. Gooit ValueError bij een ongeldig formaat."""
+    diagram = _validate(CLASS_DIAGRAM_ADAPTER, data)
+    ids = {cls.id for cls in diagram.classes}
+    for relation in diagram.relations:
+        for class_id in (relation.from_, relation.to):
+            if class_id not in ids:
+                raise ValueError(f"relatie verwijst naar onbekende class '{class_id}'")
+    return CLASS_DIAGRAM_ADAPTER.dump_python(diagram, by_alias=True)
+
+
+def repair_prompt(prompt: str, answer: str, error: Exception) -> str:
+    """Prompt voor een nieuwe poging nadat het antwoord niet door de validatie kwam."""
+    return (
+        f"{prompt}\n\n"
+        f"Je vorige antwoord was ongeldig:\n{answer[:4000]}\n\n"
+        f"Fout: {error}\n"
+        f"Geef het volledige antwoord opnieuw, als geldige JSON exact volgens het formaat hierboven."
+    )
+
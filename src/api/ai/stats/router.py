@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from api.ai.gemini import singleflight
+from api.ai.resilience import resilient
+from core.cache.ai_cache import get_ai_cache
+
+router = APIRouter()
+
+
+@router.get("/stats")
+def ai_stats():
+    """
+    Hoeveel Gemini calls er echt gedaan zijn en hoeveel er bespaard zijn
+    door de AI cache en door het samenvoegen van identieke requests.
+    """
+    cache = get_ai_cache()
+    return {
+        "singleflight": singleflight.stats(),
+        "upstream": resilient.stats(),
+        "cache": cache.stats() if cache is not None else {"enabled": False},
+    }
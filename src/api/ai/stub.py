@@ -0,0 +1,85 @@
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import config
+
+# Vaste antwoorden van het stub model; genoeg om de hele keten (ERD -> classediagram -> drawio) te testen
+STUB_ERD = [
+    {
+        "title": "Student",
+        "fields": [
+            {"type": "PK", "name": "ID", "datatype": "INT", "not_null": True, "unique": True, "auto_increment": True},
+            {"type": "", "name": "Naam", "datatype": "VARCHAR(100)", "not_null": True}
+        ]
+    },
+    {
+        "title": "Inschrijving",
+        "fields": [
+            {"type": "PK", "name": "ID", "datatype": "INT", "not_null": True, "unique": True, "auto_increment": True},
+            {"type": "FK", "name": "StudentID", "datatype": "INT", "not_null": True, "unique": False,
+             "references": {"table": "Student", "field": "ID"}},
+            {"type": "", "name": "Datum", "datatype": "DATE", "not_null": True}
+        ]
+    }
+]
+
+STUB_CLASS_DIAGRAM = {
+    "classes": [
+        {"id": "C1", "name": "Student", "attributes": ["id: int", "naam: string"], "methods": []},
+        {"id": "C2", "name": "Inschrijving", "attributes": ["id: int", "datum: date"], "methods": []}
+    ],
+    "relations": [
+        {"from": "C2", "to": "C1", "type": "association"}
+    ]
+}
+
+
+def stub_answer(prompt: str) -> str:
+    """Kies het antwoord op basis van de taak in de prompt."""
+    if "classediagram" in prompt:
+        return json.dumps(STUB_CLASS_DIAGRAM)
+    return json.dumps(STUB_ERD)
+
+
+class _StubModels:
+    async def generate_content(self, model: str, contents: str, config=None):
+        await asyncio.sleep(_latency())
+        _maybe_fail()
+        return SimpleNamespace(text=stub_answer(contents))
+
+    async def generate_content_stream(self, model: str, contents: str, config=None):
+        text = stub_answer(contents)
+        _maybe_fail()
+
+        async def chunks():
+            latency = _latency()
+            step = max(1, len(text) // 8)
+            for i in range(0, len(text), step):
+                await asyncio.sleep(latency / 8)
+                yield SimpleNamespace(text=text[i:i + step])
+
+        return chunks()
+
+
+def _latency() -> float:
+    """Vaste vertraging plus willekeurige jitter (AI_STUB_LATENCY_JITTER_MS), in seconden."""
+    return (config.AI_STUB_LATENCY_MS + random.uniform(0, config.AI_STUB_LATENCY_JITTER_MS)) / 1000
+
+
+def _maybe_fail():
+    """Foutinjectie: een fractie (AI_STUB_FAILURE_RATE) van de calls faalt zoals een overbelaste Gemini."""
+    if config.AI_STUB_FAILURE_RATE and random.random() < config.AI_STUB_FAILURE_RATE:
+        from google.genai import errors
+        raise errors.ServerError(503, {"error": {"code": 503, "message": "stub: overloaded", "status": "UNAVAILABLE"}})
+
+
+class StubClient:
+    """
+    Lokale vervanger van genai.Client (AI_BACKEND=stub), zodat de AI endpoints
+    zonder API key en netwerk getest kunnen worden.
+    """
+
+    def __init__(self):
+        self.aio = SimpleNamespace(models=_StubModels())
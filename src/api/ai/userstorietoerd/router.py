@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Header
+import asyncio
+from fastapi import APIRouter, HTTPException, Header, Request, Response
 from pydantic import BaseModel
-from google import genai
-from typing import List
+from api.ai.gemini import api_key_from_header, generate_structured, sse_stream
+from api.compression import streaming_response
+from api.ai.prompts import stories_payload
+from api.ai.schemas import ERD_SCHEMA, validate_erd
+from core.erd.merge import merge_erds, partition_stories
+from typing import Dict, List, Literal, Optional
+import config
 
 router = APIRouter()
 
@@ -20,71 +26,128 @@ class UserStory(BaseModel):
 
 class UserStoryInput(BaseModel):
     user_stories: List[UserStory]
+    chunk_by: Optional[Literal["actor", "tokens"]] = None  # grote sets in delen (parallel) laten omzetten
+    chunk_token_budget: int = 2000  # maximaal aantal (geschatte) tokens per deel
+
+
+def build_prompt(user_stories) -> str:
+    """Prompt voor het omzetten van user stories naar een ERD."""
+    return f'''
+    Je taak is om een lijst van user stories om te zetten naar een ERD in **zuiver JSON-formaat**.  
+    ⚠️ Output moet **enkel JSON** zijn, zonder uitleg, zonder markdown, zonder ```json blokken.  
+
+    Het formaat moet exact zo zijn:
+    [
+      {{
+        "title": "TabelNaam",
+        "fields": [
+          {{"type": "PK", "name": "ID", "datatype": "INT", "not_null": true, "unique": true, "auto_increment": true}},
+          {{"type": "FK", "name": "AndereTabelID", "datatype": "INT", "not_null": true, "unique": false, "references": {{"table": "AndereTabel", "field": "ID"}}}},
+          {{"type": "", "name": "VeldNaam", "datatype": "VARCHAR(100)", "not_null": true}}
+        ]
+      }}
+    ]
+
+    Regels voor de AI:
+    1. Gebruik **alle user stories** om de tabellen en relaties te bepalen.
+    2. Zet PK en FK correct en beschrijf de referenties.
+    3. Kies datatypes logisch op basis van het veld (string → VARCHAR, boolean → BOOLEAN, datum → DATE, enz.).
+    4. Output moet altijd **een JSON-array** zijn, direct bruikbaar in code, zonder extra tekst.
+
+    Hier zijn de user stories (JSON):
+    {stories_payload(user_stories)}
+    '''
+
+
+async def chunked_userstory_to_erd(api_key: str, input_data: UserStoryInput,
+                                   cache_control: Optional[str] = None) -> List[Dict]:
+    """
+    Zet grote sets user stories in delen om: stories worden verdeeld (per actor of op tokens),
+    de deel-ERD's worden parallel (begrensd) opgevraagd en daarna deterministisch samengevoegd.
+    """
+    stories = [story.model_dump() for story in input_data.user_stories]
+    chunks = partition_stories(stories, by=input_data.chunk_by, token_budget=input_data.chunk_token_budget)
+    semaphore = asyncio.Semaphore(config.AI_CHUNK_PARALLELISM)
+
+    async def extract(chunk: List[Dict]) -> List[Dict]:
+        async with semaphore:
+            partial, _ = await generate_structured(
+                api_key, build_prompt(chunk), endpoint="userstorytoerd", validate=validate_erd,
+                response_schema=ERD_SCHEMA, cache_control=cache_control
+            )
+        return partial
+
+    partials = await asyncio.gather(*[extract(chunk) for chunk in chunks])
+    print(f"✅ {len(chunks)} deel-ERD's samengevoegd")
+    return merge_erds(partials)
 
 
 @router.post("/userstorytoerd")
 async def userstory_to_erd(
     input_data: UserStoryInput,
-    authorization: str = Header(..., description="Bearer API Key")
+    response: Response,
+    authorization: str = Header(..., description="Bearer API Key"),
+    cache_control: Optional[str] = Header(None, description="'no-cache' voor een vers AI antwoord")
 ):
     try:
         print("🔹 Endpoint /userstorytoerd aangeroepen")
-        print(f"Ontvangen authorization header: {authorization}")
         print(f"Ontvangen user stories: {input_data.user_stories}")
 
         # Haal de API Key uit de Authorization header
-        if not authorization.lower().startswith("bearer "):
-            print("❌ Ongeldige authorization header")
-            raise HTTPException(status_code=401, detail="Invalid authorization header")
-        api_key = authorization.split(" ")[1]
+        api_key = api_key_from_header(authorization)
         print(f"✅ API key succesvol opgehaald: {api_key[:5]}***")
 
-        # Initialiseer Gemini client met API Key
-        print("🔹 Initialiseren van Gemini client...")
-        client = genai.Client(api_key=api_key)
-        print("✅ Gemini client geïnitialiseerd")
+        # Grote sets: in delen parallel omzetten en samenvoegen
+        if input_data.chunk_by:
+            erd = await chunked_userstory_to_erd(api_key, input_data, cache_control)
+            response.headers["X-AI-Cache"] = "chunked"
+            return {"erd": erd}
 
         # Prompt samenstellen
-        prompt = f'''
-        Je taak is om een lijst van user stories om te zetten naar een ERD in **zuiver JSON-formaat**.  
-        ⚠️ Output moet **enkel JSON** zijn, zonder uitleg, zonder markdown, zonder ```json blokken.  
-
-        Het formaat moet exact zo zijn:
-        [
-          {{
-            "title": "TabelNaam",
-            "fields": [
-              {{"type": "PK", "name": "ID", "datatype": "INT", "not_null": true, "unique": true, "auto_increment": true}},
-              {{"type": "FK", "name": "AndereTabelID", "datatype": "INT", "not_null": true, "unique": false, "references": {{"table": "AndereTabel", "field": "ID"}}}},
-              {{"type": "", "name": "VeldNaam", "datatype": "VARCHAR(100)", "not_null": true}}
-            ]
-          }}
-        ]
-
-        Regels voor de AI:
-        1. Gebruik **alle user stories** om de tabellen en relaties te bepalen.
-        2. Zet PK en FK correct en beschrijf de referenties.
-        3. Kies datatypes logisch op basis van het veld (string → VARCHAR, boolean → BOOLEAN, datum → DATE, enz.).
-        4. Output moet altijd **een JSON-array** zijn, direct bruikbaar in code, zonder extra tekst.
-
-        Hier zijn de user stories:
-        {input_data.user_stories}
-        '''
+        prompt = build_prompt(input_data.user_stories)
 
         print("🔹 Prompt samengesteld:")
         print(prompt)
 
-        # Vraag aan Gemini
+        # Vraag aan Gemini (async, met persistente cache ervoor)
         print("🔹 Request sturen naar Gemini...")
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
+        erd, cache_status = await generate_structured(
+            api_key, prompt, endpoint="userstorytoerd", validate=validate_erd,
+            response_schema=ERD_SCHEMA, cache_control=cache_control
         )
-        print("✅ Response ontvangen van Gemini")
-        print(f"Response tekst: {response.text}")
+        response.headers["X-AI-Cache"] = cache_status
+        print(f"✅ Response ontvangen van Gemini (cache: {cache_status})")
+        print(f"ERD: {erd}")
 
-        return {"erd": response.text}
+        return {"erd": erd}
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Er trad een fout op: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/userstorytoerd/stream")
+async def userstory_to_erd_stream(
+    request: Request,
+    input_data: UserStoryInput,
+    authorization: str = Header(..., description="Bearer API Key"),
+    cache_control: Optional[str] = Header(None, description="'no-cache' voor een vers AI antwoord")
+):
+    """
+    Streamende variant: tekst chunks als server-sent events, gevolgd door
+    een 'result' event met de geparste ERD.
+    """
+    api_key = api_key_from_header(authorization)
+    if input_data.chunk_by:
+        # Delen worden parallel opgevraagd en pas aan het eind samengevoegd: daar valt niets aan te streamen
+        raise HTTPException(status_code=400, detail="chunk_by wordt niet ondersteund bij /stream; "
+                                                    "gebruik POST /api/ai/userstorytoerd")
+    prompt = build_prompt(input_data.user_stories)
+    return streaming_response(
+        request,
+        sse_stream(api_key, prompt, "userstorytoerd", "erd", validate_erd, ERD_SCHEMA, cache_control),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,41 @@
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from fastapi.templating import Jinja2Templates
+
+from core.assets.store import Asset, AssetStore
+from core.cache.response_cache import etag_matches
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"  # wel cachen, maar elke keer (goedkoop, via ETag/304) controleren
+
+
+def asset_response(request: Request, asset: Asset, cache_control: str = REVALIDATE) -> Response:
+    """Antwoord met de best passende vooraf gecomprimeerde variant, of een 304 bij een passende ETag."""
+    content, encoding = asset.body(request.headers.get("accept-encoding"))
+    etag = asset.variant_etag(encoding)
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=asset.media_type, headers=headers)
+
+
+def static_response(request: Request, store: AssetStore, path: str) -> Response:
+    """/static: met content hash in de naam een jaar (immutable) cachebaar, anders revalideren."""
+    asset, immutable = store.resolve(path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return asset_response(request, asset, IMMUTABLE if immutable else REVALIDATE)
+
+
+def prerender_pages(templates: Jinja2Templates, names) -> AssetStore:
+    """
+    Render de templates één keer bij het opstarten. Ze hebben geen dynamische inhoud,
+    dus elke request kan dezelfde (vooraf gecomprimeerde) bytes krijgen.
+    """
+    store = AssetStore()
+    for name in names:
+        html = templates.get_template(name).render(request=None)
+        store.add(name, html.encode("utf-8"), "text/html; charset=utf-8")
+    return store
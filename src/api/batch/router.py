@@ -0,0 +1,132 @@
+import asyncio
+import json
+import re
+import zipfile
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+import config
+from api.render import check_memory_budget, render_cached
+from core.render.registry import ARTIFACTS, resolve_kind
+
+router = APIRouter(tags=["Batch"])
+
+# Formaten die zelf al een zip zijn hoeven niet nogmaals gecomprimeerd te worden
+STORED_EXTENSIONS = {"docx", "xlsx"}
+
+
+class BatchJob(BaseModel):
+    kind: str  # erd, classdiagram, usecases, narratives, scrumboard, userstories
+    data: Any  # zelfde JSON als het losse generate endpoint verwacht
+    name: Optional[str] = None  # bestandsnaam in de zip (zonder extensie)
+    format: Optional[str] = None  # alleen voor userstories: txt of docx
+
+
+class BatchInput(BaseModel):
+    jobs: List[BatchJob]
+
+
+class _ZipStream:
+    """Schrijfbare, niet-seekbare buffer die zipfile gebruikt om chunks te verzamelen."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w\-. ]+", "_", name).strip(" .") or "job"
+
+
+def _write_entry(archive: zipfile.ZipFile, filename: str, content: bytes, extension: str):
+    compression = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    archive.writestr(filename, content, compress_type=compression)
+
+
+async def _run_job(index: int, job: BatchJob, semaphore: asyncio.Semaphore):
+    """Voert één job uit; fouten worden teruggegeven in plaats van gegooid."""
+    async with semaphore:
+        try:
+            kind = resolve_kind(job.kind, job.format)
+            check_memory_budget(kind, job.data)
+            entry = await render_cached(kind, job.data)
+            return index, kind, entry.content, None
+        except HTTPException as e:
+            return index, job.kind, None, str(e.detail)
+        except Exception as e:
+            return index, job.kind, None, str(e) or e.__class__.__name__
+
+
+async def _stream_zip(jobs: List[BatchJob]):
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, mode="w")
+    semaphore = asyncio.Semaphore(config.BATCH_MAX_PARALLEL)
+    tasks = [asyncio.ensure_future(_run_job(i, job, semaphore)) for i, job in enumerate(jobs)]
+
+    manifest = []
+    used_names = set()
+    try:
+        # Elke job wordt in de zip geschreven zodra hij klaar is
+        for next_done in asyncio.as_completed(tasks):
+            index, kind, content, error = await next_done
+            job = jobs[index]
+            base = _safe_name(job.name) if job.name else f"{index + 1:03d}_{job.kind}"
+            extension = ARTIFACTS[kind][0] if kind in ARTIFACTS else "txt"
+
+            filename = f"{base}.{extension}"
+            counter = 2
+            while filename in used_names:
+                filename = f"{base}_{counter}.{extension}"
+                counter += 1
+            used_names.add(filename)
+
+            if error is None:
+                await asyncio.to_thread(_write_entry, archive, filename, content, extension)
+                manifest.append({"index": index, "kind": job.kind, "file": filename, "status": "ok"})
+            else:
+                manifest.append({"index": index, "kind": job.kind, "status": "error", "error": error})
+
+            chunk = stream.pop()
+            if chunk:
+                yield chunk
+
+        manifest.sort(key=lambda item: item["index"])
+        archive.writestr("manifest.json", json.dumps({"jobs": manifest}, indent=2, ensure_ascii=False))
+        archive.close()
+        yield stream.pop()
+    finally:
+        # Client weg of fout: openstaande jobs annuleren
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("", response_class=StreamingResponse)
+async def batch_generate(input_data: BatchInput):
+    """
+    Voert een lijst van (verschillende) generate jobs gelijktijdig uit en streamt
+    het resultaat als ZIP. Een mislukte job breekt de zip niet af maar komt in manifest.json.
+    """
+    if not input_data.jobs:
+        raise HTTPException(status_code=422, detail="Geen jobs opgegeven")
+    if len(input_data.jobs) > config.BATCH_MAX_JOBS:
+        raise HTTPException(status_code=413, detail=f"Maximaal {config.BATCH_MAX_JOBS} jobs per batch")
+
+    return StreamingResponse(
+        _stream_zip(input_data.jobs),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=batch.zip"}
+    )
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from core.cache.response_cache import get_response_cache
+
+router = APIRouter(tags=["Cache"])
+
+
+@router.get("/stats")
+def cache_stats():
+    """
+    Hit ratio en bespaarde bytes van de response cache.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response, JSONResponse
 from pydantic import BaseModel
-from core.classdiagram.compiler import DrawioClassDiagramGenerator
+from api.render import render_response
 from core.classdiagram.userstorietoclassdiagram import userstories_to_classdiagram
+from core.classdiagram.erdtoclassdiagram import erd_to_classdiagram
 from typing import List, Dict
 
 router = APIRouter(tags=["CLASSDIAGRAM"])
@@ -15,18 +16,22 @@ class classInput(BaseModel):
     data: Dict  # Verwacht nu een dict met 'classes' en 'relations'
 
 
+class ERDInput(BaseModel):
+    data: List[Dict]  # ERD JSON (zelfde formaat als /api/erd/generate)
+
+
 @router.post("/generate", response_class=Response)
-def generate_class(input_data: classInput):
+async def generate_class(input_data: classInput, request: Request):
     try:
-        class_generator = DrawioClassDiagramGenerator()
-        # De generator verwacht waarschijnlijk een JSON string
-        xml_output = class_generator.run(json_data=input_data.data)
-
-        return Response(
-            content=xml_output,
+        return await render_response(
+            request, "classdiagram", input_data.data,
             media_type="application/xml",
-            headers={"Content-Disposition": "attachment; filename=class.drawio"}
+            filename="class.drawio"
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -41,4 +46,18 @@ def compile_userstories(input_data: UserStoryInput):
         print(result)
         return JSONResponse(content=result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Fout bij compileren van user stories: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Fout bij compileren van user stories: {str(e)}")
+
+
+@router.post("/erdtoclassdiagram")
+def compile_erd(input_data: ERDInput):
+    """
+    Zet een ERD regelgebaseerd om naar classediagram JSON (zonder AI, direct klaar).
+    Gebruik /api/ai/erdtoclassdiagram alleen nog om het resultaat te verfijnen.
+    """
+    try:
+        return erd_to_classdiagram(input_data.data)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Ongeldige ERD: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fout bij omzetten van de ERD: {str(e)}")
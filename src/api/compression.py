@@ -0,0 +1,56 @@
+import asyncio
+from typing import AsyncIterator, Dict, Optional, Union
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+import config
+from core.compression.codecs import StreamCompressor, available, negotiate
+from core.render.registry import DOCX, XLSX
+
+# Formaten die zelf al een zip zijn: nogmaals comprimeren kost CPU en levert niets op
+PRECOMPRESSED_MEDIA_TYPES = {DOCX, XLSX, "application/zip"}
+# Grotere chunks in een thread comprimeren, zodat de event loop niet blijft hangen
+STREAM_OFFLOAD_BYTES = 64 * 1024
+
+
+def is_compressible(media_type: str) -> bool:
+    return config.RESPONSE_COMPRESSION and media_type.split(";")[0].strip() not in PRECOMPRESSED_MEDIA_TYPES
+
+
+def response_encoding(request: Request, media_type: str, size: int) -> Optional[str]:
+    """Content-Encoding voor een response van 'size' bytes, of None (te klein, al gecomprimeerd, niet gevraagd)."""
+    if size < config.RESPONSE_COMPRESSION_MIN_BYTES or not is_compressible(media_type):
+        return None
+    return negotiate(request.headers.get("accept-encoding"), available())
+
+
+def vary_headers(media_type: str) -> Dict[str, str]:
+    """
+    Vary voor elke response waarvan de inhoud van Accept-Encoding kan afhangen, ook de ongecomprimeerde:
+    anders geeft een gedeelde cache die aan een client die wel gzip wil (en andersom).
+    """
+    return {"Vary": "Accept-Encoding"} if is_compressible(media_type) else {}
+
+
+async def _compressed(iterator: AsyncIterator[Union[str, bytes]], encoding: str) -> AsyncIterator[bytes]:
+    compressor = StreamCompressor(encoding)
+    async for chunk in iterator:
+        data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        # SSE events zijn klein: direct comprimeren is goedkoper dan een thread hop
+        if len(data) < STREAM_OFFLOAD_BYTES:
+            yield compressor.compress(data)
+        else:
+            yield await asyncio.to_thread(compressor.compress, data)
+    yield compressor.finish()
+
+
+def streaming_response(request: Request, iterator: AsyncIterator[Union[str, bytes]], media_type: str,
+                       headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """StreamingResponse die per chunk comprimeert als de client dat accepteert."""
+    headers = {**(headers or {}), **vary_headers(media_type)}
+    encoding = negotiate(request.headers.get("accept-encoding"), available()) if is_compressible(media_type) else None
+    if encoding is not None:
+        iterator = _compressed(iterator, encoding)
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(iterator, media_type=media_type, headers=headers)
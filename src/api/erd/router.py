@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
 from pydantic import BaseModel
-from core.erd.compiler import DrawioERDGenerator
+from api.render import render_response
+from core.erd.userstorietoerd import userstories_to_erd
 from typing import List, Dict
 
 router = APIRouter(tags=["ERD"])
@@ -11,17 +12,32 @@ class ERDInput(BaseModel):
     data: List[Dict]  # JSON structuur van de database/entities
 
 
+class UserStoryInput(BaseModel):
+    data: List[Dict]  # JSON user stories
+
+
 @router.post("/generate", response_class=Response)
-def generate_erd(input_data: ERDInput):
+async def generate_erd(input_data: ERDInput, request: Request):
     try:
-        erd_generator = DrawioERDGenerator()
-        # De generator verwacht waarschijnlijk een JSON string
-        xml_output = erd_generator.run(json=input_data.data)
-
-        return Response(
-            content=xml_output,
+        return await render_response(
+            request, "erd", input_data.data,
             media_type="application/xml",
-            headers={"Content-Disposition": "attachment; filename=erd.drawio"}
+            filename="erd.drawio"
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/userstorietoerd")
+def compile_userstories(input_data: UserStoryInput):
+    """
+    Snelle concept-ERD uit user stories, zonder AI (werkt ook zonder API key / offline).
+    """
+    try:
+        return userstories_to_erd(input_data.data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fout bij compileren van user stories: {str(e)}")
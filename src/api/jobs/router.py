@@ -0,0 +1,79 @@
+import asyncio
+import os
+from typing import Any, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+from api.render import check_memory_budget
+from core.jobs.queue import get_job_queue, DONE, FAILED
+from core.render.registry import ARTIFACTS, resolve_kind
+
+router = APIRouter(tags=["Jobs"])
+
+
+class JobInput(BaseModel):
+    kind: str  # erd, classdiagram, usecases, narratives, scrumboard, userstories
+    data: Any  # zelfde JSON als het losse generate endpoint verwacht
+    format: Optional[str] = None  # alleen voor userstories: txt of docx
+
+
+def _job_status(job: dict) -> dict:
+    status = {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "attempts": job["attempts"],
+        "status_url": f"/api/jobs/{job['id']}",
+    }
+    if job["status"] == DONE:
+        status["result_url"] = f"/api/jobs/{job['id']}/result"
+        status["result_size"] = job["result_size"]
+    if job["status"] == FAILED:
+        status["error"] = job["error"]
+    return status
+
+
+async def _get_job(job_id: str) -> dict:
+    job = await asyncio.to_thread(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job niet gevonden (of verlopen)")
+    return job
+
+
+@router.post("", status_code=202)
+async def submit_job(input_data: JobInput):
+    """
+    Zet een (grote) generate opdracht in de wachtrij. Poll daarna de status_url
+    en download het resultaat via de result_url.
+    """
+    try:
+        kind = resolve_kind(input_data.kind, input_data.format)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    check_memory_budget(kind, input_data.data, job=True)
+
+    queue = get_job_queue()
+    job_id = await asyncio.to_thread(queue.submit, kind, input_data.data)
+    return _job_status(await _get_job(job_id))
+
+
+@router.get("/{job_id}")
+async def job_status(job_id: str):
+    return _job_status(await _get_job(job_id))
+
+
+@router.get("/{job_id}/result")
+async def job_result(job_id: str):
+    job = await _get_job(job_id)
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=409, detail=f"Job mislukt: {job['error']}")
+    if job["status"] != DONE or not job["result_path"] or not os.path.exists(job["result_path"]):
+        raise HTTPException(status_code=409, detail=f"Job is nog niet klaar (status: {job['status']})")
+
+    extension, media_type = ARTIFACTS[job["kind"]]
+    return FileResponse(job["result_path"], media_type=media_type, filename=f"{job['kind'].split('_')[0]}.{extension}")
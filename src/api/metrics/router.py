@@ -0,0 +1,86 @@
+import time
+from typing import Dict, Iterable
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api.ai.gemini import singleflight
+from api.ai.resilience import OPEN, resilient
+from core.cache.ai_cache import get_ai_cache
+from core.cache.response_cache import get_response_cache
+from core.metrics.registry import metrics
+from core.render.executor import get_executor
+
+router = APIRouter(tags=["Metrics"])
+
+
+def _gauges(prefix: str, stats: Dict, help_text: str) -> Iterable:
+    """Numerieke waarden uit een stats() dict als gauges (geneste dicts worden met '_' samengevoegd)."""
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            yield from _gauges(name, value, help_text)
+        elif isinstance(value, (bool, int, float)):
+            yield name, "gauge", help_text, [({}, float(value))]
+
+
+def _collect_stats():
+    """De bestaande stats van cache, AI en executor, bij elke scrape opnieuw uitgelezen."""
+    cache = get_response_cache()
+    if cache is not None:
+        yield from _gauges("response_cache", cache.stats(), "Response cache (zie /api/cache/stats)")
+    ai_cache = get_ai_cache()
+    if ai_cache is not None:
+        yield from _gauges("ai_cache", ai_cache.stats(), "AI cache (zie /api/ai/stats)")
+    yield from _gauges("ai_singleflight", singleflight.stats(), "Samengevoegde AI requests")
+    upstream = resilient.stats()
+    upstream.pop("breaker")
+    yield from _gauges("ai_upstream", upstream, "Gemini calls (timeouts, hedging)")
+    yield "ai_upstream_breaker_open", "gauge", "1 als de circuit breaker open staat", [
+        ({}, float(resilient.breaker.state == OPEN))
+    ]
+
+    executor = get_executor().stats()
+    yield "render_pending", "gauge", "Generate requests in behandeling (wachtend + lopend)", [({}, executor["pending"])]
+    yield "render_pending_per_kind", "gauge", "Generate requests in behandeling per soort", [
+        ({"kind": kind}, pending) for kind, pending in executor["pending_per_kind"].items()
+    ]
+
+
+metrics.add_collector(_collect_stats)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Alle metrics in het Prometheus text formaat."""
+    return PlainTextResponse(metrics.render_text(), media_type="text/plain; version=0.0.4")
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        """ASGI middleware die de duur van elke HTTP request per route (template) meet."""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            metrics.http_duration.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                # Route template (bv. /api/jobs/{job_id}) i.p.v. het pad, anders explodeert het aantal series
+                route=getattr(route, "path", "onbekend"),
+                status=status["code"],
+            )
@@ -1,9 +1,8 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import List, Dict
-from io import BytesIO
-from core.narratives.compiler import UseCaseDocGenerator  # jouw class
+from api.render import render_response
 
 router = APIRouter(tags=["Narratives DOCX"])
 
@@ -12,19 +11,19 @@ class NarrativeInput(BaseModel):
     data: Dict  # JSON structuur van de use case / narratives
 
 
-@router.post("/generate", response_class=StreamingResponse)
-def generate_narrative_doc(input_data: NarrativeInput):
+@router.post("/generate", response_class=Response)
+async def generate_narrative_doc(input_data: NarrativeInput, request: Request):
     try:
-        # Maak de generator aan met de JSON data
-        generator = UseCaseDocGenerator(input_data.data)
-        doc_bytes = generator.generate_docx_bytes()
-
         # Return als DOCX download
-        return StreamingResponse(
-            BytesIO(doc_bytes),
+        return await render_response(
+            request, "narratives", input_data.data,
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": "attachment; filename=narrative.docx"}
+            filename="narrative.docx"
         )
 
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from api.admin import require_admin
+from core.metrics.profiles import get_profile_store
+
+router = APIRouter(tags=["Profiles"], dependencies=[Depends(require_admin)])
+
+
+@router.get("")
+def list_profiles():
+    """Bewaarde profielen (nieuwste eerst) met de drie duurste functies."""
+    return get_profile_store().list()
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str):
+    profile = get_profile_store().get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profiel niet gevonden (of al geroteerd)")
+    return profile
+
+
+@router.get("/{profile_id}/download")
+def download_profile(profile_id: str):
+    """Ruwe pstats data, te openen met python -m pstats of snakeviz."""
+    path = get_profile_store().stats_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profiel niet gevonden (of al geroteerd)")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
@@ -0,0 +1,166 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+import config
+from api.admin import is_admin
+from api.compression import response_encoding, vary_headers
+from core.cache.response_cache import CacheEntry, content_key, etag_matches, get_response_cache, variant_etag
+from core.metrics.memory import MB, estimate_peak_bytes
+from core.metrics.profiles import get_profile_store
+from core.metrics.registry import metrics
+from core.render.executor import get_executor, RenderQueueFull
+
+
+def _queue_full(e: RenderQueueFull) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+async def render(kind: str, data) -> bytes:
+    """
+    Render een artefact via de executor. Een volle queue wordt een 429 met Retry-After.
+    """
+    try:
+        if not metrics.enabled:
+            return await get_executor().run(kind, data)
+        content, report = await get_executor().run_with_report(kind, data)
+        metrics.observe_render(kind, report)
+        return content
+    except RenderQueueFull as e:
+        raise _queue_full(e)
+
+
+def memory_budget_mb(kind: str, job: bool = False) -> int:
+    """Budget in MB voor een render soort (MEMORY_BUDGETS_MB kent ook 'userstories'); 0 = geen budget."""
+    if job:
+        return config.JOB_MEMORY_BUDGET_MB
+    budgets = config.MEMORY_BUDGETS_MB
+    return budgets.get(kind, budgets.get(kind.split("_")[0], config.MEMORY_BUDGET_MB))
+
+
+def check_memory_budget(kind: str, data, input_bytes: Optional[int] = None, job: bool = False):
+    """
+    Weiger een render vooraf (413) als de geschatte geheugenpiek boven het budget ligt,
+    in plaats van de container halverwege door de OOM killer te laten stoppen.
+    :param input_bytes: grootte van de JSON input; zonder wordt die uitgerekend
+    """
+    budget = memory_budget_mb(kind, job)
+    if budget <= 0:
+        return
+    if input_bytes is None:
+        input_bytes = len(json.dumps(data, separators=(",", ":")))
+    estimate = estimate_peak_bytes(kind, input_bytes)
+    if estimate <= budget * MB:
+        return
+
+    metrics.memory_rejections.inc(kind=kind)
+    detail = f"Input te groot voor '{kind}': geschatte geheugenpiek {estimate / MB:.0f} MB, budget {budget} MB."
+    job_budget = config.JOB_MEMORY_BUDGET_MB
+    if not job and (job_budget <= 0 or estimate <= job_budget * MB):
+        detail += " Gebruik POST /api/jobs voor grote inputs."
+    else:
+        detail += " Splits de input op in kleinere delen."
+    raise HTTPException(status_code=413, detail=detail)
+
+
+def _content_length(request: Request) -> Optional[int]:
+    try:
+        return int(request.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def profile_requested(request: Request) -> bool:
+    """?profile=1 of een 'X-Profile: 1' header; alleen toegestaan voor beheerders."""
+    requested = request.query_params.get("profile") or request.headers.get("x-profile")
+    if requested not in ("1", "true"):
+        return False
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Profiling is alleen voor beheerders (X-Admin-Token)")
+    return True
+
+
+async def render_profiled(kind: str, data):
+    """
+    Render onder de profiler (zonder cache, anders wordt er niets gerenderd).
+    Het profiel wordt in de roterende profielmap bewaard.
+    Geeft (bytes, profiel id, top functies) terug.
+    """
+    try:
+        content, report = await get_executor().run_profiled(kind, data)
+    except RenderQueueFull as e:
+        raise _queue_full(e)
+    metrics.observe_render(kind, report)
+    profile = report["profile"]
+    profile_id = await asyncio.to_thread(get_profile_store().save, kind, profile)
+    return content, profile_id, profile["top"]
+
+
+async def render_cached(kind: str, data):
+    """
+    Render een artefact met de content-addressed cache ervoor.
+    Geeft een CacheEntry terug (bytes + ETag).
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return CacheEntry(await render(kind, data))
+
+    key = content_key(kind, data)
+    entry = cache.get_memory(key)
+    if entry is None:
+        entry = await asyncio.to_thread(cache.get_disk, key)
+    if entry is not None:
+        return entry
+
+    cache.record_miss()
+    content = await render(kind, data)
+    return await asyncio.to_thread(cache.put, key, content)
+
+
+async def render_response(request: Request, kind: str, data, media_type: str,
+                          filename: Optional[str] = None) -> Response:
+    """
+    Render een artefact en bouw het antwoord met een sterke ETag.
+    Bij een passende If-None-Match header volgt een 304 zonder body.
+    Tekstformaten (drawio, txt) worden gecomprimeerd als de client dat accepteert;
+    de gecomprimeerde variant blijft bij de cache entry voor volgende hits.
+    """
+    check_memory_budget(kind, data, _content_length(request))
+
+    if profile_requested(request):
+        content, profile_id, top = await render_profiled(kind, data)
+        headers = {
+            "X-Profile-Id": profile_id,
+            "X-Profile-Url": f"/api/profiles/{profile_id}",
+            "X-Profile-Top": "; ".join(f"{row['function']}={row['cumtime']:.4f}s" for row in top[:5]),
+        }
+        if filename:
+            headers["Content-Disposition"] = f"attachment; filename={filename}"
+        return Response(content=content, media_type=media_type, headers=headers)
+
+    entry = await render_cached(kind, data)
+    encoding = response_encoding(request, media_type, entry.size)
+    etag = variant_etag(entry.etag, encoding)
+    headers = {"ETag": etag, **vary_headers(media_type)}
+
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or etag_matches(if_none_match, entry.etag):
+        cache = get_response_cache()
+        if cache is not None:
+            cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
+    if encoding is None:
+        return Response(content=entry.content, media_type=media_type, headers=headers)
+
+    # Comprimeren van een groot diagram kost tientallen ms: niet op de event loop
+    content = entry.variants.get(encoding)
+    if content is None:
+        content = await asyncio.to_thread(entry.compressed, encoding)
+    headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=media_type, headers=headers)
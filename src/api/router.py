@@ -6,6 +6,10 @@ from api.classdiagram.router import router as classdiagram_router
 from api.narratives.router import router as narratives_router
 from api.usecases.router import router as usecases_router
 from api.ai.router import router as ai_router
+from api.cache.router import router as cache_router
+from api.batch.router import router as batch_router
+from api.jobs.router import router as jobs_router
+from api.profiles.router import router as profiles_router
 
 router = APIRouter()
 
@@ -15,4 +19,8 @@ router.include_router(scrumboard_router, prefix="/scrumboard")
 router.include_router(classdiagram_router, prefix="/classdiagram")
 router.include_router(narratives_router, prefix="/narratives")
 router.include_router(usecases_router, prefix="/usecases")
-router.include_router(ai_router, prefix="/ai")
\ No newline at end of file
+router.include_router(ai_router, prefix="/ai")
+router.include_router(cache_router, prefix="/cache")
+router.include_router(batch_router, prefix="/batch")
+router.include_router(jobs_router, prefix="/jobs")
+router.include_router(profiles_router, prefix="/profiles")
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import List, Dict
-from core.scrumboard.compiler import ScrumboardExcelExporter
+from api.render import render_response
 
 router = APIRouter(tags=["Scrumboard"])
 
@@ -12,17 +12,19 @@ class ScrumboardInput(BaseModel):
 
 
 @router.post("/generate/excel", response_class=Response)
-def generate_scrumboard_excel(input_data: ScrumboardInput):
+async def generate_scrumboard_excel(input_data: ScrumboardInput, request: Request):
     """
     Endpoint die een JSON Scrumboard omzet naar Excel en het bestand terugstuurt.
     """
     try:
-        exporter = ScrumboardExcelExporter(input_data.data)
-        excel_bytes = exporter.run()
-        return Response(
-            content=excel_bytes,
+        return await render_response(
+            request, "scrumboard", input_data.data,
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=scrumboard.xlsx"}
+            filename="scrumboard.xlsx"
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,11 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response, JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
-# Importeer de DrawioUseCaseDiagramGenerator vanuit de juiste module
-# Vervang 'jouw_module.drawio_generator' door het daadwerkelijke pad naar het bestand
-from core.usecases.compiler import DrawioUseCaseDiagramGenerator
+from api.render import render_response
 from core.usecases.userstorietousecase import userstories_to_usecase_json
 
 router = APIRouter(tags=["USECASEDIAGRAM"])
@@ -32,19 +30,20 @@ class UseCaseInput(BaseModel):
     relations: List[Relation]
 
 @router.post("/generate", response_class=Response)
-def generate_usecase_diagram(input_data: UseCaseInput):
+async def generate_usecase_diagram(input_data: UseCaseInput, request: Request):
     """
     Genereert een Draw.io XML-bestand voor een use-case diagram op basis van JSON-input.
     """
     try:
-        usecase_generator = DrawioUseCaseDiagramGenerator()
-        xml_output = usecase_generator.run(input_data.dict())
-
-        return Response(
-            content=xml_output,
+        return await render_response(
+            request, "usecases", input_data.dict(),
             media_type="application/xml",
-            headers={"Content-Disposition": "attachment; filename=use_case_diagram.drawio"}
+            filename="use_case_diagram.drawio"
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fout bij het genereren van het use-case diagram: {str(e)}")
 
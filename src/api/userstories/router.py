@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Response, HTTPException
+from fastapi import APIRouter, Response, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Dict
-from core.userstories.compiler import UserStoryCompiler
+from api.render import render_response
 
 router = APIRouter(tags=["UserStory Compiler"])
 
@@ -11,44 +11,47 @@ class UserStoryInput(BaseModel):
 
 
 @router.post("/generate/txt", response_class=Response)
-def compile_to_txt(input_data: UserStoryInput):
+async def compile_to_txt(input_data: UserStoryInput, request: Request):
     try:
-        compiler = UserStoryCompiler(input_data.data)
-        txt_bytes = compiler.to_txt()
-
-        return Response(
-            content=txt_bytes,
+        return await render_response(
+            request, "userstories_txt", input_data.data,
             media_type="text/plain",
-            headers={"Content-Disposition": "attachment; filename=userstories.txt"}
+            filename="userstories.txt"
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/generate/docx", response_class=Response)
-def compile_to_docx(input_data: UserStoryInput):
+async def compile_to_docx(input_data: UserStoryInput, request: Request):
     try:
-        compiler = UserStoryCompiler(input_data.data)
-        docx_bytes = compiler.to_docx()
-
-        return Response(
-            content=docx_bytes,
+        return await render_response(
+            request, "userstories_docx", input_data.data,
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": "attachment; filename=userstories.docx"}
+            filename="userstories.docx"
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/generate/string", response_class=Response)
-def compile_to_string(input_data: UserStoryInput):
+async def compile_to_string(input_data: UserStoryInput, request: Request):
     try:
-        compiler = UserStoryCompiler(input_data.data)
-        string_output = compiler.to_string()
-
-        return Response(
-            content=string_output,
+        return await render_response(
+            request, "userstories_string", input_data.data,
             media_type="text/plain"
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
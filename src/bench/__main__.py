@@ -0,0 +1,70 @@
+"""
+Benchmarks voor de core compilers (vanuit src/ draaien):
+
+    python -m bench                          # alle cases, alle schalen
+    python -m bench --case erd --scale s m   # selectie
+    python -m bench --save                   # resultaat als nieuwe baseline bewaren
+    python -m bench --threshold 0.1          # strenger vergelijken met de baseline
+
+Exit code 1 als er ten opzichte van de baseline een regressie is.
+"""
+import argparse
+import os
+import sys
+from typing import Optional
+
+from bench.runner import CASES, compare, load_baseline, run, save_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "baseline.json")
+
+
+def _format_bytes(value: Optional[int]) -> str:
+    if value is None:
+        return "-"
+    for unit in ("B", "kB", "MB"):
+        if value < 1024 or unit == "MB":
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+
+
+def _print_result(name: str, scale: str, result: dict):
+    print(f"{name + '/' + scale:28} {result['median_seconds'] * 1000:10.2f}ms {_format_bytes(result['peak_bytes']):>10} "
+          f"{_format_bytes(result['input_bytes']):>10} "
+          f"{_format_bytes(result['output_bytes']):>10}", flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmarks voor de core compilers")
+    parser.add_argument("--case", nargs="*", choices=list(CASES), help="alleen deze cases")
+    parser.add_argument("--scale", nargs="*", choices=["s", "m", "l"], help="alleen deze schalen")
+    parser.add_argument("--repeat", type=int, default=3, help="aantal gemeten runs per case (mediaan)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="pad van de baseline (JSON)")
+    parser.add_argument("--save", action="store_true", help="resultaat als baseline bewaren")
+    parser.add_argument("--threshold", type=float, default=0.25, help="toegestane verslechtering (fractie)")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':28} {'mediaan':>12} {'piek':>10} {'input':>10} {'output':>10}")
+    report = run(args.case, args.scale, args.repeat, progress=_print_result)
+
+    baseline = load_baseline(args.baseline)
+    regressions = compare(report, baseline, args.threshold) if baseline else []
+    if baseline is None:
+        print(f"\nGeen baseline gevonden ({args.baseline}); bewaar er een met --save")
+    elif regressions:
+        print(f"\n{len(regressions)} regressie(s) t.o.v. baseline van {baseline.get('created_at')}:")
+        for r in regressions:
+            print(f"  {r['case']:28} {r['metric']:15} {r['baseline']:.6g} -> {r['current']:.6g}")
+    else:
+        print(f"\nGeen regressies t.o.v. baseline van {baseline.get('created_at')}")
+
+    if args.save:
+        if baseline and (args.case or args.scale):
+            # Deelrun: alleen de gemeten cases in de bestaande baseline vervangen
+            report["results"] = {**baseline.get("results", {}), **report["results"]}
+        save_baseline(report, args.baseline)
+        print(f"Baseline bewaard in {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
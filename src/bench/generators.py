@@ -0,0 +1,131 @@
+import random
+from typing import Dict, List
+
+# Woordenlijsten voor realistische namen en teksten
+ACTORS = ["student", "docent", "mentor", "beheerder", "ouder", "roostermaker", "decaan", "bezoeker"]
+NOUNS = ["cursus", "cijfer", "les", "rooster", "lokaal", "toets", "opdracht", "klas", "vak", "bericht",
+         "inschrijving", "afspraak", "rapport", "module", "groep", "periode"]
+VERBS = ["bekijken", "toevoegen", "wijzigen", "inplannen", "beoordelen", "versturen", "exporteren"]
+DATATYPES = ["INT", "VARCHAR(100)", "VARCHAR(255)", "DATE", "DATETIME", "DECIMAL(8,2)", "BOOLEAN", "TEXT"]
+
+
+def _rng(seed: int) -> random.Random:
+    # Vaste seed: elke run (en elke baseline) krijgt exact dezelfde input
+    return random.Random(seed)
+
+
+def erd(tables: int, fields: int = 6, fks: int = 1, seed: int = 1) -> List[Dict]:
+    """
+    ERD voor DrawioERDGenerator: 'tables' tabellen met elk een PK, 'fields' gewone velden
+    en (waar mogelijk) 'fks' foreign keys naar eerdere tabellen.
+    """
+    rng = _rng(seed)
+    result = []
+    for i in range(tables):
+        title = f"{NOUNS[i % len(NOUNS)].capitalize()}{i}"
+        table_fields = [{"type": "PK", "name": "ID", "datatype": "INT", "not_null": True, "unique": True,
+                         "auto_increment": True}]
+        for j in range(fields):
+            table_fields.append({"type": "", "name": f"Veld{j}", "datatype": rng.choice(DATATYPES),
+                                 "not_null": rng.random() < 0.5})
+        for target in rng.sample(range(i), min(fks, i)):
+            table_fields.append({
+                "type": "FK", "name": f"{result[target]['title']}ID", "datatype": "INT", "not_null": True,
+                "references": {"table": result[target]["title"], "field": "ID"}
+            })
+        result.append({"title": title, "fields": table_fields})
+    return result
+
+
+def classdiagram(classes: int, relations: int = None, attributes: int = 4, methods: int = 2,
+                 seed: int = 1) -> Dict:
+    """Classediagram voor DrawioClassDiagramGenerator; standaard één relatie per class."""
+    rng = _rng(seed)
+    relations = classes - 1 if relations is None else relations
+    items = [{
+        "id": f"C{i}",
+        "name": f"{NOUNS[i % len(NOUNS)].capitalize()}{i}",
+        "attributes": [f"veld{j}: {rng.choice(['int', 'string', 'date', 'bool'])}" for j in range(attributes)],
+        "methods": [f"{rng.choice(VERBS)}{j}()" for j in range(methods)],
+    } for i in range(classes)]
+    links = []
+    for _ in range(max(0, relations) if classes > 1 else 0):
+        source, target = rng.sample(range(classes), 2)
+        links.append({"from": f"C{source}", "to": f"C{target}",
+                      "type": rng.choice(["association", "inheritance", "composition"])})
+    return {"classes": items, "relations": links}
+
+
+def usecases(actors: int, use_cases: int, seed: int = 1) -> Dict:
+    """Use case diagram voor DrawioUseCaseDiagramGenerator; elke use case hoort bij één actor."""
+    rng = _rng(seed)
+    actor_items = [{"id": f"A{i}", "name": f"{ACTORS[i % len(ACTORS)].capitalize()}{i}"} for i in range(actors)]
+    case_items = [{"id": f"UC{i}", "name": f"{NOUNS[i % len(NOUNS)]} {VERBS[i % len(VERBS)]}"}
+                  for i in range(use_cases)]
+    relations = [{"actor_id": f"A{rng.randrange(actors)}", "use_case_id": f"UC{i}"} for i in range(use_cases)]
+    return {"system": "Schoolportaal", "actors": actor_items, "use_cases": case_items, "relations": relations}
+
+
+def userstories(stories: int, actors: int = 5, seed: int = 1) -> List[Dict]:
+    """User stories voor UserStoryCompiler en de story converters."""
+    rng = _rng(seed)
+    result = []
+    for i in range(stories):
+        noun, other = rng.sample(NOUNS, 2)
+        result.append({
+            "id": f"US{i + 1}",
+            "title": f"{noun.capitalize()} {rng.choice(VERBS)}",
+            "user_story": {
+                "as_a": ACTORS[rng.randrange(min(actors, len(ACTORS)))],
+                "i_want": f"een {noun} voor een {other} {rng.choice(VERBS)}",
+                "so_that": f"ik mijn {other} kan {rng.choice(VERBS)} met de {rng.choice(ACTORS)}",
+            },
+            "description": f"Als gebruiker wil ik de {noun} van een {other} kunnen beheren. " * 2,
+            "acceptance_criteria": [f"De {noun} is zichtbaar", f"De {other} wordt opgeslagen"],
+        })
+    return result
+
+
+def scrumboard(columns: int = 4, tasks: int = 25, seed: int = 1) -> Dict:
+    """Scrumboard voor ScrumboardExcelExporter: 'tasks' taken verdeeld over 'columns' kolommen."""
+    rng = _rng(seed)
+    names = ["Backlog", "Todo", "Doing", "Review", "Done", "Blocked", "Test", "Deploy"]
+    board = {names[i % len(names)] + ("" if i < len(names) else str(i)): [] for i in range(columns)}
+    keys = list(board)
+    for i in range(tasks):
+        board[keys[i % columns]].append({
+            "title": f"Taak {i}",
+            "content": f"{rng.choice(NOUNS).capitalize()} {rng.choice(VERBS)} en documenteren",
+            "priority": rng.randint(1, 5),
+            "time_estimate": rng.choice([15, 30, 60, 120, 240]),
+        })
+    return board
+
+
+def _row(*texts, bg_color: str = None) -> List[Dict]:
+    cells = [{"text": text} for text in texts]
+    if bg_color:
+        cells[0]["bg_color"] = bg_color
+    return cells
+
+
+def narratives(steps: int = 10, seed: int = 1) -> Dict:
+    """Use case beschrijving voor UseCaseDocGenerator: flowtabellen met 'steps' stappen per flow."""
+    rng = _rng(seed)
+
+    def flow(title: str) -> List[List[Dict]]:
+        rows = [_row(title, "Actor", "Systeem", bg_color="9DC8E8")]
+        for i in range(steps):
+            noun = rng.choice(NOUNS)
+            rows.append(_row(str(i + 1), f"De actor kiest een {noun}", f"Het systeem toont de {noun}"))
+        return rows
+
+    return {
+        "metadata": [_row("Use case", "UC1 Cursus inschrijven", bg_color="4B6CB7"),
+                     _row("Actor", "Student"), _row("Versie", "1.0")],
+        "preconditions": [_row("Precondities", bg_color="9DC8E8"), _row("De student is ingelogd")],
+        "basic_flow": flow("Basic flow"),
+        "alternate_flows": flow("Alternatieve flow"),
+        "exception_flows": flow("Exception flow"),
+        "postconditions": [_row("Postcondities", bg_color="9DC8E8"), _row("De inschrijving is opgeslagen")],
+    }
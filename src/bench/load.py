@@ -0,0 +1,297 @@
+"""
+Load test voor de FastAPI app, met het stub model in plaats van Gemini (vanuit src/ draaien):
+
+    python -m bench.load                                        # in-process (ASGI), standaard mix
+    python -m bench.load --mix erd=4,narratives=1,ai_erd=2 --size m --concurrency 32 --requests 1000
+    python -m bench.load --spawn --workers 4                    # lokale uvicorn met 4 workers
+    python -m bench.load --url http://localhost:8090 --mix erd=1   # draaiende server (AI_BACKEND daar zelf zetten)
+
+Rapporteert per endpoint de throughput, p50/p95/p99 latency en het percentage fouten.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from bench import generators
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Aantal items (tabellen, classes, stories, stappen, ...) per payload grootte
+SIZES = {"s": 10, "m": 50, "l": 200}
+
+AI_HEADERS = {"Authorization": "Bearer loadtest"}
+
+# naam -> (pad, payload(n, seed), extra headers)
+ENDPOINTS: Dict[str, Tuple[str, Callable[[int, int], Dict], Dict[str, str]]] = {
+    "erd": ("/api/erd/generate", lambda n, seed: {"data": generators.erd(n, seed=seed)}, {}),
+    "classdiagram": ("/api/classdiagram/generate",
+                     lambda n, seed: {"data": generators.classdiagram(n, seed=seed)}, {}),
+    "usecases": ("/api/usecases/generate", lambda n, seed: generators.usecases(max(1, n // 5), n, seed=seed), {}),
+    "narratives": ("/api/narratives/generate", lambda n, seed: {"data": generators.narratives(n, seed=seed)}, {}),
+    "scrumboard": ("/api/scrumboard/generate/excel",
+                   lambda n, seed: {"data": generators.scrumboard(4, n * 4, seed=seed)}, {}),
+    "userstories_txt": ("/api/userstories/generate/txt",
+                        lambda n, seed: {"data": generators.userstories(n, seed=seed)}, {}),
+    "userstories_docx": ("/api/userstories/generate/docx",
+                         lambda n, seed: {"data": generators.userstories(n, seed=seed)}, {}),
+    "draft_erd": ("/api/erd/userstorietoerd", lambda n, seed: {"data": generators.userstories(n, seed=seed)}, {}),
+    "ai_erd": ("/api/ai/userstorytoerd",
+               lambda n, seed: {"user_stories": generators.userstories(n, seed=seed)}, AI_HEADERS),
+    "ai_classdiagram": ("/api/ai/erdtoclassdiagram",
+                        lambda n, seed: {"erd_json": generators.erd(n, seed=seed)}, AI_HEADERS),
+}
+
+DEFAULT_MIX = "erd=4,classdiagram=2,usecases=2,userstories_txt=2,narratives=1,scrumboard=1,ai_erd=2"
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Leest 'erd=4,narratives=1' in als gewichten per endpoint."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Onbekend endpoint in mix: {name} (kies uit {', '.join(ENDPOINTS)})")
+        mix[name] = int(weight) if weight.strip() else 1
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, int], size: str = "s", variants: int = 20,
+                 seed: int = 1):
+        """
+        Stuurt requests volgens een gewogen mix. Per endpoint worden vooraf 'variants' verschillende
+        payloads gemaakt; met variants=1 meet je vooral de response cache, met veel varianten de renders.
+        """
+        self.client = client
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.rng = random.Random(seed)
+        self.payloads = {
+            name: [ENDPOINTS[name][1](SIZES[size], seed + i) for i in range(max(1, variants))]
+            for name in self.names
+        }
+        # naam -> [(latency, status)]; status 0 = geen antwoord (exception)
+        self.results: Dict[str, List[Tuple[float, int]]] = {name: [] for name in self.names}
+        self.errors: Dict[str, Dict[str, int]] = {name: {} for name in self.names}
+
+    async def request(self, name: str, record: bool = True):
+        path, _, headers = ENDPOINTS[name]
+        payload = self.rng.choice(self.payloads[name])
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(path, json=payload, headers=headers)
+            status = response.status_code
+            error = None if status < 400 else str(status)
+        except Exception as e:
+            status, error = 0, e.__class__.__name__
+        if record:
+            self.results[name].append((time.perf_counter() - started, status))
+            if error:
+                self.errors[name][error] = self.errors[name].get(error, 0) + 1
+
+    async def warmup(self):
+        """Eén request per endpoint (process pool, imports), niet meegeteld."""
+        for name in self.names:
+            await self.request(name, record=False)
+
+    async def run(self, requests: int, concurrency: int, duration: Optional[float] = None) -> float:
+        remaining = requests
+        deadline = time.perf_counter() + duration if duration else None
+
+        async def worker():
+            nonlocal remaining
+            while True:
+                if deadline is not None:
+                    if time.perf_counter() >= deadline:
+                        return
+                elif remaining <= 0:
+                    return
+                else:
+                    remaining -= 1
+                await self.request(self.rng.choices(self.names, self.weights)[0])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        return time.perf_counter() - started
+
+    def report(self, elapsed: float) -> Dict:
+        endpoints = {}
+        everything = []
+        for name, results in self.results.items():
+            latencies = [latency for latency, _ in results]
+            everything.extend(results)
+            endpoints[name] = self._summary(results, latencies, elapsed)
+            endpoints[name]["errors"] = self.errors[name]
+        total = self._summary(everything, [latency for latency, _ in everything], elapsed)
+        return {"elapsed_seconds": round(elapsed, 3), "total": total, "endpoints": endpoints}
+
+    @staticmethod
+    def _summary(results: List[Tuple[float, int]], latencies: List[float], elapsed: float) -> Dict:
+        failed = sum(1 for _, status in results if status == 0 or status >= 400)
+
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "requests": len(results),
+            "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(failed / len(results), 4) if results else 0.0,
+            "p50_ms": ms(percentile(latencies, 50)),
+            "p95_ms": ms(percentile(latencies, 95)),
+            "p99_ms": ms(percentile(latencies, 99)),
+        }
+
+
+def print_report(report: Dict):
+    print(f"\n{'endpoint':18} {'requests':>9} {'req/s':>9} {'fouten':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(report["endpoints"].items()) + [("totaal", report["total"])]
+    for name, row in rows:
+        print(f"{name:18} {row['requests']:>9} {row['throughput_rps']:>9.1f} {row['error_rate'] * 100:>7.1f}% "
+              f"{row['p50_ms'] or 0:>9.1f} {row['p95_ms'] or 0:>9.1f} {row['p99_ms'] or 0:>9.1f}")
+    for name, row in report["endpoints"].items():
+        if row["errors"]:
+            print(f"  {name}: {', '.join(f'{error} x{count}' for error, count in row['errors'].items())}")
+    print(f"\nDuur: {report['elapsed_seconds']}s")
+
+
+# -------------------------
+# Targets: in-process (ASGI), gespawnde uvicorn of een draaiende server
+# -------------------------
+def _stub_environment(args) -> Dict[str, str]:
+    env = {
+        "AI_BACKEND": "stub",
+        "AI_STUB_LATENCY_MS": str(args.ai_latency_ms),
+        "AI_STUB_LATENCY_JITTER_MS": str(args.ai_jitter_ms),
+        "AI_STUB_FAILURE_RATE": str(args.ai_failure_rate),
+    }
+    if args.no_cache:
+        # Anders meet je na de eerste ronde varianten vooral de caches
+        env.update({"RESPONSE_CACHE_ENABLED": "false", "AI_CACHE_ENABLED": "false"})
+    return env
+
+
+async def _run(client: httpx.AsyncClient, args, mix: Dict[str, int]) -> Dict:
+    test = LoadTest(client, mix, args.size, args.variants, args.seed)
+    if not args.no_warmup:
+        await test.warmup()
+    print(f"{args.requests if not args.duration else str(args.duration) + 's'} requests, concurrency "
+          f"{args.concurrency}, payload {args.size}, mix {','.join(f'{n}={w}' for n, w in mix.items())}", flush=True)
+    elapsed = await test.run(args.requests, args.concurrency, args.duration)
+    return test.report(elapsed)
+
+
+async def run_in_process(args, mix: Dict[str, int]) -> Dict:
+    # Config wordt bij het importeren gelezen: eerst de environment zetten, dan pas main importeren
+    os.environ.update(_stub_environment(args))
+    os.chdir(SRC_DIR)
+    sys.path.insert(0, SRC_DIR)
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            return await _run(client, args, mix)
+
+
+async def run_against(url: str, args, mix: Dict[str, int]) -> Dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        return await _run(client, args, mix)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(args) -> Tuple[subprocess.Popen, str]:
+    """Start een lokale uvicorn met het stub model en wacht tot hij antwoordt."""
+    port = _free_port()
+    env = {**os.environ, **_stub_environment(args)}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=SRC_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn stopte direct (exit code {process.returncode})")
+        try:
+            if httpx.get(f"{url}/metrics", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn kwam niet binnen 60s op")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.load", description="Load test voor de FastAPI app")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"gewichten per endpoint ({', '.join(ENDPOINTS)})")
+    parser.add_argument("--size", choices=list(SIZES), default="s", help="grootte van de payloads")
+    parser.add_argument("--requests", type=int, default=500, help="totaal aantal requests")
+    parser.add_argument("--duration", type=float, help="in plaats van --requests: zoveel seconden draaien")
+    parser.add_argument("--concurrency", type=int, default=16, help="gelijktijdige requests")
+    parser.add_argument("--variants", type=int, default=20, help="verschillende payloads per endpoint")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=300.0, help="client timeout per request (s)")
+    parser.add_argument("--no-warmup", action="store_true", help="geen warmup request per endpoint")
+    parser.add_argument("--no-cache", action="store_true", help="response- en AI-cache uitzetten (in-process/spawn)")
+    parser.add_argument("--ai-latency-ms", type=int, default=500, help="latency van het stub model")
+    parser.add_argument("--ai-jitter-ms", type=int, default=0, help="willekeurige extra latency van het stub model")
+    parser.add_argument("--ai-failure-rate", type=float, default=0.0, help="fractie stub calls die faalt (503)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--spawn", action="store_true", help="lokale uvicorn starten in plaats van in-process")
+    target.add_argument("--url", help="draaiende server testen (bv. http://localhost:8090)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers bij --spawn")
+    parser.add_argument("--json", dest="json_path", help="rapport ook als JSON wegschrijven")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.url:
+        report = asyncio.run(run_against(args.url, args, mix))
+    elif args.spawn:
+        process, url = spawn_server(args)
+        try:
+            report = asyncio.run(run_against(url, args, mix))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    else:
+        report = asyncio.run(run_in_process(args, mix))
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bench import generators
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -------------------------
+# Cases: per compiler een input generator, de aanroep en de schalen
+# -------------------------
+def _erd(data) -> str:
+    from core.erd.compiler import DrawioERDGenerator
+    return DrawioERDGenerator().run(json=data)
+
+
+def _classdiagram(data) -> str:
+    from core.classdiagram.compiler import DrawioClassDiagramGenerator
+    return DrawioClassDiagramGenerator().run(json_data=data)
+
+
+def _usecases(data) -> str:
+    from core.usecases.compiler import DrawioUseCaseDiagramGenerator
+    return DrawioUseCaseDiagramGenerator().run(data)
+
+
+def _userstories_txt(data) -> bytes:
+    from core.userstories.compiler import UserStoryCompiler
+    return UserStoryCompiler(data).to_txt()
+
+
+def _userstories_docx(data) -> bytes:
+    from core.userstories.compiler import UserStoryCompiler
+    return UserStoryCompiler(data).to_docx()
+
+
+def _scrumboard(data) -> bytes:
+    from core.scrumboard.compiler import ScrumboardExcelExporter
+    return ScrumboardExcelExporter(data).run()
+
+
+def _narratives(data) -> bytes:
+    from core.narratives.compiler import UseCaseDocGenerator
+    return UseCaseDocGenerator(data).generate_docx_bytes()
+
+
+def _stories_to_erd(data) -> list:
+    from core.erd.userstorietoerd import userstories_to_erd
+    return userstories_to_erd(data)
+
+
+def _stories_to_classdiagram(data) -> str:
+    from core.classdiagram.userstorietoclassdiagram import userstories_to_classdiagram
+    return userstories_to_classdiagram(data)
+
+
+def _stories_to_usecases(data) -> dict:
+    from core.usecases.userstorietousecase import userstories_to_usecase_json
+    return userstories_to_usecase_json(data)
+
+
+def _erd_to_classdiagram(data) -> dict:
+    from core.classdiagram.erdtoclassdiagram import erd_to_classdiagram
+    return erd_to_classdiagram(data)
+
+
+# Modules die niet bij het opstarten geladen mogen worden (zie GENERATOR_MODULES en api.ai.gemini.preload)
+HEAVY_MODULES = ("google.genai", "pandas", "openpyxl", "docx", "lxml")
+
+
+def _startup(_) -> str:
+    """
+    Koude start: elke aanroep is een nieuwe interpreter die main importeert, dus geen modules uit een eerdere run.
+    Output: de zware modules die toch geladen zijn.
+    """
+    code = f"import sys, main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    return result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+
+
+# naam -> (compiler, {schaal: input generator})
+CASES: Dict[str, Tuple[Callable[[Any], Any], Dict[str, Callable[[], Any]]]] = {
+    "startup": (_startup, {"s": lambda: None}),
+    "erd": (_erd, {
+        "s": lambda: generators.erd(10, fields=5, fks=1),
+        "m": lambda: generators.erd(50, fields=8, fks=2),
+        "l": lambda: generators.erd(150, fields=10, fks=2),
+    }),
+    "classdiagram": (_classdiagram, {
+        "s": lambda: generators.classdiagram(10),
+        "m": lambda: generators.classdiagram(40),
+        "l": lambda: generators.classdiagram(100),
+    }),
+    "usecases": (_usecases, {
+        "s": lambda: generators.usecases(3, 10),
+        "m": lambda: generators.usecases(8, 100),
+        "l": lambda: generators.usecases(20, 400),
+    }),
+    "userstories_txt": (_userstories_txt, {
+        "s": lambda: generators.userstories(10),
+        "m": lambda: generators.userstories(200),
+        "l": lambda: generators.userstories(2000),
+    }),
+    "userstories_docx": (_userstories_docx, {
+        "s": lambda: generators.userstories(10),
+        "m": lambda: generators.userstories(100),
+        "l": lambda: generators.userstories(500),
+    }),
+    "scrumboard": (_scrumboard, {
+        "s": lambda: generators.scrumboard(4, 20),
+        "m": lambda: generators.scrumboard(5, 200),
+        "l": lambda: generators.scrumboard(8, 2000),
+    }),
+    "narratives": (_narratives, {
+        "s": lambda: generators.narratives(5),
+        "m": lambda: generators.narratives(50),
+        "l": lambda: generators.narratives(300),
+    }),
+    "stories_to_erd": (_stories_to_erd, {
+        "s": lambda: generators.userstories(10),
+        "m": lambda: generators.userstories(200),
+        "l": lambda: generators.userstories(2000),
+    }),
+    "stories_to_classdiagram": (_stories_to_classdiagram, {
+        "s": lambda: generators.userstories(10),
+        "m": lambda: generators.userstories(200),
+        "l": lambda: generators.userstories(1000),
+    }),
+    "stories_to_usecases": (_stories_to_usecases, {
+        "s": lambda: generators.userstories(10),
+        "m": lambda: generators.userstories(200),
+        "l": lambda: generators.userstories(1000),
+    }),
+    "erd_to_classdiagram": (_erd_to_classdiagram, {
+        "s": lambda: generators.erd(10),
+        "m": lambda: generators.erd(100, fks=2),
+        "l": lambda: generators.erd(1000, fks=2),
+    }),
+}
+
+# Cases die in een eigen proces draaien: tracemalloc in dit proces ziet hun geheugen niet
+SUBPROCESS_CASES = {"startup"}
+
+
+def _output_size(output) -> int:
+    if isinstance(output, bytes):
+        return len(output)
+    if isinstance(output, str):
+        return len(output.encode("utf-8"))
+    return len(json.dumps(output, ensure_ascii=False).encode("utf-8"))
+
+
+@contextlib.contextmanager
+def _quiet():
+    # Een aantal compilers print debug output; dat hoort niet in het rapport
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def measure(function: Callable[[Any], Any], data, repeat: int = 3, trace_memory: bool = True) -> Dict:
+    """
+    Meet één compiler op één input: mediaan en minimum van 'repeat' runs, daarna een
+    aparte run onder tracemalloc (piek van de Python heap), zodat die de tijden niet beïnvloedt.
+    Allocaties van lxml (docx) vallen buiten tracemalloc.
+    :param trace_memory: False voor een case in een subprocess; peak_bytes is dan None
+    """
+    with _quiet():
+        function(data)  # warmup: imports en caches buiten de meting
+        timings = []
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            output = function(data)
+            timings.append(time.perf_counter() - started)
+
+        peak = None
+        if trace_memory:
+            tracemalloc.start()
+            try:
+                function(data)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    return {
+        "median_seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "peak_bytes": peak,
+        "output_bytes": _output_size(output),
+    }
+
+
+def run(cases: Optional[List[str]] = None, scales: Optional[List[str]] = None, repeat: int = 3,
+        progress: Callable[[str, str, Dict], None] = None) -> Dict:
+    """Draai de gekozen cases op de gekozen schalen; geeft een resultaat dat als baseline bewaard kan worden."""
+    results = {}
+    for name in cases or CASES:
+        if name not in CASES:
+            raise ValueError(f"Onbekende case: {name} (kies uit {', '.join(CASES)})")
+        function, generators_by_scale = CASES[name]
+        for scale, generate in generators_by_scale.items():
+            if scales and scale not in scales:
+                continue
+            data = generate()
+            result = measure(function, data, repeat, trace_memory=name not in SUBPROCESS_CASES)
+            result["input_bytes"] = len(json.dumps(data).encode("utf-8"))
+            results[f"{name}/{scale}"] = result
+            if progress:
+                progress(name, scale, result)
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def save_baseline(report: Dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Verschillen onder deze drempels zijn ruis, ook als ze procentueel groot zijn
+MIN_SECONDS_DELTA = 0.002
+MIN_BYTES_DELTA = 64 * 1024
+
+
+def compare(report: Dict, baseline: Dict, threshold: float = 0.25) -> List[Dict]:
+    """
+    Vergelijk met een baseline. Een regressie is een case die meer dan 'threshold' (fractie)
+    trager is (mediaan), meer geheugen piekt of een andere output grootte heeft.
+    """
+    regressions = []
+    for key, result in report["results"].items():
+        old = baseline.get("results", {}).get(key)
+        if old is None:
+            continue
+        checks = (
+            ("median_seconds", MIN_SECONDS_DELTA),
+            ("peak_bytes", MIN_BYTES_DELTA),
+        )
+        for metric, min_delta in checks:
+            if result.get(metric) is None or old.get(metric) is None:
+                continue
+            if result[metric] - old[metric] > max(min_delta, old[metric] * threshold):
+                regressions.append({"case": key, "metric": metric, "baseline": old[metric], "current": result[metric]})
+        # Andere output bij dezelfde (deterministische) input: de compiler doet iets anders dan voorheen
+        if result["output_bytes"] != old["output_bytes"]:
+            regressions.append({"case": key, "metric": "output_bytes", "baseline": old["output_bytes"],
+                                "current": result["output_bytes"]})
+    return regressions
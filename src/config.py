@@ -0,0 +1,167 @@
+import os
+import tempfile
+from typing import Dict, Optional
+
+
+# -------------------------
+# Helpers om configuratie uit environment variabelen te lezen
+# -------------------------
+def env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip()
+
+
+def env_int(name: str, default: int) -> int:
+    value = env_str(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    value = env_str(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    value = env_str(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def env_map(name: str) -> Dict[str, int]:
+    """Leest 'erd=2,narratives=1' in als {'erd': 2, 'narratives': 1}."""
+    result = {}
+    value = env_str(name)
+    if not value:
+        return result
+    for part in value.split(","):
+        if "=" not in part:
+            continue
+        key, raw = part.split("=", 1)
+        try:
+            result[key.strip()] = int(raw.strip())
+        except ValueError:
+            continue
+    return result
+
+
+def available_cpus() -> int:
+    """
+    Aantal CPU's dat dit proces echt mag gebruiken: de CPU affinity en, in een container,
+    het cgroup quotum (v2 cpu.max of v1 cfs_quota_us/cfs_period_us). os.cpu_count() telt de hele node.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    quota = period = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            raw_quota, raw_period = f.read().split()[:2]
+        if raw_quota != "max":
+            quota, period = int(raw_quota), int(raw_period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+        except (OSError, ValueError):
+            quota = period = None
+    if quota and period and quota > 0:
+        # Een quotum van 1.5 CPU geeft 2 workers; minder dan 1 CPU blijft 1
+        cpus = min(cpus, max(1, -(-quota // period)))
+    return max(1, cpus)
+
+
+# -------------------------
+# Productie server (python run.py --production)
+# -------------------------
+WEB_WORKERS = env_int("WEB_WORKERS", 0)  # 0 = één per beschikbare CPU
+SHUTDOWN_GRACE_SECONDS = env_int("SHUTDOWN_GRACE_SECONDS", 8)  # lopende requests afronden bij SIGTERM; onder de 10s van docker stop
+
+# -------------------------
+# Render executor (process pool voor de generate endpoints)
+# -------------------------
+RENDER_BACKEND = env_str("RENDER_BACKEND", "process")  # "process" of "thread"
+RENDER_WORKERS = env_int("RENDER_WORKERS", available_cpus())
+RENDER_MAX_QUEUE = env_int("RENDER_MAX_QUEUE", 64)
+RENDER_KIND_LIMITS = env_map("RENDER_KIND_LIMITS")
+RENDER_RETRY_AFTER = env_int("RENDER_RETRY_AFTER", 1)
+RENDER_START_METHOD = env_str("RENDER_START_METHOD")  # fork / forkserver / spawn; standaard forkserver (spawn op Windows)
+RENDER_TRACK_MEMORY = env_bool("RENDER_TRACK_MEMORY", False)  # tracemalloc piek per render (trager)
+RENDER_RSS_SAMPLE_MS = env_int("RENDER_RSS_SAMPLE_MS", 5)  # interval van de RSS sampler per render; 0 = alleen vóór en na
+MEMORY_BUDGET_MB = env_int("MEMORY_BUDGET_MB", 0)  # geschatte piek per render; 0 = geen budget
+MEMORY_BUDGETS_MB = env_map("MEMORY_BUDGETS_MB")  # per soort, bv. "narratives=256,erd=512"
+JOB_MEMORY_BUDGET_MB = env_int("JOB_MEMORY_BUDGET_MB", 0)  # ruimer budget voor /api/jobs; 0 = geen budget
+WARMUP_ENABLED = env_bool("WARMUP_ENABLED", False)  # na het opstarten op de achtergrond workers en imports opwarmen
+
+# -------------------------
+# Content-addressed response cache (ETag / 304)
+# -------------------------
+RESPONSE_CACHE_ENABLED = env_bool("RESPONSE_CACHE_ENABLED", True)
+RESPONSE_CACHE_MEMORY_MB = env_int("RESPONSE_CACHE_MEMORY_MB", 64)
+RESPONSE_CACHE_DIR = env_str("RESPONSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ontwerp-generator", "responses"))
+RESPONSE_CACHE_DISK_MB = env_int("RESPONSE_CACHE_DISK_MB", 512)  # 0 = geen schijflaag
+RESPONSE_COMPRESSION = env_bool("RESPONSE_COMPRESSION", True)  # gzip/zstd/br volgens Accept-Encoding
+RESPONSE_COMPRESSION_MIN_BYTES = env_int("RESPONSE_COMPRESSION_MIN_BYTES", 1024)
+
+# -------------------------
+# Batch API (/api/batch)
+# -------------------------
+BATCH_MAX_JOBS = env_int("BATCH_MAX_JOBS", 500)
+BATCH_MAX_PARALLEL = env_int("BATCH_MAX_PARALLEL", RENDER_WORKERS)
+
+# -------------------------
+# Asynchrone job queue (/api/jobs)
+# -------------------------
+JOBS_DIR = env_str("JOBS_DIR", os.path.join(tempfile.gettempdir(), "ontwerp-generator", "jobs"))
+JOB_WORKERS = env_int("JOB_WORKERS", 2)
+JOB_TTL_SECONDS = env_int("JOB_TTL_SECONDS", 24 * 3600)
+JOB_CLEANUP_INTERVAL = env_int("JOB_CLEANUP_INTERVAL", 300)
+JOB_STALE_SECONDS = env_int("JOB_STALE_SECONDS", 120)  # running job zonder heartbeat zo lang: verlaten, opnieuw inplannen
+JOB_MAX_ATTEMPTS = env_int("JOB_MAX_ATTEMPTS", 3)  # vastgelopen jobs: zo vaak opnieuw proberen, daarna failed
+
+# -------------------------
+# AI (Gemini)
+# -------------------------
+AI_CLIENT_POOL_SIZE = env_int("AI_CLIENT_POOL_SIZE", 16)
+AI_KEY_VERIFY_SECONDS = env_int("AI_KEY_VERIFY_SECONDS", 3600)  # zo lang deelt een key na een gelukte call cache en calls
+AI_CACHE_ENABLED = env_bool("AI_CACHE_ENABLED", True)
+AI_CACHE_PATH = env_str("AI_CACHE_PATH", os.path.join(tempfile.gettempdir(), "ontwerp-generator", "ai_cache.sqlite3"))
+AI_CACHE_TTL_SECONDS = env_int("AI_CACHE_TTL_SECONDS", 7 * 86400)
+AI_CACHE_MAX_MB = env_int("AI_CACHE_MAX_MB", 64)
+AI_BACKEND = env_str("AI_BACKEND", "gemini")  # "gemini" of "stub" (lokaal, voor tests)
+AI_STUB_LATENCY_MS = env_int("AI_STUB_LATENCY_MS", 0)
+AI_CHUNK_PARALLELISM = env_int("AI_CHUNK_PARALLELISM", 4)  # gelijktijdige deel-ERD calls per request
+AI_STRUCTURED_OUTPUT = env_bool("AI_STRUCTURED_OUTPUT", True)  # JSON schema meegeven aan Gemini (response_json_schema)
+AI_MAX_REPAIRS = env_int("AI_MAX_REPAIRS", 2)  # extra pogingen met een repair prompt bij een ongeldig antwoord
+AI_TIMEOUT_SECONDS = env_float("AI_TIMEOUT_SECONDS", 60.0)  # deadline per Gemini call (bij streams: per chunk)
+AI_HEDGE_ENABLED = env_bool("AI_HEDGE_ENABLED", False)  # tweede call starten als de eerste trager is dan de p95
+AI_HEDGE_PERCENTILE = env_float("AI_HEDGE_PERCENTILE", 95.0)
+AI_HEDGE_MIN_SAMPLES = env_int("AI_HEDGE_MIN_SAMPLES", 20)  # gemeten calls voordat er gehedged wordt
+AI_BREAKER_FAILURES = env_int("AI_BREAKER_FAILURES", 5)  # opeenvolgende upstream fouten voordat de breaker opent
+AI_BREAKER_RESET_SECONDS = env_float("AI_BREAKER_RESET_SECONDS", 30.0)
+AI_STUB_LATENCY_JITTER_MS = env_int("AI_STUB_LATENCY_JITTER_MS", 0)  # willekeurige extra vertraging van het stub model
+AI_STUB_FAILURE_RATE = env_float("AI_STUB_FAILURE_RATE", 0.0)  # fractie stub calls die met een 503 faalt
+
+# -------------------------
+# Metrics en profiling
+# -------------------------
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)  # histogrammen per endpoint en per render-stage op /metrics
+ADMIN_TOKEN = env_str("ADMIN_TOKEN")  # nodig voor admin functies (X-Admin-Token header); leeg = uitgeschakeld
+PROFILE_DIR = env_str("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "ontwerp-generator", "profiles"))
+PROFILE_KEEP = env_int("PROFILE_KEEP", 50)  # aantal bewaarde profielen, oudste worden verwijderd
+PROFILE_TOP = env_int("PROFILE_TOP", 25)  # aantal functies in de samenvatting van een profiel
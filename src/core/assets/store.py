@@ -0,0 +1,92 @@
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+from core.cache.response_cache import make_etag, variant_etag
+from core.compression.codecs import available, compress, negotiate
+
+# Kleinere bestanden worden niet gecomprimeerd (de headers kosten dan meer dan het oplevert)
+MIN_COMPRESS_BYTES = 512
+
+HASHED_NAME = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{12})(?P<ext>\.[^.]+)$")
+
+
+class Asset:
+    __slots__ = ("content", "media_type", "etag", "variants")
+
+    def __init__(self, content: bytes, media_type: str, encodings: Iterable[str] = ()):
+        """Vast antwoord met een sterke ETag en vooraf gecomprimeerde varianten (per Content-Encoding)."""
+        self.content = content
+        self.media_type = media_type
+        self.etag = make_etag(content)
+        self.variants: Dict[str, bytes] = {}
+        if len(content) >= MIN_COMPRESS_BYTES:
+            for encoding in encodings:
+                compressed = compress(encoding, content, best=True)
+                if len(compressed) < len(content):
+                    self.variants[encoding] = compressed
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        return variant_etag(self.etag, encoding)
+
+    def body(self, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Geeft (bytes, Content-Encoding) terug voor de Accept-Encoding header van de client."""
+        encoding = negotiate(accept_encoding, self.variants)
+        if encoding is None:
+            return self.content, None
+        return self.variants[encoding], encoding
+
+
+class AssetStore:
+    def __init__(self, encodings: Optional[Iterable[str]] = None):
+        """
+        In-memory verzameling van vaste bestanden (static files, vooraf gerenderde pagina's).
+        Alles wordt één keer ingelezen en gecomprimeerd; requests kosten daarna alleen een dict lookup.
+        """
+        self.encodings = list(available() if encodings is None else encodings)
+        self._assets: Dict[str, Asset] = {}
+        self._hashed: Dict[str, str] = {}  # naam -> naam met content hash
+
+    def add(self, name: str, content: bytes, media_type: Optional[str] = None) -> Asset:
+        if media_type is None:
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if media_type.startswith("text/") or media_type in ("application/javascript", "application/json"):
+                media_type += "; charset=utf-8"
+        asset = Asset(content, media_type, self.encodings)
+        self._assets[name] = asset
+        stem, ext = os.path.splitext(name)
+        self._hashed[name] = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+        return asset
+
+    def load_directory(self, directory: str):
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, directory).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    self.add(name, f.read())
+
+    def get(self, name: str) -> Optional[Asset]:
+        return self._assets.get(name)
+
+    def hashed_name(self, name: str) -> str:
+        """Bestandsnaam met content hash (bv. script.3f2a9c1b0d4e.js); verandert mee met de inhoud."""
+        return self._hashed.get(name, name)
+
+    def resolve(self, path: str) -> Tuple[Optional[Asset], bool]:
+        """
+        Zoek een bestand op, met of zonder content hash in de naam.
+        Geeft (asset, immutable) terug: immutable als de hash in de naam bij de huidige inhoud hoort.
+        """
+        asset = self._assets.get(path)
+        if asset is not None:
+            return asset, False
+        match = HASHED_NAME.match(path)
+        if match:
+            name = match.group("stem") + match.group("ext")
+            asset = self._assets.get(name)
+            if asset is not None:
+                return asset, self._hashed[name] == path
+        return None, False
@@ -0,0 +1,152 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ai_cache_accessed ON ai_cache (accessed_at);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Witruimte samenvoegen zodat inspringing/regeleinden de sleutel niet veranderen."""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def ai_cache_key(model: str, endpoint: str, prompt: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, endpoint, normalize_prompt(prompt)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AICache:
+    def __init__(self, path: str, ttl_seconds: int = 7 * 86400, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Persistente cache (SQLite) voor AI antwoorden.
+        :param path: pad naar het SQLite bestand
+        :param ttl_seconds: hoe lang een antwoord geldig blijft
+        :param max_bytes: maximale totale grootte; daarboven worden de minst recent gebruikte antwoorden verwijderd
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._db() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM ai_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] < now - self.ttl_seconds:
+                conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE ai_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return row[0] if row else None
+
+    def put(self, key: str, model: str, endpoint: str, response: str):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, model, endpoint, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, endpoint, response, size, now, now)
+            )
+            self._evict(conn, now)
+
+    def delete(self, key: str):
+        """Verwijder een antwoord, bv. een gecached antwoord dat niet (meer) door de validatie komt."""
+        with self._db() as conn:
+            conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM ai_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ai_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Minst recent gebruikte antwoorden verwijderen tot we onder de limiet zitten
+        for key, size in conn.execute("SELECT key, size FROM ai_cache ORDER BY accessed_at").fetchall():
+            conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypasses += 1
+
+    def stats(self) -> Dict:
+        with self._db() as conn:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ai_cache").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": entries,
+                "bytes": total,
+            }
+
+
+_cache: Optional[AICache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ai_cache() -> Optional[AICache]:
+    """Geeft de gedeelde AI cache terug, of None als de cache uit staat."""
+    global _cache
+    if not config.AI_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AICache(
+                path=config.AI_CACHE_PATH,
+                ttl_seconds=config.AI_CACHE_TTL_SECONDS,
+                max_bytes=config.AI_CACHE_MAX_MB * 1024 * 1024,
+            )
+        return _cache
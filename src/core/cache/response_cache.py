@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import config
+from core.compression.codecs import compress
+from core.render.registry import code_fingerprint
+
+
+def canonical_json(data) -> str:
+    """Deterministische JSON representatie (gesorteerde keys, geen witruimte)."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def content_key(kind: str, data) -> str:
+    """
+    Content-addressed sleutel op basis van soort + gecanonicaliseerde input + versie van de core code,
+    zodat de schijflaag na een deploy met gewijzigde generators geen oude artefacten meer teruggeeft.
+    """
+    digest = hashlib.sha256()
+    digest.update(code_fingerprint().encode("ascii"))
+    digest.update(b"\0")
+    digest.update(kind.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(canonical_json(data).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def make_etag(content: bytes) -> str:
+    """Sterke ETag op basis van de bytes van het antwoord."""
+    return '"' + hashlib.sha256(content).hexdigest() + '"'
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag van een gecomprimeerde variant; een sterke ETag hoort per representatie te verschillen."""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+class CacheEntry:
+    __slots__ = ("content", "etag", "variants")
+
+    def __init__(self, content: bytes, etag: Optional[str] = None):
+        self.content = content
+        self.etag = etag or make_etag(content)
+        # Content-Encoding -> gecomprimeerde bytes; alleen in het geheugen (de schijflaag bewaart het origineel)
+        self.variants: Dict[str, bytes] = {}
+
+    def compressed(self, encoding: str) -> bytes:
+        """Gecomprimeerde variant; blijft bij de entry zodat een cache hit niet opnieuw comprimeert."""
+        variant = self.variants.get(encoding)
+        if variant is None:
+            variant = self.variants[encoding] = compress(encoding, self.content)
+        return variant
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+class ResponseCache:
+    def __init__(self, memory_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 disk_bytes: int = 512 * 1024 * 1024):
+        """
+        Twee-laags LRU cache: eerst geheugen, daarna een map op schijf.
+        :param memory_bytes: maximale grootte van de geheugenlaag
+        :param disk_dir: map voor de schijflaag (None = geen schijflaag)
+        :param disk_bytes: maximale grootte van de schijflaag
+        """
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._memory_size = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    # -------------------------
+    # Geheugenlaag
+    # -------------------------
+    def get_memory(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            self._memory.move_to_end(key)
+            self.hits_memory += 1
+            self.bytes_saved += entry.size
+            return entry
+
+    def _put_memory(self, key: str, entry: CacheEntry):
+        if entry.size > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= old.size
+            self._memory[key] = entry
+            self._memory_size += entry.size
+            while self._memory_size > self.memory_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= evicted.size
+
+    # -------------------------
+    # Schijflaag
+    # -------------------------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key)
+
+    def _load_disk_index(self):
+        files = []
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            if name.endswith(".tmp") or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._disk[name] = size
+            self._disk_size += size
+
+    def get_disk(self, key: str) -> Optional[CacheEntry]:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                size = self._disk.pop(key, None)
+                if size is not None:
+                    self._disk_size -= size
+            return None
+
+        entry = CacheEntry(content)
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self.hits_disk += 1
+            self.bytes_saved += entry.size
+        # Promoveer naar de geheugenlaag
+        self._put_memory(key, entry)
+        return entry
+
+    def _put_disk(self, key: str, entry: CacheEntry):
+        if not self.disk_dir or entry.size > self.disk_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(entry.content)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+
+        evict = []
+        with self._lock:
+            old = self._disk.pop(key, None)
+            if old is not None:
+                self._disk_size -= old
+            self._disk[key] = entry.size
+            self._disk_size += entry.size
+            while self._disk_size > self.disk_bytes and self._disk:
+                evicted_key, evicted_size = self._disk.popitem(last=False)
+                self._disk_size -= evicted_size
+                evict.append(evicted_key)
+        for evicted_key in evict:
+            try:
+                os.remove(self._path(evicted_key))
+            except OSError:
+                pass
+
+    # -------------------------
+    # Publieke API
+    # -------------------------
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self.get_memory(key)
+        if entry is None:
+            entry = self.get_disk(key)
+        if entry is None:
+            self.record_miss()
+        return entry
+
+    def put(self, key: str, content: bytes) -> CacheEntry:
+        entry = CacheEntry(content)
+        self._put_memory(key, entry)
+        self._put_disk(key, entry)
+        return entry
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self.hits_memory + self.hits_disk
+            lookups = hits + self.misses
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "bytes_saved": self.bytes_saved,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Controleer een If-None-Match header (lijst van ETags of '*')."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Geeft de gedeelde cache terug, of None als de cache uit staat."""
+    global _cache
+    if not config.RESPONSE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                memory_bytes=config.RESPONSE_CACHE_MEMORY_MB * 1024 * 1024,
+                disk_dir=config.RESPONSE_CACHE_DIR if config.RESPONSE_CACHE_DISK_MB > 0 else None,
+                disk_bytes=config.RESPONSE_CACHE_DISK_MB * 1024 * 1024,
+            )
+        return _cache
@@ -2,6 +2,8 @@ import xml.sax.saxutils as saxutils
 from typing import List, Dict, Any, Tuple
 import math
 
+from core.metrics.stages import stage_clock
+
 class DrawioClassDiagramGenerator:
     def __init__(self, padding: int = 100, class_width: int = 220):
         self.padding = padding
@@ -263,22 +265,42 @@ class DrawioClassDiagramGenerator:
             elif rtype == "dependency":
                 style += "endArrow=open;dashed=1;"
 
-            # Creeer de edge
+            # Creeer de edge (met de naam van de relatie als label)
+            edge_id = cell_id
             relation_cells.append(
-                f'<mxCell id="{cell_id}" style="{style}" edge="1" parent="1" '
+                f'<mxCell id="{edge_id}" value="{self._escape(rel.get("name") or "")}" style="{style}" '
+                f'edge="1" parent="1" '
                 f'source="{source_cls["container_id"]}" target="{target_cls["container_id"]}">'
                 f'<mxGeometry relative="1" as="geometry">{points_xml}</mxGeometry>'
                 f'</mxCell>'
             )
             cell_id += 1
 
+            # Multipliciteit als label bij het begin (x=-1) en het eind (x=1) van de edge
+            for key, position, offset_x, align in (("from_multiplicity", -1, -8, "right"),
+                                                   ("to_multiplicity", 1, 8, "left")):
+                if not rel.get(key):
+                    continue
+                relation_cells.append(
+                    f'<mxCell id="{cell_id}" value="{self._escape(str(rel[key]))}" '
+                    f'style="edgeLabel;resizable=0;html=1;align={align};verticalAlign=bottom;" '
+                    f'vertex="1" connectable="0" parent="{edge_id}">'
+                    f'<mxGeometry x="{position}" relative="1" as="geometry">'
+                    f'<mxPoint x="{offset_x}" y="-4" as="offset"/></mxGeometry>'
+                    f'</mxCell>'
+                )
+                cell_id += 1
+
         return "\n".join(relation_cells)
 
     def run(self, json_data: Dict[str, Any]) -> str:
+        clock = stage_clock()
         self.classes_input = json_data.get("classes", [])
         layout_info, last_class_id = self._generate_layout()
         class_cells_xml = "\n".join(c['xml'] for c in layout_info)
+        clock.lap("layout")
         relationship_cells_xml = self._generate_relation_cells(json_data.get("relations", []), layout_info, last_class_id)
+        clock.lap("route_edges")
 
         header = '''<?xml version="1.0" encoding="UTF-8"?>
 <mxfile host="app.diagrams.net">
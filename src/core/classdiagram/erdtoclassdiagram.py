@@ -0,0 +1,104 @@
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+# SQL datatype -> type in het classediagram (op basis van het basistype, zonder lengte)
+TYPE_MAP = {
+    "varchar": "string", "char": "string", "nvarchar": "string", "text": "string", "enum": "string",
+    "int": "int", "integer": "int", "bigint": "int", "smallint": "int", "tinyint": "int", "serial": "int",
+    "decimal": "decimal", "numeric": "decimal", "money": "decimal",
+    "float": "float", "double": "float", "real": "float",
+    "boolean": "bool", "bool": "bool", "bit": "bool",
+    "date": "date", "datetime": "datetime", "timestamp": "datetime", "time": "time",
+}
+BASE_TYPE = re.compile(r"^\s*([a-zA-Z]+)")
+
+
+def sql_to_class_type(datatype: Optional[str]) -> str:
+    match = BASE_TYPE.match(datatype or "")
+    if not match:
+        return "string"
+    return TYPE_MAP.get(match.group(1).lower(), match.group(1).lower())
+
+
+def _attribute_name(name: str) -> str:
+    return name[:1].lower() + name[1:]
+
+
+def _foreign_keys(table: Dict) -> List[Dict]:
+    """FK velden die naar een tabel verwijzen; een FK zonder references telt niet mee."""
+    return [f for f in table.get("fields", []) if f.get("type") == "FK" and f.get("references")]
+
+
+def _is_junction(table: Dict) -> bool:
+    """Koppeltabel: precies twee FK's en verder alleen sleutelvelden (veel-op-veel relatie)."""
+    others = [f for f in table.get("fields", []) if f.get("type") not in ("PK", "FK")]
+    return len(_foreign_keys(table)) == 2 and not others
+
+
+def erd_to_classdiagram(erd: List[Dict]) -> Dict:
+    """
+    Zet een ERD (formaat van DrawioERDGenerator) regelgebaseerd om naar een classediagram
+    (formaat van DrawioClassDiagramGenerator):
+    - elke tabel wordt een class, de gewone velden worden attributen ("naam: type")
+    - elke FK wordt een association van de FK-tabel naar de tabel waarnaar verwezen wordt;
+      not_null en unique bepalen de multipliciteit
+    - een koppeltabel (alleen twee FK's) wordt één veel-op-veel association, tenzij een andere tabel
+      ernaar verwijst: dan blijft het een gewone class
+    Gooit ValueError bij twee tabellen met dezelfde naam (FK's verwijzen op naam, dus dat is dubbelzinnig).
+    """
+    duplicates = sorted(title for title, n in Counter(table["title"] for table in erd).items() if n > 1)
+    if duplicates:
+        raise ValueError(f"Tabelnamen komen meer dan één keer voor: {', '.join(duplicates)}")
+    referenced = {field["references"].get("table") for table in erd for field in _foreign_keys(table)}
+
+    class_ids = {}
+    classes = []
+    junctions = []
+    for table in erd:
+        if _is_junction(table) and table["title"] not in referenced:
+            junctions.append(table)
+            continue
+        class_id = f"C{len(classes) + 1}"
+        class_ids[table["title"]] = class_id
+        classes.append({
+            "id": class_id,
+            "name": table["title"],
+            "attributes": [
+                f"{_attribute_name(field['name'])}: {sql_to_class_type(field.get('datatype'))}"
+                for field in table.get("fields", []) if field.get("type") not in ("PK", "FK")
+            ],
+            "methods": [],
+        })
+
+    relations = []
+    for table in erd:
+        if table in junctions:
+            continue
+        for field in table.get("fields", []):
+            references = field.get("references")
+            if field.get("type") != "FK" or not references or references.get("table") not in class_ids:
+                continue
+            relations.append({
+                "from": class_ids[table["title"]],
+                "to": class_ids[references["table"]],
+                "type": "association",
+                "name": field["name"],
+                # elke rij verwijst naar (hoogstens) één rij; unique FK -> hoogstens één rij per referentie
+                "from_multiplicity": "0..1" if field.get("unique") else "0..*",
+                "to_multiplicity": "1" if field.get("not_null") else "0..1",
+            })
+
+    for table in junctions:
+        left, right = [f["references"].get("table") for f in _foreign_keys(table)]
+        if left in class_ids and right in class_ids:
+            relations.append({
+                "from": class_ids[left],
+                "to": class_ids[right],
+                "type": "association",
+                "name": table["title"],
+                "from_multiplicity": "0..*",
+                "to_multiplicity": "0..*",
+            })
+
+    return {"classes": classes, "relations": relations}
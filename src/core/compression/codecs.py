@@ -0,0 +1,112 @@
+import gzip
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional
+
+# brotli en zstandard zijn optioneel; zonder die packages wordt alleen gzip gebruikt
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _gzip(content: bytes, best: bool) -> bytes:
+    # mtime=0: dezelfde input geeft altijd dezelfde bytes
+    return gzip.compress(content, compresslevel=9 if best else 6, mtime=0)
+
+
+def _brotli(content: bytes, best: bool) -> bytes:
+    return brotli.compress(content, quality=11 if best else 5)
+
+
+def _zstd(content: bytes, best: bool) -> bytes:
+    return zstandard.ZstdCompressor(level=19 if best else 3).compress(content)
+
+
+# Content-Encoding -> compressor, in volgorde van voorkeur van de server
+COMPRESSORS: Dict[str, Callable[[bytes, bool], bytes]] = {}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _zstd
+if brotli is not None:
+    COMPRESSORS["br"] = _brotli
+COMPRESSORS["gzip"] = _gzip
+
+
+def available() -> List[str]:
+    return list(COMPRESSORS)
+
+
+def compress(encoding: str, content: bytes, best: bool = False) -> bytes:
+    """
+    Comprimeer met de gegeven Content-Encoding.
+    :param best: hoogste compressie (voor vooraf gecomprimeerde bestanden); anders snel (voor responses)
+    """
+    return COMPRESSORS[encoding](content, best)
+
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def negotiate(accept_encoding: Optional[str], offered: Iterable[str]) -> Optional[str]:
+    """
+    Kies een Content-Encoding uit 'offered' op basis van de Accept-Encoding header.
+    Hoogste q-waarde wint; bij gelijke q de volgorde van 'offered'. None = ongecomprimeerd.
+    """
+    if not accept_encoding:
+        return None
+    accepted = _accepted(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in offered:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class StreamCompressor:
+    def __init__(self, encoding: str):
+        """
+        Comprimeert een stream per chunk. Elke chunk wordt direct geflusht,
+        zodat de client (bv. een SSE event) niet op de volgende chunk hoeft te wachten.
+        """
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=5)
+        else:
+            raise ValueError(f"Onbekende Content-Encoding: {encoding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "zstd":
+            return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
@@ -2,6 +2,8 @@ import json
 import math
 import xml.sax.saxutils as saxutils
 
+from core.metrics.stages import stage_clock
+
 
 class DrawioERDGenerator:
     def __init__(self, padding=100):
@@ -106,6 +108,7 @@ class DrawioERDGenerator:
         logging.basicConfig(level=logging.DEBUG)
         import math
 
+        clock = stage_clock()
         total_tables = len(self.tables_input)
         columns = math.ceil(math.sqrt(total_tables))
         cells, cell_id, relation_idx = [], 2, 0
@@ -134,6 +137,8 @@ class DrawioERDGenerator:
             cell_id = next_id
             tables_info.append({"json": t["json"], "data": data, "pos": (x, y), "width": w, "height": h})
 
+        clock.lap("layout")
+
         table_map = {t["data"]["title"]: t for t in tables_info}
         relations_cells = []
 
@@ -258,6 +263,7 @@ class DrawioERDGenerator:
                     cell_id += 1
                     relation_idx += 1
 
+        clock.lap("route_edges")
         return "\n".join(cells) + "\n" + "\n".join(relations_cells)
 
     def create_full_drawio_xml(self):
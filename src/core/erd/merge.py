@@ -0,0 +1,128 @@
+import json
+from typing import Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Ruwe schatting van het aantal LLM tokens (~4 tekens per token)."""
+    return max(1, len(text) // 4)
+
+
+def _story_tokens(story: Dict) -> int:
+    return estimate_tokens(json.dumps(story, ensure_ascii=False, separators=(",", ":")))
+
+
+def _pack(stories: List[Dict], token_budget: int) -> List[List[Dict]]:
+    """Verdeel stories in volgorde over chunks van maximaal token_budget tokens."""
+    chunks, current, current_tokens = [], [], 0
+    for story in stories:
+        tokens = _story_tokens(story)
+        if current and current_tokens + tokens > token_budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(story)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def partition_stories(stories: List[Dict], by: str = "actor", token_budget: int = 2000) -> List[List[Dict]]:
+    """
+    Verdeel user stories in chunks voor parallelle ERD extractie.
+    :param by: "actor" (één chunk per as_a, te grote groepen worden op tokens gesplitst) of "tokens"
+    :param token_budget: maximaal aantal (geschatte) tokens per chunk
+    """
+    if by == "tokens":
+        return _pack(stories, token_budget)
+    if by != "actor":
+        raise ValueError(f"Onbekende chunking: {by}")
+
+    groups: Dict[str, List[Dict]] = {}
+    for story in stories:
+        actor = story.get("user_story", {}).get("as_a", "").strip().lower()
+        groups.setdefault(actor, []).append(story)
+
+    chunks = []
+    for group in groups.values():
+        chunks.extend(_pack(group, token_budget))
+    return chunks
+
+
+def _norm(name) -> str:
+    return str(name or "").strip().lower()
+
+
+def merge_erds(partials: List[List[Dict]]) -> List[Dict]:
+    """
+    Voeg deel-ERD's samen tot één ERD. Deterministisch: de volgorde van de partials
+    (= volgorde van de chunks) bepaalt de volgorde en de naamgeving in het resultaat.
+    - tabellen met dezelfde naam (hoofdletterongevoelig) worden samengevoegd
+    - velden met dezelfde naam worden samengevoegd; ontbrekende eigenschappen worden aangevuld
+    - FK referenties worden naar de samengevoegde tabel- en veldnamen omgezet;
+      een FK naar een onbekende tabel wordt een gewoon veld
+    """
+    tables: Dict[str, Dict] = {}
+    field_maps: Dict[str, Dict[str, Dict]] = {}
+
+    for partial in partials:
+        for table in partial or []:
+            if not isinstance(table, dict) or not table.get("title"):
+                continue
+            table_key = _norm(table["title"])
+            if table_key not in tables:
+                tables[table_key] = {**{k: v for k, v in table.items() if k != "fields"}, "fields": []}
+                field_maps[table_key] = {}
+            merged_table = tables[table_key]
+
+            for field in table.get("fields", []):
+                if not isinstance(field, dict) or not field.get("name"):
+                    continue
+                field_key = _norm(field["name"])
+                existing = field_maps[table_key].get(field_key)
+                if existing is None:
+                    copy = dict(field)
+                    field_maps[table_key][field_key] = copy
+                    merged_table["fields"].append(copy)
+                    continue
+                # Eerste definitie wint, maar PK/FK gaat voor een gewoon veld
+                if not existing.get("type") and field.get("type"):
+                    existing["type"] = field["type"]
+                for key, value in field.items():
+                    existing.setdefault(key, value)
+
+    _reconcile_references(tables, field_maps)
+    return list(tables.values())
+
+
+def _primary_key(fields: Dict[str, Dict]) -> Optional[str]:
+    for field in fields.values():
+        if field.get("type") == "PK":
+            return field["name"]
+    return None
+
+
+def _reconcile_references(tables: Dict[str, Dict], field_maps: Dict[str, Dict[str, Dict]]):
+    for table_key, table in tables.items():
+        for field in table["fields"]:
+            references = field.get("references")
+            if field.get("type") != "FK" and not references:
+                continue
+            if not isinstance(references, dict):
+                references = {}
+            target_key = _norm(references.get("table"))
+            if target_key not in tables:
+                # Referentie naar een tabel die niet bestaat: gewoon veld maken
+                field["type"] = ""
+                field.pop("references", None)
+                continue
+
+            target_fields = field_maps[target_key]
+            target_field = target_fields.get(_norm(references.get("field")))
+            field_name = target_field["name"] if target_field else _primary_key(target_fields)
+            if field_name is None:
+                field["type"] = ""
+                field.pop("references", None)
+                continue
+
+            field["type"] = "FK"
+            field["references"] = {"table": tables[target_key]["title"], "field": field_name}
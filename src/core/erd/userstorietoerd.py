@@ -0,0 +1,169 @@
+import re
+from typing import Dict, Iterable, List
+
+WORD = re.compile(r"[a-zà-ÿ]+")
+# Leestekens die een bijzin of opsomming afsluiten
+CLAUSE_BREAK = re.compile(r"[,;:.!?()]")
+
+# Lidwoorden, bezittelijke en aanwijzende voornaamwoorden, telwoorden en voorzetsels: hierna volgt een naamwoord
+INTRODUCERS = frozenset("""
+de het een mijn jouw uw zijn haar ons onze hun die dat dit deze alle elke ieder iedere welke geen
+van voor naar met op in aan bij uit door over onder tussen zonder na per tot om tegen volgens en of
+""".split())
+# Voegwoorden die een nieuwe bijzin beginnen ("... ontvangen wanneer een categorie leeg is")
+CLAUSE_STARTS = frozenset("dat zodat omdat wanneer als waar waarin terwijl nadat voordat zodra".split())
+# Overige functiewoorden: persoonlijke voornaamwoorden, hulp- en koppelwerkwoorden, vaste bijwoorden
+STOP_WORDS = INTRODUCERS | CLAUSE_STARTS | frozenset("""
+ik je jij u hij zij ze we wij men er hier daar wat wie hoe te dan ook niet wel nog al meer eigen
+wil wilt willen kan kun kunt kunnen moet moeten mag mogen zal zullen zou zouden word wordt worden
+ben bent is zijn was waren heb hebt heeft hebben blijft blijven
+""".split())
+# Naamwoorden die over het scherm gaan, niet over de gegevens ("een overzicht van contracten")
+SCREEN_WORDS = frozenset("overzicht lijst pagina scherm".split())
+# Tegenwoordig deelwoorden als bijvoeglijk naamwoord: openstaande, lopende, bestaande, volgende
+PARTICIPLE = re.compile(r"[a-z]{3,}[ae]nde$")
+# Samenstellingen die over het eerste deel gaan: klantgegevens -> klant
+COMPOUND_SUFFIXES = ("gegevens", "informatie")
+
+# Meervoud op -s na een toonloze uitgang: medewerkers, rapportages, notificaties, tafels (niet: proces, adres)
+PLURAL_S = re.compile(r"(?<=[a-z]{2})(?:[dgtij]e|er|el|em|en)s$")
+DOUBLE_CONSONANT = re.compile(r"([bdfgklmnprst])\1$")  # lessen -> les
+OPEN_SYLLABLE = re.compile(r"(?<=[^aeiou])([aeou])([^aeiouwj])$")  # namen -> naam
+
+MIN_WORD_LENGTH = 4
+
+
+def _title(word: str) -> str:
+    return word[:1].upper() + word[1:]
+
+
+def _singular(word: str, known: Iterable[str] = ()) -> str:
+    """
+    Meervoud -> enkelvoud op basis van de Nederlandse spellingregels: '-ën' (categorieën -> categorie),
+    '-s' na een toonloze uitgang (rapportages -> rapportage) en '-en' met de terugkeer van
+    verdubbelde medeklinkers, open lettergrepen en z/v (lessen -> les, namen -> naam, prijzen -> prijs).
+    Komt de vorm zonder '-en'/'-s' zelf voor in 'known', dan wint die.
+    """
+    if word.endswith("ën"):
+        return word[:-2]
+    for suffix in ("en", "s"):
+        if word.endswith(suffix) and word[:-len(suffix)] in known:
+            return word[:-len(suffix)]
+    if PLURAL_S.search(word):
+        return word[:-1]
+    if word.endswith("en") and len(word) > MIN_WORD_LENGTH + 1:
+        stem = word[:-2]
+        if DOUBLE_CONSONANT.search(stem):
+            return stem[:-1]
+        stem = OPEN_SYLLABLE.sub(r"\1\1\2", stem)
+        if stem.endswith("z"):
+            stem = stem[:-1] + "s"
+        elif stem.endswith("v"):
+            stem = stem[:-1] + "f"
+        return stem
+    return word
+
+
+def _canonical(word: str, known: Iterable[str]) -> str:
+    """Enkelvoud, en een samenstelling als klantgegevens wordt het eerste deel als dat ook genoemd wordt."""
+    for suffix in COMPOUND_SUFFIXES:
+        if word.endswith(suffix) and len(word) > len(suffix):
+            base = _singular(word[:-len(suffix)], known)
+            if base in known:
+                return base
+    return _singular(word, known)
+
+
+def _nouns(text: str) -> List[str]:
+    """
+    Zelfstandige naamwoorden uit i_want. Een naamwoord staat aan het begin van een (bij)zin of na een
+    lidwoord, voornaamwoord, voorzetsel of 'en'/'of'. Wat direct na een naamwoord komt is het werkwoord of
+    een bijvoeglijk naamwoord ("contracten filteren", "een categorie bijna leeg is"). Een deelwoord ervoor
+    ("openstaande contracten") laat het volgende woord als naamwoord staan.
+    """
+    nouns = []
+    for clause in CLAUSE_BREAK.split(text.lower()):
+        words = WORD.findall(clause)
+        # Nederlandse user stories eindigen meestal op het werkwoord ("... een cursus bekijken")
+        if words and words[-1].endswith("en") and not words[-1].endswith("ën") and len(words) > 1:
+            words = words[:-1]
+        introduced = True
+        for word in words:
+            if word in CLAUSE_STARTS or word in INTRODUCERS:
+                introduced = True
+                continue
+            if PARTICIPLE.search(word):
+                continue
+            if introduced and len(word) >= MIN_WORD_LENGTH and word not in STOP_WORDS and word not in SCREEN_WORDS:
+                nouns.append(word)
+            introduced = False
+    return nouns
+
+
+def _table(title: str) -> Dict:
+    return {
+        "title": title,
+        "fields": [
+            {"type": "PK", "name": "ID", "datatype": "INT", "not_null": True, "unique": True, "auto_increment": True},
+            {"type": "", "name": "Naam", "datatype": "VARCHAR(100)", "not_null": True},
+        ]
+    }
+
+
+def userstories_to_erd(userstories: List[Dict], min_mentions: int = 1) -> List[Dict]:
+    """
+    Snelle, heuristische concept-ERD uit user stories (zonder AI).
+    - actoren (as_a) en zelfstandige naamwoorden uit i_want worden tabellen
+    - een tabel die in dezelfde story samen met een andere tabel genoemd wordt krijgt een FK:
+      een naamwoord verwijst naar de actor, en een naamwoord naar het volgende genoemde naamwoord
+    :param min_mentions: hoe vaak een naamwoord minstens genoemd moet worden om een tabel te worden
+    """
+    actors: Dict[str, None] = {}
+    mentions: Dict[str, int] = {}
+    stories = []  # per story: (actor, [naamwoorden in volgorde])
+
+    # Eén lineaire pass over de stories
+    for story in userstories:
+        detail = story.get("user_story", {})
+        actor = " ".join(WORD.findall(detail.get("as_a", "").lower()))
+        if actor:
+            actors.setdefault(actor, None)
+        nouns = _nouns(detail.get("i_want", ""))
+        for noun in nouns:
+            mentions[noun] = mentions.get(noun, 0) + 1
+        stories.append((actor, nouns))
+
+    # Eerst naar het enkelvoud (en klantgegevens -> klant), daarna pas ontdubbelen en tellen
+    known = set(mentions) | {_singular(noun) for noun in mentions}
+    canonical = {noun: _canonical(noun, known) for noun in mentions}
+    counts: Dict[str, int] = {}
+    for noun, count in mentions.items():
+        counts[canonical[noun]] = counts.get(canonical[noun], 0) + count
+    stories = [(actor, list(dict.fromkeys(canonical[noun] for noun in nouns))) for actor, nouns in stories]
+
+    tables: Dict[str, Dict] = {}
+    for actor in actors:
+        tables[actor] = _table(_title(actor.replace(" ", "")))
+    for noun, count in counts.items():
+        if count >= min_mentions and noun not in tables:
+            tables[noun] = _table(_title(noun))
+
+    def add_fk(source: str, target: str):
+        fields = tables[source]["fields"]
+        name = f"{tables[target]['title']}ID"
+        if source == target or any(f["name"] == name for f in fields):
+            return
+        fields.append({
+            "type": "FK", "name": name, "datatype": "INT", "not_null": False, "unique": False,
+            "references": {"table": tables[target]["title"], "field": "ID"}
+        })
+
+    for actor, nouns in stories:
+        nouns = [noun for noun in nouns if noun in tables]
+        for i, noun in enumerate(nouns):
+            if actor:
+                add_fk(noun, actor)
+            if i + 1 < len(nouns):
+                add_fk(noun, nouns[i + 1])
+
+    return list(tables.values())
@@ -0,0 +1,283 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import config
+from core.render.executor import get_executor
+from core.render.registry import ARTIFACTS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    input TEXT NOT NULL,
+    result_path TEXT,
+    result_size INTEGER,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueue:
+    def __init__(self, directory: str, workers: int = 2, ttl_seconds: int = 86400,
+                 cleanup_interval: int = 300, stale_seconds: int = 120, max_attempts: int = 3):
+        """
+        Job queue met een SQLite tabel als opslag en worker threads die renderen via de executor.
+        :param directory: map voor de database en de resultaatbestanden
+        :param workers: aantal worker threads (= maximaal gelijktijdige jobs per proces)
+        :param ttl_seconds: hoe lang afgeronde jobs en hun resultaat bewaard blijven
+        :param cleanup_interval: seconden tussen twee opruimrondes
+        :param stale_seconds: een 'running' job zonder heartbeat in deze tijd is verlaten (proces gecrasht of
+            gekild) en wordt opnieuw ingepland; een levende worker stuurt elke stale_seconds / 4 een heartbeat
+        :param max_attempts: na zoveel keer verlaten worden faalt een job definitief
+        """
+        self.directory = directory
+        self.results_dir = os.path.join(directory, "results")
+        self.db_path = os.path.join(directory, "jobs.sqlite3")
+        self.workers = max(1, workers)
+        self.ttl_seconds = ttl_seconds
+        self.cleanup_interval = cleanup_interval
+        self.stale_seconds = stale_seconds
+        self.heartbeat_seconds = max(0.05, stale_seconds / 4)
+        self.max_attempts = max(1, max_attempts)
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._last_cleanup = 0.0
+
+        os.makedirs(self.results_dir, exist_ok=True)
+        with self._db() as conn:
+            conn.executescript(SCHEMA)
+            # Databases van voor de 'attempts' en 'heartbeat_at' kolommen bijwerken
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "attempts" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            if "heartbeat_at" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def _db(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # -------------------------
+    # Publieke API
+    # -------------------------
+    def submit(self, kind: str, data) -> str:
+        job_id = uuid.uuid4().hex
+        with self._db() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, input, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(data, ensure_ascii=False), time.time())
+            )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, result_path, result_size, error, attempts, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # -------------------------
+    # Worker
+    # -------------------------
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Pak atomair de oudste wachtende job (ook veilig tussen meerdere processen)."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ?, attempts = attempts + 1 "
+                    "WHERE id = ?", (RUNNING, now, now, row["id"])
+                )
+                row = conn.execute("SELECT id, kind, input, attempts FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+            return row
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _heartbeat(self, job_id: str, attempt: int):
+        try:
+            with self._db() as conn:
+                conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                             (time.time(), job_id, RUNNING, attempt))
+        except sqlite3.Error as e:
+            print(f"[jobs] heartbeat van job {job_id} mislukt: {e}")
+
+    def _finish(self, job_id: str, attempt: int, status: str, **values) -> bool:
+        """
+        Sla de uitkomst op, maar alleen als deze run de job nog bezit (zelfde poging, nog 'running').
+        Is de job intussen opnieuw ingepland, dan wint de nieuwe run en wordt deze uitkomst weggegooid.
+        """
+        columns = ", ".join(f"{name} = ?" for name in values)
+        with self._db() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = ?, {columns}, finished_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (status, *values.values(), time.time(), job_id, RUNNING, attempt)
+            )
+        return cursor.rowcount == 1
+
+    def _render(self, job_id: str, attempt: int, kind: str, data) -> bytes:
+        """Render via de executor en stuur ondertussen heartbeats, zodat een lange job niet als verlaten geldt."""
+        future = get_executor().submit(kind, data)
+        while True:
+            try:
+                return future.result(timeout=self.heartbeat_seconds)
+            except FutureTimeout:
+                self._heartbeat(job_id, attempt)
+
+    def _process(self, row: sqlite3.Row):
+        job_id, kind, attempt = row["id"], row["kind"], row["attempts"]
+        try:
+            content = self._render(job_id, attempt, kind, json.loads(row["input"]))
+            extension = ARTIFACTS[kind][0]
+            # Per poging een eigen bestand: een oude run overschrijft nooit het resultaat van een nieuwe
+            path = os.path.join(self.results_dir, f"{job_id}.{attempt}.{extension}")
+            with open(path, "wb") as f:
+                f.write(content)
+            if not self._finish(job_id, attempt, DONE, result_path=path, result_size=len(content)):
+                os.remove(path)
+                print(f"[jobs] job {job_id} is opnieuw ingepland; resultaat van poging {attempt} vervalt")
+        except Exception as e:
+            try:
+                self._finish(job_id, attempt, FAILED, error=str(e) or e.__class__.__name__)
+            except sqlite3.Error as db_error:
+                # De worker moet blijven draaien; zonder heartbeats wordt de job na stale_seconds opnieuw ingepland
+                print(f"[jobs] kon fout van job {job_id} niet opslaan: {db_error}")
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                self._maybe_cleanup()
+                row = self._claim()
+            except sqlite3.Error as e:
+                print(f"[jobs] database fout: {e}")
+                row = None
+            if row is None:
+                # Wachten op een nieuwe job; de timeout vangt jobs uit andere processen op
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+            self._process(row)
+
+    # -------------------------
+    # Opruimen
+    # -------------------------
+    def _maybe_cleanup(self):
+        now = time.time()
+        if now - self._last_cleanup < self.cleanup_interval:
+            return
+        self._last_cleanup = now
+        self.cleanup(now)
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """
+        Verwijdert verlopen jobs en hun bestanden. Verlaten jobs (geen heartbeat in stale_seconds) gaan terug
+        in de wachtrij, tenzij ze al max_attempts keer gestart zijn: zo'n job laat telkens zijn proces crashen
+        en faalt. Een job die nog draait stuurt heartbeats en wordt dus nooit een tweede keer gestart.
+        """
+        now = now or time.time()
+        with self._db() as conn:
+            expired = conn.execute(
+                "SELECT id, result_path FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (DONE, FAILED, now - self.ttl_seconds)
+            ).fetchall()
+            for row in expired:
+                if row["result_path"]:
+                    try:
+                        os.remove(row["result_path"])
+                    except OSError:
+                        pass
+                conn.execute("DELETE FROM jobs WHERE id = ?", (row["id"],))
+            stale = now - self.stale_seconds
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? "
+                "WHERE status = ? AND COALESCE(heartbeat_at, started_at) < ? AND attempts >= ?",
+                (FAILED, f"Job liep {self.max_attempts} keer vast en is opgegeven", now,
+                 RUNNING, stale, self.max_attempts)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, heartbeat_at = NULL "
+                "WHERE status = ? AND COALESCE(heartbeat_at, started_at) < ?",
+                (QUEUED, RUNNING, stale)
+            )
+        return len(expired)
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(
+                directory=config.JOBS_DIR,
+                workers=config.JOB_WORKERS,
+                ttl_seconds=config.JOB_TTL_SECONDS,
+                cleanup_interval=config.JOB_CLEANUP_INTERVAL,
+                stale_seconds=config.JOB_STALE_SECONDS,
+                max_attempts=config.JOB_MAX_ATTEMPTS,
+            )
+        return _queue
+
+
+def stop_job_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is not None:
+            _queue.stop()
+            _queue = None
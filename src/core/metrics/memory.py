@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+# Grove schatting van de piek (in bytes) per byte JSON input, gemeten met tracemalloc en RSS.
+# docx/xlsx zitten hoger dan tracemalloc laat zien: lxml alloceert buiten de Python heap.
+MEMORY_FACTORS: Dict[str, int] = {
+    "erd": 50,
+    "classdiagram": 70,
+    "usecases": 30,
+    "narratives": 60,
+    "scrumboard": 60,
+    "userstories_txt": 5,
+    "userstories_docx": 40,
+    "userstories_string": 5,
+}
+DEFAULT_FACTOR = 60
+
+
+def estimate_peak_bytes(kind: str, input_bytes: int) -> int:
+    return MEMORY_FACTORS.get(kind, DEFAULT_FACTOR) * input_bytes
+
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # Windows
+    PAGE_SIZE = 4096
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Huidige RSS van dit proces uit /proc/self/statm (None als het platform dat niet heeft)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def max_rss_bytes() -> int:
+    """Hoogste RSS van dit proces tot nu toe (0 als het platform dat niet kan meten)."""
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux geeft kB, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class MemoryTracker:
+    def __init__(self, trace: bool = False, sample_seconds: float = 0.005):
+        """
+        Meet het geheugengebruik van één render (in de worker):
+        - rss_peak: hoogste RSS tijdens de render min de RSS bij de start. De huidige RSS komt uit
+          /proc/self/statm en wordt vóór, na en elke 'sample_seconds' tijdens de render gelezen
+          (0 = alleen vóór en na). Zonder /proc valt dit terug op de groei van ru_maxrss; dat is de
+          high-water mark van het hele proces en stijgt alleen als deze render een nieuw record zet.
+        - peak: piek van de Python heap via tracemalloc (alleen met trace=True; maakt renders trager)
+        """
+        self.trace = trace
+        self.sample_seconds = sample_seconds
+        self._started_trace = False
+        self._rss_before: Optional[int] = None
+        self._rss_peak = 0
+        self._maxrss_before = 0
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self.report: Dict[str, Optional[int]] = {}
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_seconds):
+            rss = current_rss_bytes()
+            if rss is not None and rss > self._rss_peak:
+                self._rss_peak = rss
+
+    def __enter__(self):
+        self._rss_before = current_rss_bytes()
+        if self._rss_before is None:
+            self._maxrss_before = max_rss_bytes()
+        else:
+            self._rss_peak = self._rss_before
+            if self.sample_seconds > 0:
+                self._sampler = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+                self._sampler.start()
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_trace = True
+        return self
+
+    def __exit__(self, *exc):
+        peak = None
+        if self._started_trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+        if self._rss_before is None:
+            self.report = {"peak_bytes": peak, "rss_peak_bytes": None,
+                           "rss_highwater_growth_bytes": max(0, max_rss_bytes() - self._maxrss_before)}
+        else:
+            after = current_rss_bytes() or self._rss_before
+            self.report = {"peak_bytes": peak, "rss_before_bytes": self._rss_before, "rss_after_bytes": after,
+                           "rss_peak_bytes": max(self._rss_peak, after) - self._rss_before}
+        return False
@@ -0,0 +1,87 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import config
+
+PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ProfileStore:
+    def __init__(self, directory: str, keep: int = 50):
+        """
+        Roterende map met profielen: per profiel een .json samenvatting en een .prof
+        bestand (pstats formaat, te openen met bv. snakeviz). Alleen de nieuwste 'keep' blijven staan.
+        """
+        self.directory = directory
+        self.keep = max(1, keep)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def save(self, kind: str, profile: Dict) -> str:
+        profile_id = uuid.uuid4().hex
+        summary = {"id": profile_id, "kind": kind, "created_at": time.time(), "top": profile["top"]}
+        with open(self._path(profile_id, "prof"), "wb") as f:
+            f.write(profile["stats"])
+        with open(self._path(profile_id, "json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        self._rotate()
+        return profile_id
+
+    def _rotate(self):
+        with self._lock:
+            summaries = sorted(
+                (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+                key=lambda entry: entry.stat().st_mtime, reverse=True
+            )
+            for entry in summaries[self.keep:]:
+                profile_id = entry.name[:-len(".json")]
+                for extension in ("json", "prof"):
+                    try:
+                        os.remove(self._path(profile_id, extension))
+                    except OSError:
+                        pass
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id, "json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def stats_path(self, profile_id: str) -> Optional[str]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = self._path(profile_id, "prof")
+        return path if os.path.exists(path) else None
+
+    def list(self) -> List[Dict]:
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                summary = self.get(entry.name[:-len(".json")])
+                if summary is not None:
+                    summary["top"] = summary["top"][:3]
+                    profiles.append(summary)
+        return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore(config.PROFILE_DIR, config.PROFILE_KEEP)
+        return _store
@@ -0,0 +1,195 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import config
+
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (1, 4, 16, 32, 64, 128, 256, 512, 1024, 2048))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), owner=None):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+        # Registry waar deze metric bij hoort: staat die uit, dan wordt er niets geregistreerd
+        self.owner = owner
+
+    def inc(self, value: float = 1, **labels):
+        if self.owner is not None and not self.owner.enabled:
+            return
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = TIME_BUCKETS, owner=None):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [tellers per bucket..., som, aantal]
+        self._values: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+        self.owner = owner
+
+    def observe(self, value: float, **labels):
+        if self.owner is not None and not self.owner.enabled:
+            return
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), series[:len(self.buckets)] + [0]):
+                cumulative += bucket_count
+                if bound == math.inf:
+                    cumulative = series[-1]
+                bucket_labels = format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {series[-1]}")
+        return lines
+
+
+# Een collector geeft bij elke scrape (naam, type, help, [(labels, waarde), ...]) terug
+Collector = Callable[[], Iterable[Tuple[str, str, str, Iterable[Tuple[Dict, float]]]]]
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True):
+        """
+        Minimale Prometheus registry (counters en histogrammen) zonder externe dependency.
+        Staat enabled uit, dan registreren observe/inc niets en kost instrumentatie vrijwel niets.
+        """
+        self.enabled = enabled
+        self._metrics: List = []
+        self._collectors: List[Collector] = []
+
+        self.http_duration = self.histogram(
+            "http_request_duration_seconds", "Duur van HTTP requests per route", ("method", "route", "status"))
+        self.render_duration = self.histogram(
+            "render_duration_seconds", "Duur van een render in de worker", ("kind",))
+        self.render_stage = self.histogram(
+            "render_stage_seconds", "Duur per stage van een render (validate, layout, route_edges, serialize, ...)",
+            ("kind", "stage"))
+        self.render_items = self.histogram(
+            "render_items", "Grootte van het diagram/document (tables, fields, edges, cells, ...)",
+            ("kind", "item"), SIZE_BUCKETS)
+        self.render_output_bytes = self.counter(
+            "render_output_bytes_total", "Totaal aantal gerenderde bytes", ("kind",))
+        self.render_peak_memory = self.histogram(
+            "render_peak_memory_bytes", "Piek van de Python heap tijdens een render (tracemalloc)",
+            ("kind",), MEMORY_BUCKETS)
+        self.render_rss_peak = self.histogram(
+            "render_rss_peak_bytes", "Hoogste RSS tijdens een render boven de RSS bij de start (gesampled)",
+            ("kind",), (0,) + MEMORY_BUCKETS)
+        self.render_rss_highwater_growth = self.histogram(
+            "render_rss_highwater_growth_bytes",
+            "Stijging van de high-water RSS van het hele proces (ru_maxrss) tijdens een render; alleen zonder /proc",
+            ("kind",), (0,) + MEMORY_BUCKETS)
+        self.memory_rejections = self.counter(
+            "memory_budget_rejections_total", "Requests geweigerd omdat de input het geheugenbudget overschrijdt",
+            ("kind",))
+        self.ai_stage = self.histogram(
+            "ai_stage_seconds", "Duur per stage van een AI request (upstream, validate)", ("endpoint", "stage"))
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = TIME_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets, owner=self)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames, owner=self)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    def observe_render(self, kind: str, report: Optional[Dict]):
+        """Verwerk het rapport dat de worker bij een render teruggeeft."""
+        if not self.enabled or not report:
+            return
+        self.render_duration.observe(report["seconds"], kind=kind)
+        for stage, seconds in report["stages"].items():
+            self.render_stage.observe(seconds, kind=kind, stage=stage)
+        for item, value in report["counts"].items():
+            if item == "output_bytes":
+                self.render_output_bytes.inc(value, kind=kind)
+            else:
+                self.render_items.observe(value, kind=kind, item=item)
+        memory = report.get("memory") or {}
+        if memory.get("peak_bytes") is not None:
+            self.render_peak_memory.observe(memory["peak_bytes"], kind=kind)
+        if memory.get("rss_peak_bytes") is not None:
+            self.render_rss_peak.observe(memory["rss_peak_bytes"], kind=kind)
+        if memory.get("rss_highwater_growth_bytes") is not None:
+            self.render_rss_highwater_growth.observe(memory["rss_highwater_growth_bytes"], kind=kind)
+
+    def observe_ai(self, endpoint: str, stage: str, seconds: float):
+        if self.enabled:
+            self.ai_stage.observe(seconds, endpoint=endpoint, stage=stage)
+
+    def render_text(self) -> str:
+        """Alle metrics in het Prometheus text formaat (versie 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            for name, metric_type, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry(enabled=config.METRICS_ENABLED)
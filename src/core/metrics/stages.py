@@ -0,0 +1,66 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+class StageRecorder:
+    def __init__(self):
+        """Verzamelt stage-tijden en aantallen van één render (in de worker)."""
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def report(self) -> Dict:
+        return {"stages": self.stages, "counts": self.counts}
+
+
+_recorder: ContextVar[Optional[StageRecorder]] = ContextVar("stage_recorder", default=None)
+
+
+class StageClock:
+    def __init__(self, recorder: StageRecorder):
+        self.recorder = recorder
+        self.last = time.perf_counter()
+
+    def lap(self, name: str):
+        """Tijd sinds de vorige lap (of het aanmaken) bij stage 'name' optellen."""
+        now = time.perf_counter()
+        self.recorder.add(name, now - self.last)
+        self.last = now
+
+
+class _NoClock:
+    def lap(self, name: str):
+        pass
+
+
+_NO_CLOCK = _NoClock()
+
+
+def stage_clock():
+    """
+    Klok voor de stages van een generator: clock.lap("layout"), clock.lap("route_edges"), ...
+    Zonder actieve recorder (metrics uit) is dit een no-op.
+    """
+    recorder = _recorder.get()
+    return _NO_CLOCK if recorder is None else StageClock(recorder)
+
+
+def count(name: str, value: int):
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.counts[name] = recorder.counts.get(name, 0) + value
+
+
+@contextmanager
+def recording():
+    """Zet stage-registratie aan voor de code binnen dit blok."""
+    recorder = StageRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
@@ -4,6 +4,8 @@ from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 from docx.shared import Cm
 
+from core.metrics.stages import stage_clock
+
 class UseCaseDocGenerator:
     def __init__(self, data, table_width_cm=17.8):
         self.data = data
@@ -94,6 +96,7 @@ class UseCaseDocGenerator:
     # Document genereren
     # -------------------------
     def generate_docx_bytes(self):
+        clock = stage_clock()
         doc = Document()
         for section in doc.sections:
             section.left_margin = Cm(2)
@@ -117,8 +120,11 @@ class UseCaseDocGenerator:
         # Postconditions
         self.add_flexible_table(doc, "", self.data.get("postconditions", []))
 
+        clock.lap("build")
+
         # Opslaan in bytes
         byte_io = BytesIO()
         doc.save(byte_io)
+        clock.lap("serialize")
         byte_io.seek(0)
         return byte_io.getvalue()
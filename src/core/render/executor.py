@@ -0,0 +1,207 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+import config
+from core.render.registry import GENERATOR_MODULES, preload, render, render_profiled, render_with_report
+
+
+class RenderQueueFull(Exception):
+    """Wordt gegooid als de executor verzadigd is (backpressure)."""
+
+    def __init__(self, kind: str, retry_after: int):
+        super().__init__(f"Render queue vol voor '{kind}', probeer het over {retry_after}s opnieuw")
+        self.kind = kind
+        self.retry_after = retry_after
+
+
+def default_start_method() -> str:
+    """
+    Niet forken vanuit de server: die heeft dan al threads (job workers, asyncio.to_thread, warmup, SQLite)
+    en een lock die op dat moment vastgehouden wordt blijft in de worker voor altijd dicht.
+    forkserver forkt vanuit een schoon proces zonder threads; waar dat niet bestaat (Windows) spawn.
+    """
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class RenderExecutor:
+    def __init__(self, backend: str = "process", workers: int = 1, max_queue: int = 64,
+                 kind_limits: Optional[Dict[str, int]] = None, retry_after: int = 1,
+                 start_method: Optional[str] = None):
+        """
+        :param backend: "process" (ProcessPoolExecutor) of "thread" (ThreadPoolExecutor)
+        :param workers: aantal workers in de pool
+        :param max_queue: maximaal aantal requests in behandeling (wachtend + lopend)
+        :param kind_limits: maximaal aantal gelijktijdige renders per soort, bv. {"narratives": 1}
+        :param retry_after: seconden voor de Retry-After header bij een volle queue
+        :param start_method: fork / forkserver / spawn; standaard forkserver (zie default_start_method)
+        """
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.kind_limits = kind_limits or {}
+        self.retry_after = retry_after
+        self.start_method = start_method
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pending_per_kind: Dict[str, int] = {}
+        # asyncio semaphores zijn aan een event loop gebonden, dus per loop bijhouden
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    # -------------------------
+    # Pool beheer
+    # -------------------------
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                if self.backend == "thread":
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+                else:
+                    context = multiprocessing.get_context(self.start_method or default_start_method())
+                    if context.get_start_method() == "forkserver":
+                        # De fork server laadt de generators één keer; elke worker erft ze warm
+                        context.set_forkserver_preload(["core.render.registry", *GENERATOR_MODULES])
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                                     initializer=preload)
+            return self._pool
+
+    def _reset_pool(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+    def warm_up(self) -> Dict:
+        """
+        Start alle workers en laat ze de generators importeren, zodat de eerste requests
+        niet op het opstarten van de pool en imports van python-docx/openpyxl wachten.
+        Blokkeert tot alle workers klaar zijn (aanroepen vanuit een achtergrondthread).
+        """
+        started = time.perf_counter()
+        pool = self.pool()
+        if self.backend == "thread":
+            pids = {preload()}
+        else:
+            # Eén taak per worker; de pool start er een proces bij zolang er geen worker vrij is
+            pids = {future.result() for future in [pool.submit(preload) for _ in range(self.workers)]}
+        return {"workers": len(pids), "seconds": round(time.perf_counter() - started, 3)}
+
+    # -------------------------
+    # Admission control
+    # -------------------------
+    def _admit(self, kind: str):
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise RenderQueueFull(kind, self.retry_after)
+            self._pending += 1
+            self._pending_per_kind[kind] = self._pending_per_kind.get(kind, 0) + 1
+
+    def _release(self, kind: str):
+        with self._lock:
+            self._pending -= 1
+            self._pending_per_kind[kind] -= 1
+
+    def _semaphore(self, kind: str) -> Optional[asyncio.Semaphore]:
+        limit = self.kind_limits.get(kind)
+        if not limit:
+            return None
+        loop = asyncio.get_running_loop()
+        per_loop = self._semaphores.setdefault(loop, {})
+        if kind not in per_loop:
+            per_loop[kind] = asyncio.Semaphore(limit)
+        return per_loop[kind]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "pending_per_kind": dict(self._pending_per_kind),
+            }
+
+    # -------------------------
+    # Uitvoeren
+    # -------------------------
+    async def _execute(self, function, kind: str, data):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.pool(), function, kind, data)
+        except BrokenProcessPool:
+            # Een worker is gecrasht (bv. OOM), volgende requests krijgen een nieuwe pool
+            self._reset_pool()
+            raise
+
+    def submit(self, kind: str, data) -> Future:
+        """
+        Synchrone variant zonder admission control, voor achtergrondwerk
+        (bv. de job queue) dat zelf al begrensd is.
+        """
+        try:
+            return self.pool().submit(render, kind, data)
+        except BrokenProcessPool:
+            self._reset_pool()
+            return self.pool().submit(render, kind, data)
+
+    async def _run(self, function, kind: str, data):
+        self._admit(kind)
+        try:
+            semaphore = self._semaphore(kind)
+            if semaphore is None:
+                return await self._execute(function, kind, data)
+            async with semaphore:
+                return await self._execute(function, kind, data)
+        finally:
+            self._release(kind)
+
+    async def run(self, kind: str, data) -> bytes:
+        return await self._run(render, kind, data)
+
+    async def run_with_report(self, kind: str, data) -> Tuple[bytes, Dict]:
+        """Zoals run, maar met het metrics rapport van de worker (zie render_with_report)."""
+        return await self._run(render_with_report, kind, data)
+
+    async def run_profiled(self, kind: str, data) -> Tuple[bytes, Dict]:
+        """Zoals run_with_report, maar onder cProfile in de worker (zie render_profiled)."""
+        return await self._run(render_profiled, kind, data)
+
+
+_executor: Optional[RenderExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> RenderExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = RenderExecutor(
+                backend=config.RENDER_BACKEND,
+                workers=config.RENDER_WORKERS,
+                max_queue=config.RENDER_MAX_QUEUE,
+                kind_limits=config.RENDER_KIND_LIMITS,
+                retry_after=config.RENDER_RETRY_AFTER,
+                start_method=config.RENDER_START_METHOD,
+            )
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
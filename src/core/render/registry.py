@@ -0,0 +1,258 @@
+import cProfile
+import functools
+import hashlib
+import importlib
+import marshal
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import config
+from core.metrics.memory import MemoryTracker
+from core.metrics.stages import count, recording, stage_clock
+
+
+# -------------------------
+# Render functies per soort
+# Elke functie krijgt kale JSON data (dict/list) en geeft bytes terug,
+# zodat ze ook in een ander proces uitgevoerd kunnen worden.
+# -------------------------
+def _encode(text: str) -> bytes:
+    clock = stage_clock()
+    content = text.encode("utf-8")
+    clock.lap("serialize")
+    return content
+
+
+def render_erd(data) -> bytes:
+    from core.erd.compiler import DrawioERDGenerator
+    return _encode(DrawioERDGenerator().run(json=data))
+
+
+def render_classdiagram(data) -> bytes:
+    from core.classdiagram.compiler import DrawioClassDiagramGenerator
+    return _encode(DrawioClassDiagramGenerator().run(json_data=data))
+
+
+def render_usecases(data) -> bytes:
+    from core.usecases.compiler import DrawioUseCaseDiagramGenerator
+    return _encode(DrawioUseCaseDiagramGenerator().run(data))
+
+
+def render_narratives(data) -> bytes:
+    from core.narratives.compiler import UseCaseDocGenerator
+    return UseCaseDocGenerator(data).generate_docx_bytes()
+
+
+def render_scrumboard(data) -> bytes:
+    from core.scrumboard.compiler import ScrumboardExcelExporter
+    return ScrumboardExcelExporter(data).run()
+
+
+def render_userstories_txt(data) -> bytes:
+    from core.userstories.compiler import UserStoryCompiler
+    return UserStoryCompiler(data).to_txt()
+
+
+def render_userstories_docx(data) -> bytes:
+    from core.userstories.compiler import UserStoryCompiler
+    return UserStoryCompiler(data).to_docx()
+
+
+def render_userstories_string(data) -> bytes:
+    from core.userstories.compiler import UserStoryCompiler
+    return UserStoryCompiler(data).to_string().encode("utf-8")
+
+
+RENDERERS: Dict[str, Callable[[Any], bytes]] = {
+    "erd": render_erd,
+    "classdiagram": render_classdiagram,
+    "usecases": render_usecases,
+    "narratives": render_narratives,
+    "scrumboard": render_scrumboard,
+    "userstories_txt": render_userstories_txt,
+    "userstories_docx": render_userstories_docx,
+    "userstories_string": render_userstories_string,
+}
+
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# soort -> (bestandsextensie, media type)
+ARTIFACTS: Dict[str, Tuple[str, str]] = {
+    "erd": ("drawio", "application/xml"),
+    "classdiagram": ("drawio", "application/xml"),
+    "usecases": ("drawio", "application/xml"),
+    "narratives": ("docx", DOCX),
+    "scrumboard": ("xlsx", XLSX),
+    "userstories_txt": ("txt", "text/plain"),
+    "userstories_docx": ("docx", DOCX),
+    "userstories_string": ("txt", "text/plain"),
+}
+
+
+# Zware modules (python-docx/lxml, openpyxl) worden pas bij de eerste render van die soort geladen
+GENERATOR_MODULES = (
+    "core.erd.compiler",
+    "core.classdiagram.compiler",
+    "core.usecases.compiler",
+    "core.narratives.compiler",
+    "core.scrumboard.compiler",
+    "core.userstories.compiler",
+)
+
+
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint() -> str:
+    """
+    Hash van de core code (alle .py bestanden onder core/). Hoort in elke sleutel van iets dat een
+    herstart overleeft: na een wijziging in een generator is eerder gerenderde output niet meer geldig.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(CORE_DIR):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, CORE_DIR).encode("utf-8"))
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def preload(*_) -> int:
+    """Laad alle generators alvast (warmup). Picklable, draait in de worker; geeft de pid terug."""
+    for module in GENERATOR_MODULES:
+        importlib.import_module(module)
+    return os.getpid()
+
+
+def resolve_kind(kind: str, fmt: Optional[str] = None) -> str:
+    """
+    Vertaal een publieke soort (+ optioneel formaat) naar een render soort.
+    Bijvoorbeeld ("userstories", "docx") -> "userstories_docx".
+    """
+    if kind == "userstories":
+        kind = f"userstories_{fmt or 'txt'}"
+    if kind not in RENDERERS:
+        raise ValueError(f"Onbekend soort: {kind}")
+    return kind
+
+
+# Verwachte vorm van de input per soort (narratives heeft meerdere vormen en wordt niet gecontroleerd)
+INPUT_TYPES: Dict[str, type] = {
+    "erd": list,
+    "classdiagram": dict,
+    "usecases": dict,
+    "scrumboard": dict,
+    "userstories_txt": list,
+    "userstories_docx": list,
+    "userstories_string": list,
+}
+
+
+def _renderer(kind: str) -> Callable[[Any], bytes]:
+    renderer = RENDERERS.get(kind)
+    if renderer is None:
+        raise ValueError(f"Onbekend soort: {kind}")
+    return renderer
+
+
+def validate_input(kind: str, data):
+    """Controleer de vorm van de input: een duidelijke ValueError in plaats van een fout diep in een generator."""
+    expected = INPUT_TYPES.get(kind)
+    if expected is None:
+        return
+    if not isinstance(data, expected):
+        raise ValueError(f"Ongeldige input voor '{kind}': verwacht een {'lijst' if expected is list else 'object'}")
+    if expected is list and not all(isinstance(item, dict) for item in data):
+        raise ValueError(f"Ongeldige input voor '{kind}': elk element moet een object zijn")
+
+
+def render(kind: str, data) -> bytes:
+    """Render één artefact. Deze functie is picklable en draait in de worker."""
+    renderer = _renderer(kind)
+    validate_input(kind, data)
+    return renderer(data)
+
+
+def _count_input(kind: str, data):
+    """Grootte van de input (tabellen, relaties, ...) voor de metrics."""
+    if kind == "erd" and isinstance(data, list):
+        fields = [f for table in data if isinstance(table, dict) for f in table.get("fields", [])]
+        count("tables", len(data))
+        count("fields", len(fields))
+        count("edges", sum(1 for f in fields if isinstance(f, dict) and f.get("type") == "FK"))
+    elif kind == "classdiagram" and isinstance(data, dict):
+        count("classes", len(data.get("classes", [])))
+        count("edges", len(data.get("relations", [])))
+    elif kind == "usecases" and isinstance(data, dict):
+        count("actors", len(data.get("actors", [])))
+        count("use_cases", len(data.get("use_cases", [])))
+        count("edges", len(data.get("relations", [])))
+    elif isinstance(data, (list, dict)):
+        count("items", len(data))
+
+
+def render_with_report(kind: str, data) -> Tuple[bytes, Dict]:
+    """
+    Zoals render, maar met een rapport voor de metrics: totale duur, stage-tijden,
+    aantallen (input grootte, cellen, output bytes) en geheugengebruik. Draait in de worker.
+    """
+    started = time.perf_counter()
+    with recording() as recorder:
+        clock = stage_clock()
+        renderer = _renderer(kind)
+        validate_input(kind, data)
+        _count_input(kind, data)
+        clock.lap("validate")
+        with MemoryTracker(trace=config.RENDER_TRACK_MEMORY,
+                           sample_seconds=config.RENDER_RSS_SAMPLE_MS / 1000) as memory:
+            content = renderer(data)
+        if ARTIFACTS[kind][0] == "drawio":
+            count("cells", content.count(b"<mxCell"))
+        count("output_bytes", len(content))
+    report = recorder.report()
+    report["seconds"] = time.perf_counter() - started
+    report["memory"] = memory.report
+    return content, report
+
+
+# Wrappers die in elk profiel bovenaan staan en niets zeggen over de render zelf
+_PROFILE_SKIP = (os.path.abspath(__file__), "<string>")
+
+
+def render_profiled(kind: str, data) -> Tuple[bytes, Dict]:
+    """
+    Zoals render_with_report, maar onder cProfile. Het rapport krijgt een 'profile' met de
+    duurste functies (op cumulatieve tijd) en de ruwe pstats data. Draait in de worker.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        content, report = render_with_report(kind, data)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+
+    rows = sorted(profiler.stats.items(), key=lambda item: item[1][3], reverse=True)
+    top = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in rows:
+        if filename in _PROFILE_SKIP or function == "<method 'disable' of '_lsprof.Profiler' objects>":
+            continue
+        location = f"{os.path.basename(filename)}:{line}" if filename != "~" else "builtin"
+        top.append({
+            "function": function,
+            "location": location,
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        })
+        if len(top) >= config.PROFILE_TOP:
+            break
+    report["profile"] = {"top": top, "stats": marshal.dumps(profiler.stats)}
+    return content, report
@@ -1,9 +1,10 @@
-import pandas as pd
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill, Font, Alignment
 from openpyxl.utils import get_column_letter
 from io import BytesIO
 
+from core.metrics.stages import stage_clock
+
 
 class ScrumboardExcelExporter:
     def __init__(self, scrumboard):
@@ -16,6 +17,7 @@ class ScrumboardExcelExporter:
     def save_to_bytes(self):
         """Genereer Excel bestand volgens voorbeeldstructuur."""
         print(self.scrumboard)
+        clock = stage_clock()
         wb = Workbook()
         ws = wb.active
         ws.title = "Scrumboard"
@@ -71,9 +73,12 @@ class ScrumboardExcelExporter:
         for i in range(1, col_index):
             ws.column_dimensions[get_column_letter(i)].width = 25
 
+        clock.lap("build")
+
         # Output naar bytes
         output = BytesIO()
         wb.save(output)
+        clock.lap("serialize")
         output.seek(0)
         return output.read()
 
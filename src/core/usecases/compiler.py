@@ -1,6 +1,8 @@
 import xml.sax.saxutils as saxutils
 from typing import Dict, Any
 
+from core.metrics.stages import stage_clock
+
 class DrawioUseCaseDiagramGenerator:
     def __init__(self):
         # Afmetingen
@@ -51,6 +53,7 @@ class DrawioUseCaseDiagramGenerator:
         return xml
 
     def run(self, json_data: Dict[str, Any]) -> str:
+        clock = stage_clock()
         actors = json_data.get("actors", [])
         use_cases = json_data.get("use_cases", [])
         relations = json_data.get("relations", [])
@@ -190,6 +193,8 @@ class DrawioUseCaseDiagramGenerator:
                     cells.append(self._create_edge(cell_id + 1000, parent_cell_id, ext_cell_id, [], style_edge))
                     cell_id += 1
 
+        clock.lap("layout")
+
         # Actor -> usecase relaties
         for rel in relations:
             if rel['actor_id'] in actor_map and rel['use_case_id'] in usecase_map:
@@ -216,4 +221,5 @@ class DrawioUseCaseDiagramGenerator:
                 cell_id += 1
 
         footer = '\n</root></mxGraphModel></diagram></mxfile>'
+        clock.lap("route_edges")
         return header + "".join(cells) + footer
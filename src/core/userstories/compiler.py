@@ -1,6 +1,8 @@
 import io
 from docx import Document
 
+from core.metrics.stages import stage_clock
+
 
 class UserStoryCompiler:
     def __init__(self, user_stories: list[dict]):
@@ -29,6 +31,7 @@ class UserStoryCompiler:
 
     def to_docx(self) -> bytes:
         """Retourneert de user stories als bytes (docx)."""
+        clock = stage_clock()
         doc = Document()
         for us in self.user_stories:
             doc.add_heading(us["title"], level=1)
@@ -42,8 +45,11 @@ class UserStoryCompiler:
                 doc.add_paragraph(crit, style="List Bullet")
             doc.add_paragraph("")  # lege regel
 
+        clock.lap("build")
+
         # Schrijf in geheugen (ipv bestand)
         buffer = io.BytesIO()
         doc.save(buffer)
+        clock.lap("serialize")
         buffer.seek(0)
         return buffer.read()
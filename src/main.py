@@ -1,53 +1,104 @@
 from fastapi import FastAPI, Request, Form
 from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from contextlib import asynccontextmanager
 from api.router import router as api_router
+from api.assets import asset_response, prerender_pages, static_response
+from api.ai.gemini import preload as preload_ai
+from api.metrics.router import router as metrics_router, MetricsMiddleware
+from core.assets.store import AssetStore
+from core.metrics.registry import metrics
+from core.render.executor import get_executor, shutdown_executor
+from core.jobs.queue import get_job_queue, stop_job_queue
+import config
 import os
+import threading
 
-app = FastAPI()
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+def warm_up():
+    """Achtergrond warmup (WARMUP_ENABLED): render workers starten en zware imports alvast doen."""
+    try:
+        report = get_executor().warm_up()
+        preload_ai()
+        print(f"🔥 Warmup klaar: {report['workers']} render worker(s) in {report['seconds']}s")
+    except Exception as e:
+        print(f"⚠️ Warmup mislukt: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Job workers starten (pakken ook jobs op die nog in de database staan)
+    get_job_queue().start()
+    # De server neemt meteen requests aan; opwarmen gebeurt ernaast
+    if config.WARMUP_ENABLED:
+        threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+    yield
+    # Eerst de job workers stoppen, daarna de process pool netjes afsluiten
+    stop_job_queue()
+    shutdown_executor()
+
+
+app = FastAPI(lifespan=lifespan)
+
 app.include_router(api_router, prefix="/api")
+app.include_router(metrics_router)
+
+# Request metrics alleen meten als ze aan staan (anders geen extra laag per request)
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Static files: één keer ingelezen en gecomprimeerd, met content hash in de URL (static_url in templates)
+static_assets = AssetStore()
+static_assets.load_directory("static")
+
+
+@app.get("/static/{path:path}", include_in_schema=False)
+async def static_file(request: Request, path: str):
+    return static_response(request, static_assets, path)
+
 
-# Jinja2 templates
+# Jinja2 templates, bij het opstarten vooraf gerenderd (ze hebben geen dynamische inhoud)
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["static_url"] = lambda name: f"/static/{static_assets.hashed_name(name)}"
+pages = prerender_pages(templates, [
+    "index.html", "erd.html", "classdiagram.html", "userstories.html",
+    "scrumboard.html", "narratives.html", "usecases.html",
+])
 
 # Home
 @app.get("/", response_class=HTMLResponse)
-def read_root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+async def read_root(request: Request):
+    return asset_response(request, pages.get("index.html"))
 
 # Erd
 @app.get("/erd", response_class=HTMLResponse)
-def read_root(request: Request):
-    return templates.TemplateResponse("erd.html", {"request": request})
+async def read_root(request: Request):
+    return asset_response(request, pages.get("erd.html"))
 
 # Classdiagram
 @app.get("/classdiagram", response_class=HTMLResponse)
-def read_root(request: Request):
-    return templates.TemplateResponse("classdiagram.html", {"request": request})
+async def read_root(request: Request):
+    return asset_response(request, pages.get("classdiagram.html"))
 
 # Userstories
 @app.get("/userstories", response_class=HTMLResponse)
-def read_root(request: Request):
-    return templates.TemplateResponse("userstories.html", {"request": request})
+async def read_root(request: Request):
+    return asset_response(request, pages.get("userstories.html"))
 
 # Scrumboard
 @app.get("/scrumboard", response_class=HTMLResponse)
-def read_root(request: Request):
-    return templates.TemplateResponse("scrumboard.html", {"request": request})
+async def read_root(request: Request):
+    return asset_response(request, pages.get("scrumboard.html"))
 
 # Narratives
 @app.get("/narratives", response_class=HTMLResponse)
-def read_root(request: Request):
-    return templates.TemplateResponse("narratives.html", {"request": request})
+async def read_root(request: Request):
+    return asset_response(request, pages.get("narratives.html"))
 
 # Usecases
 @app.get("/usecases", response_class=HTMLResponse)
-def read_root(request: Request):
-    return templates.TemplateResponse("usecases.html", {"request": request})
+async def read_root(request: Request):
+    return asset_response(request, pages.get("usecases.html"))
 
 @app.get("/download-pdf")
 def download_pdf():
@@ -0,0 +1,58 @@
+"""
+Offline compiler: een map met JSON specs rechtstreeks via de core generators naar drawio/docx/xlsx/txt,
+zonder HTTP of request validatie, verdeeld over meerdere processen (vanuit src/ draaien):
+
+    python -m offline specs/ build/                       # één proces per beschikbare CPU
+    python -m offline specs/ build/ --userstories-format txt docx
+    python -m offline specs/ build/ --kind erd --jobs 4   # specs zonder soort in naam of map zijn ERD's
+    python -m offline specs/ build/ --force               # alles opnieuw, ook als er niets veranderd is
+
+De soort van een spec volgt, in deze volgorde, uit de inhoud ({"kind": "userstories", "format": "docx", "data": [...]},
+zoals bij /api/batch), de naam (model.erd.json), een map met de naam van de soort (erd/model.json) of --kind.
+Ongewijzigde specs (zelfde content hash, opties en core code) worden overgeslagen.
+Exit code 1 als een spec niet gecompileerd kon worden.
+"""
+import argparse
+import sys
+
+import config
+from offline.compiler import KINDS, compile_tree
+
+
+def _print_result(result: dict):
+    if result["error"]:
+        print(f"❌ {result['source']}: {result['error']}", flush=True)
+    else:
+        print(f"✅ {result['source']} -> {', '.join(result['outputs'])} ({result['seconds'] * 1000:.0f}ms)", flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m offline", description="Compileer een map met JSON specs")
+    parser.add_argument("input", help="map met JSON specs (wordt recursief doorzocht)")
+    parser.add_argument("output", help="map voor de artefacten (zelfde mappenstructuur)")
+    parser.add_argument("--kind", choices=KINDS, help="soort voor specs waarvan de soort niet uit naam of map volgt")
+    parser.add_argument("--userstories-format", nargs="+", choices=["txt", "docx"], default=["txt"],
+                        help="formaat/formaten voor user stories")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="aantal processen (0 = beschikbare CPU's)")
+    parser.add_argument("--force", action="store_true", help="ook ongewijzigde specs opnieuw compileren")
+    parser.add_argument("--quiet", "-q", action="store_true", help="alleen fouten en de samenvatting tonen")
+    parser.add_argument("--verbose", action="store_true", help="debug output van de compilers niet onderdrukken")
+    args = parser.parse_args(argv)
+
+    progress = (lambda r: r["error"] and _print_result(r)) if args.quiet else _print_result
+    summary = compile_tree(
+        args.input, args.output,
+        kind=args.kind,
+        userstory_formats=args.userstories_format,
+        workers=args.jobs or config.available_cpus(),
+        force=args.force,
+        quiet=not args.verbose,
+        progress=progress,
+    )
+    print(f"\n{summary['specs']} spec(s): {summary['compiled']} gecompileerd, {summary['skipped']} ongewijzigd, "
+          f"{len(summary['failed'])} mislukt in {summary['seconds']:.2f}s")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.render.registry import ARTIFACTS, code_fingerprint, preload, render, resolve_kind
+
+# Publieke soorten, zoals bij /api/batch (userstories krijgt een formaat: txt of docx)
+KINDS = ("erd", "classdiagram", "usecases", "narratives", "scrumboard", "userstories")
+MANIFEST_NAME = ".compile-manifest.json"
+# 2: de soort blijft in de naam van de output staan (shop.erd.json -> shop.erd.drawio)
+MANIFEST_VERSION = 2
+
+
+# -------------------------
+# Inputs zoeken en hun soort bepalen
+# -------------------------
+def _kind_from_path(relative: str) -> Optional[str]:
+    """'x/y/model.erd.json' -> 'erd'; anders de dichtstbijzijnde map met de naam van een soort ('erd/model.json')."""
+    name = os.path.basename(relative)[:-len(".json")]
+    suffix = os.path.splitext(name)[1][1:]
+    if suffix in KINDS:
+        return suffix
+    for part in reversed(os.path.dirname(relative).split(os.sep)):
+        if part in KINDS:
+            return part
+    return None
+
+
+def find_specs(input_dir: str) -> List[str]:
+    """Alle *.json bestanden onder input_dir (relatieve paden, gesorteerd); verborgen mappen worden overgeslagen."""
+    specs = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.endswith(".json") and not name.startswith("."):
+                specs.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return specs
+
+
+def _output_base(relative: str) -> str:
+    """
+    Pad van de output zonder extensie: 'a/model.erd.json' -> 'a/model.erd'. De soort blijft staan,
+    anders schrijven shop.erd.json en shop.classdiagram.json allebei naar shop.drawio.
+    """
+    return relative[:-len(".json")]
+
+
+def _targets(kind: str, fmt: Optional[str], userstory_formats: Iterable[str]) -> List[Tuple[str, str]]:
+    """[(render soort, extensie)] voor één spec; user stories kunnen in meerdere formaten tegelijk."""
+    formats = [fmt] if fmt else list(userstory_formats)
+    kinds = [resolve_kind(kind, f) for f in formats] if kind == "userstories" else [resolve_kind(kind)]
+    return [(k, ARTIFACTS[k][0]) for k in kinds]
+
+
+# -------------------------
+# Eén spec compileren (draait in een worker proces)
+# -------------------------
+def _write_atomic(path: str, content: bytes):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def compile_spec(task: Dict) -> Dict:
+    """
+    Lees één JSON spec, render alle artefacten en schrijf ze weg. Fouten worden teruggegeven in plaats
+    van gegooid, zodat één kapotte spec de rest niet stopt. Picklable; de bytes gaan niet terug naar de parent.
+    """
+    started = time.perf_counter()
+    result = {"source": task["source"], "hash": task["hash"], "outputs": [], "error": None}
+    try:
+        with open(task["path"], encoding="utf-8") as f:
+            spec = json.load(f)
+        kind, fmt, data = task["kind"], None, spec
+        # Zelfde vorm als een job van /api/batch: {"kind": ..., "format": ..., "data": ...}
+        if isinstance(spec, dict) and "kind" in spec and "data" in spec:
+            kind, fmt, data = spec["kind"], spec.get("format"), spec["data"]
+        if kind is None:
+            raise ValueError("onbekende soort: gebruik <naam>.<soort>.json, een map met de naam van de soort, "
+                             "{\"kind\": ..., \"data\": ...} of --kind")
+        base = _output_base(task["source"])
+        for render_kind, extension in _targets(kind, fmt, task["userstory_formats"]):
+            output = f"{base}.{extension}"
+            _write_atomic(os.path.join(task["output_dir"], output), render(render_kind, data))
+            result["outputs"].append(output)
+    except Exception as e:
+        result["error"] = str(e) or e.__class__.__name__
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+@contextlib.contextmanager
+def _quiet(enabled: bool = True):
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _init_worker(quiet: bool):
+    # Een aantal compilers print debug output; die hoort niet tussen de voortgang
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    preload()
+
+
+# -------------------------
+# Incrementeel: manifest met content hashes
+# -------------------------
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_manifest(path: str) -> Dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "options": None, "files": {}}
+
+
+def save_manifest(manifest: Dict, path: str):
+    _write_atomic(path, json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+
+
+def _up_to_date(entry: Optional[Dict], digest: str, output_dir: str) -> bool:
+    return (entry is not None and entry.get("hash") == digest and not entry.get("error")
+            and all(os.path.exists(os.path.join(output_dir, o)) for o in entry.get("outputs", [])))
+
+
+# -------------------------
+# Een hele map compileren
+# -------------------------
+def compile_tree(input_dir: str, output_dir: str, kind: Optional[str] = None,
+                 userstory_formats: Iterable[str] = ("txt",), workers: int = 1, force: bool = False,
+                 quiet: bool = True, progress: Callable[[Dict], None] = None) -> Dict:
+    """
+    Compileer alle JSON specs onder input_dir naar output_dir (zelfde mappenstructuur), verdeeld over
+    'workers' processen. 'kind' is de terugvalsoort: een wrapper in de spec gaat voor, daarna naam
+    of map. Specs waarvan de inhoud, de opties en de core code niet veranderd zijn en waarvan de
+    output nog bestaat worden overgeslagen. Geeft een samenvatting terug.
+    """
+    if kind is not None and kind not in KINDS:
+        raise ValueError(f"Onbekende soort: {kind} (kies uit {', '.join(KINDS)})")
+    started = time.perf_counter()
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    options = {"code": code_fingerprint(), "kind": kind, "userstory_formats": list(userstory_formats)}
+    if force or manifest["options"] != options:
+        manifest["files"] = {}
+    manifest["options"] = options
+
+    specs = find_specs(input_dir)
+    tasks, skipped = [], 0
+    for relative in specs:
+        path = os.path.join(input_dir, relative)
+        digest = file_hash(path)
+        if _up_to_date(manifest["files"].get(relative), digest, output_dir):
+            skipped += 1
+            continue
+        tasks.append({
+            "source": relative, "path": path, "hash": digest, "output_dir": output_dir,
+            "kind": _kind_from_path(relative) or kind, "userstory_formats": list(userstory_formats),
+        })
+    # Specs die verdwenen zijn vallen uit het manifest (hun output blijft staan)
+    present = set(specs)
+    manifest["files"] = {k: v for k, v in manifest["files"].items() if k in present}
+
+    failed = []
+    try:
+        if workers <= 1 or len(tasks) <= 1:
+            with _quiet(quiet):
+                preload()
+            for task in tasks:
+                with _quiet(quiet):
+                    result = compile_spec(task)
+                _record(manifest, result, failed, progress)
+        else:
+            # Kleine specs in brokken naar de workers sturen: minder overhead per bestand
+            chunksize = max(1, min(32, len(tasks) // (workers * 4)))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(quiet,)) as pool:
+                for result in pool.map(compile_spec, tasks, chunksize=chunksize):
+                    _record(manifest, result, failed, progress)
+    finally:
+        # Ook na Ctrl+C bewaren: wat al klaar is hoeft de volgende keer niet opnieuw
+        save_manifest(manifest, manifest_path)
+
+    return {
+        "specs": len(specs),
+        "compiled": len(tasks) - len(failed),
+        "skipped": skipped,
+        "failed": failed,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _record(manifest: Dict, result: Dict, failed: List[Dict], progress: Optional[Callable[[Dict], None]]):
+    manifest["files"][result["source"]] = {"hash": result["hash"], "outputs": result["outputs"],
+                                          "error": result["error"]}
+    if result["error"]:
+        failed.append({"source": result["source"], "error": result["error"]})
+    if progress:
+        progress(result)
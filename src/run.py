@@ -1,10 +1,161 @@
 # run.py
+"""
+Ontwikkelen (auto-reload, alleen localhost):
+
+    python run.py
+
+Productie (meerdere workers, opgewarmd vóór het forken, nette shutdown bij SIGTERM):
+
+    python run.py --production [--host 0.0.0.0] [--port 8090] [--workers N]
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+
 import uvicorn
 
-if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",      # pad naar je FastAPI app (module:app)
-        host="127.0.0.1",    # localhost
-        port=8090,           # poort waarop de site draait
-        reload=True         # auto-reload bij codewijzigingen (debug mode)
+# Een worker die binnen deze tijd na het starten stopt telt als crash loop: niet blijven herstarten
+MIN_WORKER_UPTIME = 5
+RESTART_DELAY = 1
+
+
+def preload(workers: int):
+    """
+    Alles wat elke worker nodig heeft één keer in de parent laden: de app (met vooraf gerenderde
+    templates en gecomprimeerde static files), de generator modules en (bij Gemini) google.genai.
+    Na fork delen de workers deze pagina's copy-on-write en hoeft geen worker zelf op te warmen.
+    """
+    import config
+    # Elke web worker heeft een eigen render pool: samen niet meer processen dan er CPU's zijn
+    if "RENDER_WORKERS" not in os.environ:
+        config.RENDER_WORKERS = max(1, config.available_cpus() // workers)
+    if "BATCH_MAX_PARALLEL" not in os.environ:
+        config.BATCH_MAX_PARALLEL = config.RENDER_WORKERS
+
+    from main import app, preload_ai
+    from core.render.registry import preload as preload_generators
+    started = time.perf_counter()
+    preload_generators()
+    preload_ai()
+    print(f"🔥 Preload klaar in {time.perf_counter() - started:.2f}s "
+          f"({workers} web worker(s) x {config.RENDER_WORKERS} render worker(s))")
+    return app
+
+
+def serve_worker(server_config: uvicorn.Config, sock) -> int:
+    """In het child proces: uvicorn op de gedeelde socket; SIGTERM rondt lopende requests af."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    try:
+        uvicorn.Server(server_config).run(sockets=[sock])
+        return 0
+    except Exception as e:
+        print(f"⚠️ Worker {os.getpid()} gestopt met fout: {e}")
+        return 1
+
+
+def supervise(server_config: uvicorn.Config, sock, workers: int, grace: int):
+    """
+    Prefork supervisor: start 'workers' children op dezelfde socket, herstart children die
+    onverwacht stoppen en stuurt SIGTERM/SIGINT door. Na 'grace' seconden worden achterblijvers gekild.
+    """
+    children = {}  # pid -> starttijd
+    stopping = {"since": None, "killed": False}
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            os._exit(serve_worker(server_config, sock))
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        if stopping["since"] is None:
+            stopping["since"] = time.monotonic()
+            print(f"🛑 {signal.Signals(signum).name}: {len(children)} worker(s) ronden lopende requests af")
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+    print(f"🚀 {workers} worker(s) luisteren op http://{server_config.host}:{server_config.port}")
+
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            if (stopping["since"] is not None and not stopping["killed"]
+                    and time.monotonic() - stopping["since"] > grace + RESTART_DELAY):
+                stopping["killed"] = True
+                for pid in list(children):
+                    print(f"⚠️ Worker {pid} niet op tijd gestopt, wordt gekild")
+                    os.kill(pid, signal.SIGKILL)
+            time.sleep(0.2)
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping["since"] is not None:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if time.monotonic() - started < MIN_WORKER_UPTIME:
+            print(f"❌ Worker {pid} stopte direct na het starten (exit {code}); server wordt gestopt")
+            stop(signal.SIGTERM, None)
+            continue
+        print(f"⚠️ Worker {pid} onverwacht gestopt (exit {code}), wordt herstart")
+        time.sleep(RESTART_DELAY)
+        spawn()
+    sock.close()
+
+
+def run_production(host: str, port: int, workers: int):
+    import config
+    workers = workers or config.WEB_WORKERS or config.available_cpus()
+    app = preload(workers)
+    server_config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        proxy_headers=True,
+        timeout_graceful_shutdown=config.SHUTDOWN_GRACE_SECONDS,
     )
+    if workers == 1 or not hasattr(os, "fork"):
+        # Eén worker (of geen fork, zoals op Windows): gewoon in dit proces
+        uvicorn.Server(server_config).run()
+        return
+    # De socket in de parent openen: alle workers accepteren op dezelfde socket
+    sock = server_config.bind_socket()
+    supervise(server_config, sock, workers, config.SHUTDOWN_GRACE_SECONDS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python run.py", description="Start de webserver")
+    parser.add_argument("--production", action="store_true", help="meerdere workers, zonder auto-reload")
+    parser.add_argument("--host", default=None, help="standaard 127.0.0.1, met --production 0.0.0.0")
+    parser.add_argument("--port", type=int, default=8090, help="poort waarop de site draait")
+    parser.add_argument("--workers", type=int, default=0, help="aantal web workers (0 = WEB_WORKERS of aantal CPU's)")
+    args = parser.parse_args(argv)
+
+    # Vanuit elke map te starten: templates en static worden relatief aan src/ geladen
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.getcwd())
+
+    if args.production:
+        run_production(args.host or "0.0.0.0", args.port, args.workers)
+    else:
+        uvicorn.run(
+            "main:app",      # pad naar je FastAPI app (module:app)
+            host=args.host or "127.0.0.1",    # localhost
+            port=args.port,      # poort waarop de site draait
+            reload=True         # auto-reload bij codewijzigingen (debug mode)
+        )
+
+
+if __name__ == "__main__":
+    main()
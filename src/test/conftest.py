@@ -0,0 +1,33 @@
+# Tests draaien vanuit de repo root of src/ (python -m pytest src/test): src/ moet op het pad staan
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+@pytest.fixture
+def render_app(monkeypatch, tmp_path):
+    """
+    FastAPI app met de ERD router, renderend in threads (geen process pool) en met een eigen
+    response cache in tmp_path. Geeft (app, executor, cache) terug.
+    """
+    from fastapi import FastAPI
+
+    from api import render as render_module
+    from api.erd.router import router
+    from core.cache.response_cache import ResponseCache
+    from core.render.executor import RenderExecutor
+
+    executor = RenderExecutor(backend="thread", workers=2)
+    cache = ResponseCache(memory_bytes=1024 * 1024, disk_dir=str(tmp_path / "responses"))
+    monkeypatch.setattr(render_module, "get_executor", lambda: executor)
+    monkeypatch.setattr(render_module, "get_response_cache", lambda: cache)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/erd")
+    yield app, executor, cache
+    executor.shutdown()
@@ -0,0 +1,115 @@
+"""
+AI cache en singleflight in api/ai/gemini.py: hit, miss, bypass en no-store, het samenvoegen van
+gelijktijdige identieke requests, en dat een ongeverifieerde API key nooit het antwoord van een ander krijgt.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.genai import errors
+
+from api.ai import gemini
+from api.ai.resilience import CircuitBreaker, ResilientCaller
+from core.cache.ai_cache import AICache
+
+GOOD_KEY = "goede-key"
+BAD_KEY = "ingetrokken-key"
+ANSWER = json.dumps({"ok": True})
+
+
+class FakeModels:
+    def __init__(self, api_key: str, calls: list, latency: float):
+        self.api_key = api_key
+        self.calls = calls
+        self.latency = latency
+
+    async def generate_content(self, model: str, contents: str, config=None):
+        self.calls.append(self.api_key)
+        await asyncio.sleep(self.latency)
+        if self.api_key == BAD_KEY:
+            raise errors.ClientError(401, {"error": {"code": 401, "message": "API key not valid",
+                                                     "status": "UNAUTHENTICATED"}})
+        return SimpleNamespace(text=ANSWER)
+
+
+@pytest.fixture
+def ai(monkeypatch, tmp_path):
+    """Eigen AI cache, lege singleflight en verified keys, en een nep client die de upstream calls telt."""
+    calls = []
+    state = SimpleNamespace(calls=calls, latency=0.0, cache=AICache(str(tmp_path / "ai.sqlite")))
+    monkeypatch.setattr(gemini, "get_ai_cache", lambda: state.cache)
+    monkeypatch.setattr(gemini, "singleflight", gemini.SingleFlight())
+    monkeypatch.setattr(gemini, "verified_keys", gemini.VerifiedKeys())
+    monkeypatch.setattr(gemini, "resilient", ResilientCaller(
+        timeout=5.0, hedge=False, hedge_percentile=50.0, hedge_min_samples=1,
+        breaker=CircuitBreaker(failure_threshold=100, reset_seconds=30)))
+    monkeypatch.setattr(gemini.client_pool, "get", lambda api_key: SimpleNamespace(
+        aio=SimpleNamespace(models=FakeModels(api_key, calls, state.latency))))
+    return state
+
+
+def generate(api_key: str, cache_control: str = None):
+    return gemini.generate_cached(api_key, "maak een erd", "erd", cache_control)
+
+
+def test_second_request_is_a_cache_hit(ai):
+    assert asyncio.run(generate(GOOD_KEY)) == (ANSWER, "miss")
+    assert asyncio.run(generate(GOOD_KEY)) == (ANSWER, "hit")
+    assert ai.calls == [GOOD_KEY]
+
+
+def test_no_cache_refreshes_and_no_store_skips_the_cache(ai):
+    assert asyncio.run(generate(GOOD_KEY, "no-store")) == (ANSWER, "bypass")
+    assert asyncio.run(generate(GOOD_KEY)) == (ANSWER, "miss")
+    assert asyncio.run(generate(GOOD_KEY, "no-cache")) == (ANSWER, "bypass")
+    assert len(ai.calls) == 3
+    assert ai.cache.stats()["bypasses"] == 2
+
+
+def test_concurrent_identical_requests_share_one_call(ai):
+    asyncio.run(generate(GOOD_KEY, "no-store"))  # key verifiëren, zonder iets te cachen
+    ai.calls.clear()
+    ai.latency = 0.05
+
+    async def burst():
+        return await asyncio.gather(*(generate(GOOD_KEY, "no-store") for _ in range(5)))
+    results = asyncio.run(burst())
+    assert ai.calls == [GOOD_KEY]
+    assert sorted(status for _, status in results) == ["bypass"] + ["coalesced"] * 4
+
+
+def test_unverified_key_gets_its_own_error_not_a_cached_answer(ai):
+    asyncio.run(generate(GOOD_KEY))
+    with pytest.raises(errors.ClientError):
+        asyncio.run(generate(BAD_KEY))
+    assert ai.calls == [GOOD_KEY, BAD_KEY]
+
+
+def test_unverified_key_does_not_join_a_running_call(ai):
+    asyncio.run(generate(GOOD_KEY, "no-store"))
+    ai.latency = 0.05
+
+    async def together():
+        return await asyncio.gather(generate(GOOD_KEY, "no-store"), generate(BAD_KEY, "no-store"),
+                                    return_exceptions=True)
+    good, bad = asyncio.run(together())
+    assert good == (ANSWER, "bypass")
+    assert isinstance(bad, errors.ClientError)
+
+
+def test_key_is_shared_after_its_first_successful_call(ai):
+    other = "andere-goede-key"
+    asyncio.run(generate(GOOD_KEY))
+    assert asyncio.run(generate(other)) == (ANSWER, "miss")
+    assert asyncio.run(generate(other)) == (ANSWER, "hit")
+    assert ai.calls == [GOOD_KEY, other]
+
+
+def test_verified_key_expires():
+    keys = gemini.VerifiedKeys(ttl_seconds=0)
+    keys.add(GOOD_KEY)
+    assert GOOD_KEY not in keys
+    keys = gemini.VerifiedKeys(ttl_seconds=60)
+    keys.add(GOOD_KEY)
+    assert GOOD_KEY in keys and BAD_KEY not in keys
@@ -0,0 +1,73 @@
+"""
+Vooraf gecomprimeerde assets (core/assets/store.py, api/assets.py): varianten per Content-Encoding,
+een ETag per variant met 304, Vary op elk antwoord en immutable caching alleen voor de actuele hash.
+"""
+import gzip
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from api.assets import IMMUTABLE, REVALIDATE, static_response
+from core.assets.store import MIN_COMPRESS_BYTES, AssetStore
+
+SCRIPT = b"function render() { return 'diagram'; }\n" * 100
+
+
+def store():
+    assets = AssetStore(encodings=["gzip"])
+    assets.add("script.js", SCRIPT)
+    assets.add("klein.css", b"body{}")
+    return assets
+
+
+def test_variants_are_precompressed():
+    assets = store()
+    script = assets.get("script.js")
+    assert gzip.decompress(script.variants["gzip"]) == SCRIPT
+    assert script.media_type.endswith("javascript; charset=utf-8")
+    assert script.body("gzip, deflate") == (script.variants["gzip"], "gzip")
+    assert script.body("identity") == (SCRIPT, None)
+    # Te klein om te comprimeren
+    assert len(b"body{}") < MIN_COMPRESS_BYTES and assets.get("klein.css").variants == {}
+
+
+def test_hashed_name_is_immutable_only_for_current_content():
+    assets = store()
+    hashed = assets.hashed_name("script.js")
+    assert hashed != "script.js"
+    assert assets.resolve(hashed) == (assets.get("script.js"), True)
+    assert assets.resolve("script.js") == (assets.get("script.js"), False)
+    assert assets.resolve("script.000000000000.js") == (assets.get("script.js"), False)
+    assert assets.resolve("bestaat.niet.js") == (None, False)
+
+
+def client():
+    assets = store()
+    app = FastAPI()
+
+    @app.get("/static/{path:path}")
+    async def static(request: Request, path: str):
+        return static_response(request, assets, path)
+    return TestClient(app), assets
+
+
+def get(test_client, path, **headers):
+    return test_client.get(path, headers={"Accept-Encoding": "identity", **headers})
+
+
+def test_static_response_headers_and_304():
+    test_client, assets = client()
+    plain = get(test_client, "/static/script.js")
+    packed = get(test_client, "/static/script.js", **{"Accept-Encoding": "gzip"})
+
+    assert plain.content == packed.content == SCRIPT
+    assert "content-encoding" not in plain.headers and packed.headers["content-encoding"] == "gzip"
+    assert plain.headers["vary"] == packed.headers["vary"] == "Accept-Encoding"
+    assert plain.headers["etag"] != packed.headers["etag"]
+    assert plain.headers["cache-control"] == REVALIDATE
+
+    not_modified = get(test_client, "/static/script.js", **{"If-None-Match": plain.headers["etag"]})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    immutable = get(test_client, f"/static/{assets.hashed_name('script.js')}")
+    assert immutable.headers["cache-control"] == IMMUTABLE
+    assert get(test_client, "/static/bestaat.js").status_code == 404
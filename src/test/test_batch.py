@@ -0,0 +1,85 @@
+"""
+Batch en jobs API: /api/batch streamt een ZIP waarin een mislukte job alleen in manifest.json
+terechtkomt, en een job doorloopt via /api/jobs de stappen 202 -> 409 (nog niet klaar) -> resultaat.
+"""
+import io
+import json
+import os
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+import config
+from api.batch.router import router as batch_router
+from api.jobs import router as jobs_router_module
+from core.jobs import queue as queue_module
+from core.jobs.queue import DONE, JobQueue
+
+ERD = [{"title": "Klant", "fields": [{"name": "KlantID", "type": "PK", "datatype": "INT"}]}]
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "userstories.json"), encoding="utf-8") as f:
+    USERSTORIES = json.load(f)
+
+
+@pytest.fixture
+def client(render_app):
+    app, _, _ = render_app
+    app.include_router(batch_router, prefix="/api/batch")
+    return TestClient(app)
+
+
+def batch(client, jobs):
+    response = client.post("/api/batch", json={"jobs": jobs})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    return zipfile.ZipFile(io.BytesIO(response.content))
+
+
+def test_batch_zip_keeps_going_after_a_failed_job(client):
+    archive = batch(client, [
+        {"kind": "erd", "data": ERD, "name": "model"},
+        {"kind": "onbekend", "data": {}},
+        {"kind": "userstories", "data": USERSTORIES, "format": "docx"},
+    ])
+    manifest = json.loads(archive.read("manifest.json"))["jobs"]
+
+    assert [job["status"] for job in manifest] == ["ok", "error", "ok"]
+    assert archive.read("model.drawio").startswith(b"<")
+    assert manifest[1]["error"]
+    # docx is zelf al een zip: opgeslagen, niet nogmaals gecomprimeerd
+    assert archive.getinfo(manifest[2]["file"]).compress_type == zipfile.ZIP_STORED
+    assert archive.getinfo("model.drawio").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_batch_deduplicates_file_names(client):
+    archive = batch(client, [{"kind": "erd", "data": ERD, "name": "zelfde"}] * 2)
+    assert {"zelfde.drawio", "zelfde_2.drawio"} <= set(archive.namelist())
+
+
+def test_batch_limits(client, monkeypatch):
+    assert client.post("/api/batch", json={"jobs": []}).status_code == 422
+    monkeypatch.setattr(config, "BATCH_MAX_JOBS", 1)
+    assert client.post("/api/batch", json={"jobs": [{"kind": "erd", "data": ERD}] * 2}).status_code == 413
+
+
+def test_job_api_flow(render_app, monkeypatch, tmp_path):
+    app, executor, _ = render_app
+    app.include_router(jobs_router_module.router, prefix="/api/jobs")
+    jobs = JobQueue(str(tmp_path / "jobs"), workers=1)
+    monkeypatch.setattr(jobs_router_module, "get_job_queue", lambda: jobs)
+    monkeypatch.setattr(queue_module, "get_executor", lambda: executor)
+    client = TestClient(app)
+
+    submitted = client.post("/api/jobs", json={"kind": "erd", "data": ERD})
+    assert submitted.status_code == 202
+    status_url = submitted.json()["status_url"]
+    assert client.get(f"{status_url}/result").status_code == 409
+
+    jobs._process(jobs._claim())  # zoals een worker thread
+    status = client.get(status_url).json()
+    assert status["status"] == DONE
+    result = client.get(status["result_url"])
+    assert result.status_code == 200 and result.content.startswith(b"<")
+
+    assert client.get("/api/jobs/bestaat-niet").status_code == 404
+    assert client.post("/api/jobs", json={"kind": "onbekend", "data": ERD}).status_code == 422
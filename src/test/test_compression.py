@@ -0,0 +1,77 @@
+"""
+Compressie van gegenereerde responses: onderhandeling via Accept-Encoding, Vary op elke
+onderhandelbare response (ook de ongecomprimeerde) en gecomprimeerde SSE streams.
+"""
+import zlib
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from api.compression import STREAM_OFFLOAD_BYTES, streaming_response
+from core.compression.codecs import negotiate
+from core.render.registry import DOCX
+
+ERD = [{"title": f"Tabel{i}", "fields": [{"name": "ID", "type": "PK", "datatype": "INT"}]} for i in range(20)]
+
+
+def test_negotiate():
+    assert negotiate(None, ["zstd", "gzip"]) is None
+    assert negotiate("gzip, deflate", ["zstd", "gzip"]) == "gzip"
+    assert negotiate("gzip;q=0.5, zstd", ["zstd", "gzip"]) == "zstd"
+    assert negotiate("*", ["zstd", "gzip"]) == "zstd"
+    assert negotiate("gzip;q=0, identity", ["gzip"]) is None
+
+
+def test_rendered_response_is_compressed_with_vary(render_app):
+    app, _, _ = render_app
+    client = TestClient(app)
+    plain = client.post("/api/erd/generate", json={"data": ERD}, headers={"Accept-Encoding": "identity"})
+    packed = client.post("/api/erd/generate", json={"data": ERD}, headers={"Accept-Encoding": "gzip"})
+
+    assert plain.status_code == packed.status_code == 200
+    assert "content-encoding" not in plain.headers
+    assert packed.headers["content-encoding"] == "gzip"
+    # Beide varianten hangen af van Accept-Encoding, dus beide krijgen Vary
+    assert plain.headers["vary"] == packed.headers["vary"] == "Accept-Encoding"
+    assert plain.headers["etag"] != packed.headers["etag"]
+    assert packed.content == plain.content  # httpx pakt de gzip body zelf uit
+
+
+def stream_app(media_type: str, chunks):
+    app = FastAPI()
+
+    @app.get("/stream")
+    async def stream(request: Request):
+        async def events():
+            for chunk in chunks:
+                yield chunk
+        return streaming_response(request, events(), media_type)
+    return app
+
+
+def raw_body(client, accept_encoding: str):
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": accept_encoding}) as response:
+        return response.headers, b"".join(response.iter_raw())
+
+
+def test_stream_is_compressed_per_chunk_and_large_chunks_too():
+    chunks = ["data: klein\n\n", "data: " + "x" * (STREAM_OFFLOAD_BYTES * 2) + "\n\n"]
+    client = TestClient(stream_app("text/event-stream", chunks))
+
+    headers, body = raw_body(client, "gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert zlib.decompress(body, 16 + zlib.MAX_WBITS).decode() == "".join(chunks)
+
+    headers, body = raw_body(client, "identity")
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert body.decode() == "".join(chunks)
+
+
+def test_zipped_formats_are_not_negotiated():
+    client = TestClient(stream_app(DOCX, [b"PK..."]))
+    headers, body = raw_body(client, "gzip")
+    assert "content-encoding" not in headers
+    assert "vary" not in headers
+    assert body == b"PK..."
@@ -0,0 +1,80 @@
+"""
+ERD -> classediagram: multipliciteiten uit not_null/unique, koppeltabellen als veel-op-veel association
+en de labels die de drawio generator daarvoor tekent.
+"""
+import re
+
+import pytest
+
+from core.classdiagram.compiler import DrawioClassDiagramGenerator
+from core.classdiagram.erdtoclassdiagram import erd_to_classdiagram
+
+
+def pk(name):
+    return {"name": name, "type": "PK", "datatype": "INT"}
+
+
+def fk(name, table, **extra):
+    return {"name": name, "type": "FK", "datatype": "INT", "references": {"table": table, "field": name}, **extra}
+
+
+def table(title, *fields):
+    return {"title": title, "fields": list(fields)}
+
+
+def names(diagram):
+    ids = {cls["id"]: cls["name"] for cls in diagram["classes"]}
+    return [(ids[r["from"]], ids[r["to"]], r["name"], r["from_multiplicity"], r["to_multiplicity"])
+            for r in diagram["relations"]]
+
+
+def test_fk_multiplicities():
+    erd = [
+        table("Klant", pk("KlantID"), {"name": "Naam", "type": "", "datatype": "VARCHAR(50)"}),
+        table("Bestelling", pk("BestellingID"), fk("KlantID", "Klant", not_null=True)),
+        table("Profiel", pk("ProfielID"), fk("KlantID", "Klant", unique=True)),
+    ]
+    diagram = erd_to_classdiagram(erd)
+    assert diagram["classes"][0]["attributes"] == ["naam: string"]
+    assert names(diagram) == [
+        ("Bestelling", "Klant", "KlantID", "0..*", "1"),
+        ("Profiel", "Klant", "KlantID", "0..1", "0..1"),
+    ]
+
+
+def test_junction_becomes_many_to_many():
+    erd = [table("A", pk("AID")), table("B", pk("BID")), table("AB", fk("AID", "A"), fk("BID", "B"))]
+    diagram = erd_to_classdiagram(erd)
+    assert [cls["name"] for cls in diagram["classes"]] == ["A", "B"]
+    assert names(diagram) == [("A", "B", "AB", "0..*", "0..*")]
+
+
+def test_junction_with_bare_fk():
+    bare = {"name": "X", "type": "FK", "datatype": "INT"}
+    erd = [table("A", pk("AID")), table("B", pk("BID")), table("AB", fk("AID", "A"), fk("BID", "B"), bare)]
+    assert names(erd_to_classdiagram(erd)) == [("A", "B", "AB", "0..*", "0..*")]
+
+
+def test_referenced_junction_stays_a_class():
+    erd = [
+        table("A", pk("AID")), table("B", pk("BID")), table("AB", fk("AID", "A"), fk("BID", "B")),
+        table("Notitie", pk("NotitieID"), fk("AB", "AB")),
+    ]
+    diagram = erd_to_classdiagram(erd)
+    assert "AB" in [cls["name"] for cls in diagram["classes"]]
+    assert [(f, t) for f, t, *_ in names(diagram)] == [("AB", "A"), ("AB", "B"), ("Notitie", "AB")]
+
+
+def test_duplicate_titles_are_rejected():
+    with pytest.raises(ValueError, match="Klant"):
+        erd_to_classdiagram([table("Klant", pk("KlantID")), table("Klant", pk("ID"))])
+
+
+def test_drawio_draws_name_and_multiplicity_labels():
+    erd = [table("Klant", pk("KlantID")), table("Bestelling", pk("BestellingID"), fk("KlantID", "Klant", not_null=True))]
+    xml = DrawioClassDiagramGenerator().run(json_data=erd_to_classdiagram(erd))
+    edge = re.search(r'<mxCell id="(\d+)" value="KlantID" [^>]*edge="1"', xml)
+    assert edge
+    labels = re.findall(rf'<mxCell id="\d+" value="([^"]*)" style="edgeLabel[^"]*" vertex="1" connectable="0" '
+                        rf'parent="{edge.group(1)}">', xml)
+    assert labels == ["0..*", "1"]
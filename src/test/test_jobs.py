@@ -0,0 +1,91 @@
+"""
+Job queue: verlaten jobs (geen heartbeat) worden opnieuw ingepland, lopende jobs niet,
+en een oude run kan het resultaat van een nieuwe poging niet overschrijven.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.jobs import queue as queue_module
+from core.jobs.queue import DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+ERD = [{"title": "Klant", "fields": [{"name": "KlantID", "type": "PK", "datatype": "INT"}]}]
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    return JobQueue(str(tmp_path), workers=1, stale_seconds=0.2, max_attempts=2)
+
+
+class SlowExecutor:
+    """Rendert echt, maar pas na 'delay' seconden (een lange job)."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.pool = ThreadPoolExecutor(max_workers=1)
+
+    def submit(self, kind, data):
+        def run():
+            time.sleep(self.delay)
+            from core.render.registry import render
+            return render(kind, data)
+        return self.pool.submit(run)
+
+
+def test_abandoned_job_is_requeued(jobs):
+    job_id = jobs.submit("erd", ERD)
+    assert jobs._claim()["attempts"] == 1
+
+    jobs.cleanup(time.time() + 1)
+    job = jobs.get(job_id)
+    assert (job["status"], job["started_at"]) == (QUEUED, None)
+    assert jobs._claim()["attempts"] == 2
+
+
+def test_job_abandoned_max_attempts_times_fails(jobs):
+    job_id = jobs.submit("erd", ERD)
+    for _ in range(2):
+        jobs._claim()
+        jobs.cleanup(time.time() + 1)
+    job = jobs.get(job_id)
+    assert job["status"] == FAILED
+    assert "2 keer" in job["error"]
+
+
+def test_heartbeat_keeps_running_job(jobs):
+    job_id = jobs.submit("erd", ERD)
+    row = jobs._claim()
+    time.sleep(0.15)
+    jobs._heartbeat(job_id, row["attempts"])
+    time.sleep(0.1)
+    jobs.cleanup()
+    assert jobs.get(job_id)["status"] == RUNNING
+
+
+def test_old_run_cannot_finish_a_requeued_job(jobs):
+    job_id = jobs.submit("erd", ERD)
+    first = jobs._claim()
+    jobs.cleanup(time.time() + 1)
+    second = jobs._claim()
+
+    assert not jobs._finish(job_id, first["attempts"], FAILED, error="te laat")
+    assert jobs.get(job_id)["status"] == RUNNING
+    assert jobs._finish(job_id, second["attempts"], FAILED, error="echte fout")
+    assert jobs.get(job_id)["error"] == "echte fout"
+
+
+def test_long_render_is_not_started_twice(jobs, monkeypatch):
+    monkeypatch.setattr(queue_module, "get_executor", lambda: SlowExecutor(0.6))
+    job_id = jobs.submit("erd", ERD)
+    worker = threading.Thread(target=jobs._process, args=(jobs._claim(),))
+    worker.start()
+    while worker.is_alive():
+        jobs.cleanup()  # zoals de opruimronde van een ander proces
+        time.sleep(0.05)
+
+    job = jobs.get(job_id)
+    assert (job["status"], job["attempts"]) == (DONE, 1)
+    with open(job["result_path"], "rb") as f:
+        assert f.read().startswith(b"<")
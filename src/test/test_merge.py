@@ -0,0 +1,103 @@
+"""
+Chunking van grote sets user stories (core/erd/merge.py): verdelen per actor of op tokens,
+deterministisch samenvoegen van deel-ERD's met herstelde FK referenties, en chunk_by op de endpoints.
+"""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import config
+from api.ai import gemini
+from api.ai.userstorietoerd.router import router
+from core.erd.merge import estimate_tokens, merge_erds, partition_stories
+
+
+def story(as_a: str, i_want: str = "iets doen"):
+    return {"id": "", "title": i_want, "user_story": {"as_a": as_a, "i_want": i_want, "so_that": "het werkt"},
+            "description": "", "acceptance_criteria": []}
+
+
+def pk(name="ID"):
+    return {"type": "PK", "name": name, "datatype": "INT"}
+
+
+def fk(name, table, field="ID"):
+    return {"type": "FK", "name": name, "datatype": "INT", "references": {"table": table, "field": field}}
+
+
+def test_partition_by_actor_keeps_order_and_groups():
+    stories = [story("Klant"), story("medewerker"), story("klant ")]
+    chunks = partition_stories(stories, by="actor")
+    assert chunks == [[stories[0], stories[2]], [stories[1]]]
+
+
+def test_partition_splits_groups_on_token_budget():
+    stories = [story("klant", "x" * 400) for _ in range(5)]
+    size = estimate_tokens(json.dumps(stories[0], ensure_ascii=False, separators=(",", ":")))
+    budget = 2 * size + size // 2
+    for by in ("actor", "tokens"):
+        chunks = partition_stories(stories, by=by, token_budget=budget)
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    with pytest.raises(ValueError):
+        partition_stories(stories, by="woorden")
+
+
+def test_merge_deduplicates_tables_and_fields():
+    merged = merge_erds([
+        [{"title": "Klant", "fields": [pk(), {"type": "", "name": "Naam", "datatype": "VARCHAR(100)"}]}],
+        [{"title": "klant", "fields": [{"type": "", "name": "naam", "datatype": "TEXT", "not_null": True},
+                                       {"type": "", "name": "Email", "datatype": "VARCHAR(255)"}]}],
+    ])
+    assert len(merged) == 1
+    assert [field["name"] for field in merged[0]["fields"]] == ["ID", "Naam", "Email"]
+    # Eerste definitie wint, ontbrekende eigenschappen worden aangevuld
+    assert merged[0]["fields"][1] == {"type": "", "name": "Naam", "datatype": "VARCHAR(100)", "not_null": True}
+
+
+def test_merge_reconciles_foreign_keys():
+    merged = merge_erds([
+        [{"title": "Klant", "fields": [pk("KlantID")]}],
+        [{"title": "Bestelling", "fields": [pk(), fk("KlantID", "klant", "klantid"), fk("ProductID", "Product")]}],
+        [{"title": "Factuur", "fields": [pk(), fk("KlantID", "Klant", "Nummer")]}],
+    ])
+    bestelling, factuur = merged[1]["fields"], merged[2]["fields"]
+    # Naar de samengevoegde namen; een onbekende tabel wordt een gewoon veld; een onbekend veld wordt de PK
+    assert bestelling[1]["references"] == {"table": "Klant", "field": "KlantID"}
+    assert bestelling[2]["type"] == "" and "references" not in bestelling[2]
+    assert factuur[1]["references"] == {"table": "Klant", "field": "KlantID"}
+
+
+def test_merge_is_deterministic():
+    partials = [[{"title": "B", "fields": [pk()]}], [{"title": "A", "fields": [pk()]}]]
+    assert [table["title"] for table in merge_erds(partials)] == ["B", "A"]
+    assert merge_erds(partials) == merge_erds(partials)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """userstorytoerd endpoints tegen het stub model, zonder AI cache."""
+    monkeypatch.setattr(config, "AI_BACKEND", "stub")
+    monkeypatch.setattr(config, "AI_STUB_LATENCY_MS", 0)
+    monkeypatch.setattr(config, "AI_STUB_LATENCY_JITTER_MS", 0)
+    monkeypatch.setattr(config, "AI_STUB_FAILURE_RATE", 0.0)
+    monkeypatch.setattr(gemini, "client_pool", gemini.ClientPool())
+    monkeypatch.setattr(gemini, "get_ai_cache", lambda: None)
+    app = FastAPI()
+    app.include_router(router, prefix="/api/ai")
+    return TestClient(app, headers={"Authorization": "Bearer test"})
+
+
+def test_chunked_endpoint_merges_partials(client):
+    body = {"user_stories": [story("klant"), story("medewerker")], "chunk_by": "actor"}
+    response = client.post("/api/ai/userstorytoerd", json=body)
+    assert response.status_code == 200
+    assert response.headers["x-ai-cache"] == "chunked"
+    # Het stub model geeft voor beide delen dezelfde ERD: samengevoegd blijft die één keer over
+    assert [table["title"] for table in response.json()["erd"]] == ["Student", "Inschrijving"]
+
+
+def test_stream_rejects_chunk_by(client):
+    body = {"user_stories": [story("klant")], "chunk_by": "tokens"}
+    assert client.post("/api/ai/userstorytoerd/stream", json=body).status_code == 400
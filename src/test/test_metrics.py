@@ -0,0 +1,71 @@
+"""
+Metrics registry en stage-rapport van een render: uitgeschakelde metrics registreren niets,
+de inputvalidatie is een eigen stage (ongeldige input wordt een 422) en de RSS piek van een render wordt gesampled.
+"""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.metrics.memory import MB, MemoryTracker
+from core.metrics.registry import MetricsRegistry
+from core.render import registry
+from core.render.registry import render, render_with_report
+
+ERD = [
+    {"title": "Klant", "fields": [{"name": "KlantID", "type": "PK", "datatype": "INT"},
+                                  {"name": "Naam", "type": "", "datatype": "NVARCHAR(100)"}]},
+    {"title": "Bestelling", "fields": [
+        {"name": "BestellingID", "type": "PK", "datatype": "INT"},
+        {"name": "KlantID", "type": "FK", "datatype": "INT", "references": {"table": "Klant", "field": "KlantID"}},
+    ]},
+]
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    registry.memory_rejections.inc(kind="erd")
+    registry.render_duration.observe(0.1, kind="erd")
+    text = registry.render_text()
+    assert "memory_budget_rejections_total{" not in text
+    assert "render_duration_seconds_count{" not in text
+
+
+def test_enabled_registry_counts():
+    registry = MetricsRegistry(enabled=True)
+    registry.memory_rejections.inc(kind="erd")
+    assert 'memory_budget_rejections_total{kind="erd"} 1' in registry.render_text()
+
+
+def test_report_has_validate_stage():
+    content, report = render_with_report("erd", ERD)
+    assert content.startswith(b"<")
+    assert "validate" in report["stages"]
+    assert report["counts"]["tables"] == 2
+
+
+def test_invalid_input_shape_is_rejected():
+    with pytest.raises(ValueError):
+        render("erd", {"title": "Klant"})
+    with pytest.raises(ValueError):
+        render_with_report("classdiagram", [])
+
+
+def test_invalid_input_gives_422(render_app, monkeypatch):
+    app, _, _ = render_app
+    # Het pydantic model laat alleen een lijst door: laat validate_input een object verwachten
+    monkeypatch.setitem(registry.INPUT_TYPES, "erd", dict)
+    response = TestClient(app).post("/api/erd/generate", json={"data": ERD})
+    assert response.status_code == 422
+    assert "Ongeldige input voor 'erd'" in response.json()["detail"]
+
+
+def test_memory_tracker_sees_freed_peak():
+    with MemoryTracker(sample_seconds=0.001) as memory:
+        block = b"x" * (64 * MB)
+        time.sleep(0.05)
+        del block
+    report = memory.report
+    # De piek is gezien, ook al is het geheugen na de render weer vrijgegeven
+    assert report["rss_peak_bytes"] >= 48 * MB
+    assert report["rss_after_bytes"] - report["rss_before_bytes"] < 16 * MB
@@ -0,0 +1,73 @@
+"""
+Offline compiler: soort uit wrapper, naam of map (--kind is de terugval), unieke outputnamen en het manifest.
+"""
+import json
+
+from offline.compiler import MANIFEST_NAME, compile_tree
+
+ERD = [{"title": "Klant", "fields": [{"name": "KlantID", "type": "PK", "datatype": "INT"}]}]
+CLASSDIAGRAM = {"classes": [{"id": "C1", "name": "Klant", "attributes": [], "methods": []}], "relations": []}
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_path_kind_wins_over_kind_option(tmp_path):
+    specs, build = tmp_path / "specs", tmp_path / "build"
+    write(specs / "erd" / "model.json", ERD)
+    write(specs / "shop.erd.json", ERD)
+    write(specs / "losse" / "klassen.json", CLASSDIAGRAM)
+
+    summary = compile_tree(str(specs), str(build), kind="classdiagram")
+
+    assert summary["failed"] == []
+    assert summary["compiled"] == 3
+    assert (build / "erd" / "model.drawio").exists()
+    assert (build / "shop.erd.drawio").exists()
+    assert (build / "losse" / "klassen.drawio").exists()
+
+
+def test_specs_with_same_name_and_other_kind_do_not_overwrite_each_other(tmp_path):
+    specs, build = tmp_path / "specs", tmp_path / "build"
+    write(specs / "shop.erd.json", ERD)
+    write(specs / "shop.classdiagram.json", CLASSDIAGRAM)
+
+    summary = compile_tree(str(specs), str(build))
+
+    assert summary["failed"] == []
+    erd, classdiagram = (build / "shop.erd.drawio").read_text(), (build / "shop.classdiagram.drawio").read_text()
+    assert erd != classdiagram
+    assert not (build / "shop.drawio").exists()
+    manifest = json.loads((build / MANIFEST_NAME).read_text())
+    assert manifest["files"]["shop.erd.json"]["outputs"] == ["shop.erd.drawio"]
+    assert manifest["files"]["shop.classdiagram.json"]["outputs"] == ["shop.classdiagram.drawio"]
+
+
+def test_unchanged_specs_are_skipped_and_changed_specs_rebuilt(tmp_path):
+    specs, build = tmp_path / "specs", tmp_path / "build"
+    write(specs / "a.erd.json", ERD)
+    write(specs / "b.erd.json", ERD)
+    assert compile_tree(str(specs), str(build))["compiled"] == 2
+
+    write(specs / "b.erd.json", ERD + [{"title": "Product", "fields": []}])
+    summary = compile_tree(str(specs), str(build))
+    assert (summary["compiled"], summary["skipped"]) == (1, 1)
+
+    # Verdwenen output: opnieuw compileren, ook al is de spec niet veranderd
+    (build / "a.erd.drawio").unlink()
+    assert compile_tree(str(specs), str(build))["compiled"] == 1
+
+
+def test_broken_spec_is_reported_and_does_not_stop_the_rest(tmp_path):
+    specs, build = tmp_path / "specs", tmp_path / "build"
+    write(specs / "goed.erd.json", ERD)
+    write(specs / "kapot.erd.json", {"geen": "lijst"})
+    write(specs / "onbekend.json", ERD)
+
+    summary = compile_tree(str(specs), str(build))
+
+    assert summary["compiled"] == 1
+    assert sorted(f["source"] for f in summary["failed"]) == ["kapot.erd.json", "onbekend.json"]
+    assert (build / "goed.erd.drawio").exists()
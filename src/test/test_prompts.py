@@ -0,0 +1,26 @@
+"""
+Compacte prompt payloads: de ERD voor het classediagram houdt not_null en unique (ook False).
+"""
+import json
+
+from api.ai.prompts import erd_payload, stories_payload
+
+
+def test_erd_payload_keeps_constraints_and_drops_auto_increment():
+    erd = [{"title": "Bestelling", "fields": [
+        {"type": "PK", "name": "ID", "datatype": "INT", "not_null": True, "unique": True, "auto_increment": True},
+        {"type": "FK", "name": "KlantID", "datatype": "INT", "not_null": False, "unique": False,
+         "references": {"table": "Klant", "field": "ID"}},
+        {"type": "", "name": "Opmerking", "datatype": "TEXT", "references": None},
+    ]}]
+    fields = json.loads(erd_payload(erd))[0]["fields"]
+    assert fields[0] == {"type": "PK", "name": "ID", "datatype": "INT", "not_null": True, "unique": True}
+    assert fields[1]["not_null"] is False and fields[1]["unique"] is False
+    assert fields[1]["references"] == {"table": "Klant", "field": "ID"}
+    assert fields[2] == {"name": "Opmerking", "datatype": "TEXT"}
+
+
+def test_stories_payload_is_compact():
+    payload = stories_payload([{"id": 1, "title": "Inloggen", "user_story": "Als gebruiker ...",
+                                "acceptance_criteria": ["a"], "description": ""}])
+    assert payload == '[{"title":"Inloggen","user_story":"Als gebruiker ..."}]'
@@ -0,0 +1,168 @@
+"""
+Timeout, circuit breaker en hedging van ResilientCaller tegen het stub model (api/ai/stub.py),
+met ingestelde latency en foutinjectie.
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from google.genai import errors
+
+import config
+from api.ai.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ResilientCaller
+from api.ai.stub import StubClient
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Stub model zonder latency en fouten; tests zetten die zelf via set_stub."""
+    monkeypatch.setattr(config, "AI_STUB_LATENCY_MS", 0)
+    monkeypatch.setattr(config, "AI_STUB_LATENCY_JITTER_MS", 0)
+    monkeypatch.setattr(config, "AI_STUB_FAILURE_RATE", 0.0)
+    return StubClient()
+
+
+def set_stub(monkeypatch, latency_ms: int = 0, failure_rate: float = 0.0):
+    monkeypatch.setattr(config, "AI_STUB_LATENCY_MS", latency_ms)
+    monkeypatch.setattr(config, "AI_STUB_FAILURE_RATE", failure_rate)
+
+
+def make_caller(timeout: float = 1.0, failures: int = 3, reset_seconds: float = 30.0, hedge: bool = False):
+    return ResilientCaller(timeout=timeout, hedge=hedge, hedge_percentile=50.0, hedge_min_samples=1,
+                           breaker=CircuitBreaker(failure_threshold=failures, reset_seconds=reset_seconds))
+
+
+def generate(client):
+    async def call():
+        response = await client.aio.models.generate_content(model="stub", contents="erd")
+        return response.text
+    return call
+
+
+def test_timeout_gives_504(stub, monkeypatch):
+    set_stub(monkeypatch, latency_ms=300)
+    caller = make_caller(timeout=0.05)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(caller.call(generate(stub)))
+    assert error.value.status_code == 504
+    assert caller.timeouts == 1
+
+
+def test_failures_open_breaker_with_retry_after(stub, monkeypatch):
+    set_stub(monkeypatch, failure_rate=1.0)
+    caller = make_caller(failures=3, reset_seconds=30)
+
+    for _ in range(3):
+        with pytest.raises(errors.ServerError):
+            asyncio.run(caller.call(generate(stub)))
+    assert caller.breaker.state == OPEN
+
+    # Open breaker: direct 503, zonder upstream call
+    set_stub(monkeypatch, failure_rate=0.0)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(caller.call(generate(stub)))
+    assert error.value.status_code == 503
+    assert 1 <= int(error.value.headers["Retry-After"]) <= 30
+    assert caller.breaker.rejected == 1
+    assert caller.failures == 3
+
+
+def test_half_open_probe_success_closes_breaker(stub, monkeypatch):
+    set_stub(monkeypatch, failure_rate=1.0)
+    caller = make_caller(failures=2, reset_seconds=0.05)
+    for _ in range(2):
+        with pytest.raises(errors.ServerError):
+            asyncio.run(caller.call(generate(stub)))
+    assert caller.breaker.state == OPEN
+
+    time.sleep(0.06)
+    set_stub(monkeypatch, failure_rate=0.0)
+    assert asyncio.run(caller.call(generate(stub)))
+    assert caller.breaker.state == CLOSED
+    assert caller.breaker.failures == 0
+
+
+def test_half_open_probe_failure_reopens_breaker(stub, monkeypatch):
+    set_stub(monkeypatch, failure_rate=1.0)
+    caller = make_caller(failures=2, reset_seconds=0.05)
+    for _ in range(2):
+        with pytest.raises(errors.ServerError):
+            asyncio.run(caller.call(generate(stub)))
+
+    time.sleep(0.06)
+    # De proefcall faalt: meteen weer open, ook al is de drempel (2) niet opnieuw gehaald
+    with pytest.raises(errors.ServerError):
+        asyncio.run(caller.call(generate(stub)))
+    assert caller.breaker.state == OPEN
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(caller.call(generate(stub)))
+    assert error.value.status_code == 503
+
+
+def test_hedge_fires_after_tail_latency_and_cancels_loser(stub, monkeypatch):
+    caller = make_caller(timeout=2.0, hedge=True)
+    caller.latency.record(0.05)  # p50 = 50ms: daarna volgt een hedge
+
+    attempts = []
+    cancelled = []
+
+    async def call():
+        attempt = len(attempts)
+        # Eerste call blijft hangen (tail latency), de hedge is snel
+        set_stub(monkeypatch, latency_ms=1000 if attempt == 0 else 0)
+        attempts.append(time.perf_counter())
+        try:
+            return await generate(stub)()
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+
+    started = time.perf_counter()
+    result = asyncio.run(caller.call(call))
+    elapsed = time.perf_counter() - started
+
+    assert result
+    assert len(attempts) == 2
+    assert attempts[1] - started >= 0.05  # niet voor de drempel
+    assert elapsed < 0.5  # niet op de trage call gewacht
+    assert caller.hedges == 1
+    assert caller.hedge_wins == 1
+    assert cancelled == [0]
+
+
+def client_error():
+    async def call():
+        raise errors.ClientError(400, {"error": {"code": 400, "message": "API key not valid",
+                                                 "status": "INVALID_ARGUMENT"}})
+    return call
+
+
+def test_client_errors_do_not_reset_the_breaker(stub, monkeypatch):
+    set_stub(monkeypatch, failure_rate=1.0)
+    caller = make_caller(failures=3)
+    for call in (generate(stub), client_error(), generate(stub), client_error(), generate(stub)):
+        with pytest.raises((errors.ServerError, errors.ClientError)):
+            asyncio.run(caller.call(call))
+    # Drie upstream fouten, afgewisseld met fouten van de aanvrager: de breaker gaat toch open
+    assert caller.breaker.state == OPEN
+    assert caller.failures == 3
+
+
+def test_client_error_during_probe_keeps_breaker_half_open(stub, monkeypatch):
+    set_stub(monkeypatch, failure_rate=1.0)
+    caller = make_caller(failures=1, reset_seconds=0.05)
+    with pytest.raises(errors.ServerError):
+        asyncio.run(caller.call(generate(stub)))
+    time.sleep(0.06)
+
+    with pytest.raises(errors.ClientError):
+        asyncio.run(caller.call(client_error()))
+    assert caller.breaker.state == HALF_OPEN
+
+    # De proefcall is vrijgegeven: de volgende call mag door en sluit de breaker
+    set_stub(monkeypatch, failure_rate=0.0)
+    assert asyncio.run(caller.call(generate(stub)))
+    assert caller.breaker.state == CLOSED
@@ -0,0 +1,76 @@
+"""
+Content-addressed response cache en ETags van gerenderde artefacten: tweede request uit de cache,
+304 op If-None-Match (ook met de ETag van een andere variant), de schijflaag na een herstart
+en een nieuwe sleutel als de core code verandert.
+"""
+from fastapi.testclient import TestClient
+
+from core.cache import response_cache
+from core.cache.response_cache import ResponseCache, content_key, variant_etag
+
+ERD = [{"title": "Klant", "fields": [{"name": "KlantID", "type": "PK", "datatype": "INT"}]}]
+
+
+def post(client, data=ERD, **headers):
+    return client.post("/api/erd/generate", json={"data": data}, headers={"Accept-Encoding": "identity", **headers})
+
+
+def test_second_request_is_a_memory_hit(render_app):
+    app, _, cache = render_app
+    client = TestClient(app)
+    first, second = post(client), post(client)
+
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits_memory"] == 1
+
+
+def test_key_ignores_json_key_order():
+    reordered = [{"fields": [{"datatype": "INT", "type": "PK", "name": "KlantID"}], "title": "Klant"}]
+    assert content_key("erd", ERD) == content_key("erd", reordered)
+    assert content_key("erd", ERD) != content_key("classdiagram", ERD)
+
+
+def test_if_none_match_gives_304(render_app):
+    app, _, cache = render_app
+    client = TestClient(app)
+    etag = post(client).headers["etag"]
+
+    response = post(client, **{"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert cache.stats()["not_modified"] == 1
+    assert post(client, **{"If-None-Match": '"iets-anders"'}).status_code == 200
+
+
+def test_variant_etag_and_304_across_variants(render_app):
+    app, _, _ = render_app
+    client = TestClient(app)
+    plain = post(client).headers["etag"]
+    packed = post(client, **{"Accept-Encoding": "gzip"})
+
+    assert packed.headers["etag"] == variant_etag(plain, "gzip") != plain
+    # Een client die de ongecomprimeerde variant heeft, hoeft de gzip variant niet opnieuw te downloaden
+    assert post(client, **{"Accept-Encoding": "gzip", "If-None-Match": plain}).status_code == 304
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    disk_dir = str(tmp_path / "responses")
+    key = content_key("erd", ERD)
+    entry = ResponseCache(disk_dir=disk_dir).put(key, b"<mxfile/>")
+
+    restarted = ResponseCache(disk_dir=disk_dir)
+    assert restarted.get_memory(key) is None
+    from_disk = restarted.get_disk(key)
+    assert from_disk.content == b"<mxfile/>" and from_disk.etag == entry.etag
+    assert restarted.stats()["hits_disk"] == 1
+    # Na de schijfhit staat de entry ook weer in het geheugen
+    assert restarted.get_memory(key) is not None
+
+
+def test_new_code_fingerprint_gives_new_key(monkeypatch):
+    before = content_key("erd", ERD)
+    monkeypatch.setattr(response_cache, "code_fingerprint", lambda: "andere-versie")
+    assert content_key("erd", ERD) != before
@@ -0,0 +1,81 @@
+"""
+Structured output in api/ai/gemini.py: een ongeldig AI antwoord krijgt een repair prompt, een hersteld
+antwoord komt terug als 'repaired', na AI_MAX_REPAIRS pogingen volgt een 502 en ongeldige antwoorden
+komen nooit in de AI cache.
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import config
+from api.ai import gemini
+from api.ai.schemas import validate_erd
+from core.cache.ai_cache import AICache
+
+VALID_ERD = [{"title": "Student", "fields": [{"type": "PK", "name": "ID", "datatype": "INT"}]}]
+FK_WITHOUT_REFERENCES = [{"title": "Student", "fields": [{"type": "FK", "name": "KlasID", "datatype": "INT"}]}]
+
+
+@pytest.fixture
+def ai(monkeypatch, tmp_path):
+    """Nep generate_content die de antwoorden uit ai.answers teruggeeft en de prompts bewaart."""
+    class State:
+        answers = []
+        prompts = []
+        cache = AICache(str(tmp_path / "ai.sqlite"))
+
+    async def fake_generate(api_key, prompt, model=gemini.MODEL, response_schema=None):
+        State.prompts.append(prompt)
+        return State.answers.pop(0)
+
+    monkeypatch.setattr(gemini, "generate_content", fake_generate)
+    monkeypatch.setattr(gemini, "get_ai_cache", lambda: State.cache)
+    monkeypatch.setattr(gemini, "singleflight", gemini.SingleFlight())
+    monkeypatch.setattr(gemini, "verified_keys", gemini.VerifiedKeys())
+    gemini.verified_keys.add("key")
+    monkeypatch.setattr(config, "AI_MAX_REPAIRS", 2)
+    return State
+
+
+def structured(prompt: str = "maak een erd"):
+    return asyncio.run(gemini.generate_structured("key", prompt, "erd", validate_erd))
+
+
+def test_valid_answer_needs_no_repair(ai):
+    ai.answers = [json.dumps(VALID_ERD)]
+    data, status = structured()
+    assert data[0]["title"] == "Student"
+    assert status == "miss"
+    assert len(ai.prompts) == 1
+
+
+def test_invalid_answer_is_repaired(ai):
+    ai.answers = ["Hier is je ERD: geen json", json.dumps(FK_WITHOUT_REFERENCES), f"```json\n{json.dumps(VALID_ERD)}\n```"]
+    data, status = structured()
+    assert status == "repaired"
+    assert data[0]["fields"][0]["name"] == "ID"
+    # Elke repair prompt bevat de oorspronkelijke prompt, het foute antwoord en de fout
+    assert ai.prompts[1].startswith("maak een erd") and "geen json" in ai.prompts[1]
+    assert "FK zonder references" in ai.prompts[2]
+
+
+def test_gives_502_after_max_repairs(ai):
+    ai.answers = ["geen json"] * 3
+    with pytest.raises(HTTPException) as error:
+        structured()
+    assert error.value.status_code == 502
+    assert len(ai.prompts) == config.AI_MAX_REPAIRS + 1
+
+
+def test_invalid_answers_are_not_cached(ai):
+    ai.answers = ["geen json", json.dumps(VALID_ERD)]
+    structured()
+    assert ai.cache.stats()["entries"] == 1
+    # Alleen het herstelde antwoord staat in de cache (onder de repair prompt); de oorspronkelijke prompt is een miss
+    ai.answers = [json.dumps(VALID_ERD)]
+    _, status = structured()
+    assert status == "miss"
+    _, status = structured()
+    assert status == "hit"
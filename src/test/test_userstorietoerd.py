@@ -0,0 +1,66 @@
+"""
+Golden check: de concept-ERD uit de voorbeeld user stories (test/userstories.json) bevat alleen
+zelfstandige naamwoorden in het enkelvoud, geen werkwoorden, bijvoeglijke naamwoorden of bijwoorden.
+Daarnaast de regels zelf, op zinnen die niet in het voorbeeld staan.
+"""
+import json
+import os
+
+import pytest
+
+from core.erd.userstorietoerd import _singular, userstories_to_erd
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "userstories.json")
+
+EXPECTED_TABLES = [
+    "Medewerker", "Seniormedewerker", "Beheerder", "Magazijnmedewerker", "Gebruiker", "Klant",
+    "Product", "Categorie", "Notificatie", "Contract", "Looptijd", "Rapportage", "Inkomst",
+    "Maand", "Kwartaal", "Jaar", "Wachtwoord",
+]
+
+
+def sample_erd():
+    with open(SAMPLE, encoding="utf-8") as f:
+        return userstories_to_erd(json.load(f))
+
+
+def test_sample_gives_expected_tables():
+    assert [table["title"] for table in sample_erd()] == EXPECTED_TABLES
+
+
+def test_no_verbs_or_adjectives_as_tables():
+    titles = {table["title"] for table in sample_erd()}
+    for junk in ("Filteren", "Bijna", "Leeg", "Openstaande", "Veilig"):
+        assert junk not in titles
+
+
+def test_plural_and_compounds_merge_with_singular():
+    titles = {table["title"] for table in sample_erd()}
+    assert "Categorieën" not in titles and "Categorie" in titles
+    assert "Klantgegevens" not in titles and "Klant" in titles
+
+
+def story(as_a, i_want):
+    return {"user_story": {"as_a": as_a, "i_want": i_want}}
+
+
+def titles(*stories):
+    return [table["title"] for table in userstories_to_erd(list(stories))]
+
+
+def test_predicate_adjectives_and_verbs_are_not_tables():
+    assert titles(
+        story("docent", "een melding krijgen wanneer een lokaal vrij is"),
+        story("docent", "cijfers snel invoeren"),
+        story("student", "een overzicht van lopende cursussen bekijken"),
+        story("student", "roosters sorteren op datum, klas of lokaal"),
+    ) == ["Docent", "Student", "Melding", "Lokaal", "Cijfer", "Cursus", "Rooster", "Datum", "Klas"]
+
+
+@pytest.mark.parametrize("plural, singular", [
+    ("categorieën", "categorie"), ("rapportages", "rapportage"), ("medewerkers", "medewerker"),
+    ("producten", "product"), ("bestellingen", "bestelling"), ("lessen", "les"), ("cursussen", "cursus"),
+    ("straten", "straat"), ("prijzen", "prijs"), ("brieven", "brief"), ("proces", "proces"), ("adres", "adres"),
+])
+def test_singular(plural, singular):
+    assert _singular(plural) == singular